@@ -0,0 +1,476 @@
+"""API HTTP local en JSON sobre el motor de recetas (asyncio, sin dependencias externas).
+
+Rutas:
+    GET    /dietas                      dietas y cantidad de recetas de cada una
+    GET    /recetas                     listado paginado: dieta, ingredientes (separados
+                                        por comas), min_minutos, max_minutos,
+                                        orden (id | minutos | -minutos), offset, limit
+    GET    /recetas/buscar?q=...        texto libre por relevancia (dieta, min_minutos,
+                                        max_minutos, limit)
+    GET    /recetas/cercanas?ingredientes=...   mejores coincidencias (dieta,
+                                        min_minutos, max_minutos, k)
+    GET    /recetas/<id>                detalle
+    POST   /recetas                     alta (cuerpo JSON con los campos de importación)
+    PUT    /recetas/<id>                reemplazo completo
+    DELETE /recetas/<id>                baja
+
+Las respuestas GET llevan un ETag con la versión de escritura del catálogo: con
+If-None-Match igual se responde 304 sin consultar la base. El JSON ya serializado
+(y comprimido con gzip si el cliente lo acepta) queda en una caché por URL hasta la
+siguiente escritura, así que muchos clientes pidiendo lo mismo no repiten la consulta.
+Las consultas corren en un pool de hilos para no bloquear el bucle de eventos.
+
+Uso:
+    python api.py --port 8080
+    python cli.py --db recetas.db serve --host 0.0.0.0
+    curl --compressed 'http://127.0.0.1:8080/recetas?dieta=Vegano&ingredientes=arroz&limit=20'
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from recipe_manager import DB_NAME, DIET_BITS, RESULT_ORDERS, Recipe, RecipeManager, normalize_recipe_data
+from sharded_manager import open_manager
+import recipe_io
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+WORKER_THREADS = 4
+# Respuestas GET serializadas que se guardan (las más usadas)
+RESPONSE_CACHE_SIZE = 512
+# Por debajo de este tamaño gzip no compensa
+GZIP_MIN_BYTES = 1024
+MAX_BODY_BYTES = 1024 * 1024
+# Mayor ID que admite SQLite (INTEGER de 64 bits con signo)
+MAX_RECIPE_ID = 2 ** 63 - 1
+MAX_HEADER_LINES = 100
+KEEP_ALIVE_SECONDS = 15
+
+# Ruta -> (método, patrón, nombre del manejador en RecipeApi)
+ROUTES = (
+    ("GET", re.compile(r"^/dietas$"), "_get_diets"),
+    ("GET", re.compile(r"^/recetas$"), "_list_recipes"),
+    ("GET", re.compile(r"^/recetas/buscar$"), "_search_text"),
+    ("GET", re.compile(r"^/recetas/cercanas$"), "_search_closest"),
+    ("GET", re.compile(r"^/recetas/(\d+)$"), "_get_recipe"),
+    ("POST", re.compile(r"^/recetas$"), "_create_recipe"),
+    ("PUT", re.compile(r"^/recetas/(\d+)$"), "_update_recipe"),
+    ("DELETE", re.compile(r"^/recetas/(\d+)$"), "_delete_recipe")
+)
+
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, HEAD, POST, PUT, DELETE, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, If-None-Match",
+    "Access-Control-Expose-Headers": "ETag, Location"
+}
+
+class ApiError(Exception):
+    """Error que se devuelve al cliente como {"error": mensaje} con su código HTTP"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+@dataclass
+class Response:
+    status: int
+    body: bytes = b""
+    headers: Dict[str, str] = field(default_factory=dict)
+
+def recipe_payload(recipe: Recipe) -> Dict:
+    """Receta en JSON: los campos de exportación más los minutos interpretados"""
+    record = recipe_io.recipe_record(recipe)
+    record["minutos"] = recipe.minutes
+    return record
+
+def _int_param(params: Dict[str, str], name: str, default: Optional[int],
+               minimum: int = 0, maximum: Optional[int] = None) -> Optional[int]:
+    value = params.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ApiError(400, f"'{name}' debe ser un número entero")
+    if number < minimum or (maximum is not None and number > maximum):
+        raise ApiError(400, f"'{name}' fuera de rango")
+    return number
+
+def _diet_param(params: Dict[str, str], default: Optional[str] = "Omnívoro") -> Optional[str]:
+    diet = params.get("dieta") or default
+    if diet is not None and diet not in DIET_BITS:
+        raise ApiError(400, f"dieta desconocida: {diet} (opciones: {', '.join(DIET_BITS)})")
+    return diet
+
+def _ingredients_param(params: Dict[str, str]) -> List[str]:
+    return [ing.strip() for ing in params.get("ingredientes", "").split(",") if ing.strip()]
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Comparación débil de If-None-Match (lista separada por comas o '*')"""
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+def _accepts_gzip(header: str) -> bool:
+    """Accept-Encoding con valores q: gzip (o '*', si gzip no figura) con q mayor que 0"""
+    qualities: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, *params = [item.strip() for item in part.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    return qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0))) > 0
+
+class RecipeApi:
+    """Traduce pedidos HTTP a llamadas de RecipeManager y cachea las respuestas GET"""
+
+    def __init__(self, manager: RecipeManager, workers: int = WORKER_THREADS,
+                 cache_size: int = RESPONSE_CACHE_SIZE):
+        self.manager = manager
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="yumlist-api")
+        self._responses: "OrderedDict[str, Tuple[str, bytes, Optional[bytes]]]" = OrderedDict()
+        self._cache_size = cache_size
+        # La versión de escritura reinicia con cada proceso: el prefijo evita que un
+        # ETag emitido antes de reiniciar el servidor coincida por casualidad
+        self._boot = f"{os.getpid():x}{int(time.time()):x}"
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    async def _run(self, function: Callable, *args) -> Any:
+        """Ejecuta una llamada bloqueante del gestor en el pool de hilos"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def current_etag(self) -> str:
+        data_version, generation = await self._run(self.manager.catalog_version)
+        return f'W/"{self._boot}-{data_version}-{generation}"'
+
+    # ---- Manejadores (se ejecutan en el pool de hilos) ----
+
+    def _get_diets(self, params: Dict[str, str]) -> Tuple[int, Any]:
+        return 200, [{"dieta": diet, "recetas": self.manager.count_recipes(diet)} for diet in DIET_BITS]
+
+    def _list_recipes(self, params: Dict[str, str]) -> Tuple[int, Any]:
+        diet = _diet_param(params)
+        ingredients = _ingredients_param(params)
+        min_minutes = _int_param(params, "min_minutos", None)
+        max_minutes = _int_param(params, "max_minutos", None)
+        order = params.get("orden") or "id"
+        if order not in RESULT_ORDERS:
+            raise ApiError(400, f"orden desconocido: {order} (opciones: {', '.join(RESULT_ORDERS)})")
+        offset = _int_param(params, "offset", 0)
+        limit = _int_param(params, "limit", PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+
+        # Los IDs quedan en la caché del gestor: cada página solo lee sus filas
+        recipe_ids = self.manager.get_recipe_ids(diet, ingredients, min_minutes, max_minutes, order)
+        recipes = self.manager.get_recipes_by_ids(recipe_ids[offset:offset + limit])
+        next_page = None
+        if offset + limit < len(recipe_ids):
+            next_page = "/recetas?" + urlencode(sorted({**params, "offset": offset + limit, "limit": limit}.items()))
+        return 200, {
+            "total": len(recipe_ids),
+            "offset": offset,
+            "limit": limit,
+            "recetas": [recipe_payload(recipe) for recipe in recipes],
+            "siguiente": next_page
+        }
+
+    def _search_text(self, params: Dict[str, str]) -> Tuple[int, Any]:
+        text = params.get("q", "").strip()
+        if not text:
+            raise ApiError(400, "falta el parámetro 'q'")
+        limit = _int_param(params, "limit", PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+        recipes = self.manager.search_text(
+            text, _diet_param(params, None), limit,
+            _int_param(params, "min_minutos", None), _int_param(params, "max_minutos", None)
+        )
+        return 200, {"recetas": [recipe_payload(recipe) for recipe in recipes]}
+
+    def _search_closest(self, params: Dict[str, str]) -> Tuple[int, Any]:
+        ingredients = _ingredients_param(params)
+        if not ingredients:
+            raise ApiError(400, "falta el parámetro 'ingredientes'")
+        k = _int_param(params, "k", PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+        ranked = self.manager.search_closest(
+            ingredients, _diet_param(params), k,
+            _int_param(params, "min_minutos", None), _int_param(params, "max_minutos", None)
+        )
+        return 200, {"recetas": [
+            {**recipe_payload(item.recipe), "puntaje": round(item.score, 4),
+             "coincidencias": item.matched, "faltan": item.missing}
+            for item in ranked
+        ]}
+
+    def _existing_recipe(self, recipe_id: str) -> Recipe:
+        # Un ID fuera del rango de SQLite no puede existir (y no se le pasa a la base)
+        if int(recipe_id) > MAX_RECIPE_ID:
+            raise ApiError(404, f"no existe la receta {recipe_id}")
+        recipe = self.manager.get_recipe(int(recipe_id))
+        if recipe is None:
+            raise ApiError(404, f"no existe la receta {recipe_id}")
+        return recipe
+
+    def _get_recipe(self, params: Dict[str, str], recipe_id: str) -> Tuple[int, Any]:
+        return 200, recipe_payload(self._existing_recipe(recipe_id))
+
+    @staticmethod
+    def _recipe_body(body: bytes) -> Dict:
+        """Valida el cuerpo JSON de un alta o edición"""
+        try:
+            record = json.loads(body or b"null")
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ApiError(400, f"JSON inválido: {e}")
+        if not isinstance(record, dict):
+            raise ApiError(400, "se esperaba un objeto JSON con los campos de la receta")
+        try:
+            return normalize_recipe_data(record)
+        except ValueError as e:
+            raise ApiError(422, str(e))
+
+    def _create_recipe(self, params: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        recipe_id = self.manager.add_recipe(self._recipe_body(body))
+        if recipe_id is None:
+            raise ApiError(500, "no se pudo guardar la receta")
+        return 201, recipe_payload(self._existing_recipe(str(recipe_id)))
+
+    def _update_recipe(self, params: Dict[str, str], body: bytes, recipe_id: str) -> Tuple[int, Any]:
+        recipe_data = self._recipe_body(body)
+        self._existing_recipe(recipe_id)
+        if not self.manager.update_recipe(int(recipe_id), recipe_data):
+            raise ApiError(500, "no se pudo actualizar la receta")
+        return 200, recipe_payload(self._existing_recipe(recipe_id))
+
+    def _delete_recipe(self, params: Dict[str, str], body: bytes, recipe_id: str) -> Tuple[int, Any]:
+        self._existing_recipe(recipe_id)
+        if not self.manager.delete_recipe(int(recipe_id)):
+            raise ApiError(500, "no se pudo eliminar la receta")
+        return 204, None
+
+    # ---- Despacho ----
+
+    async def handle(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Response:
+        """Atiende un pedido ya leído y devuelve la respuesta completa"""
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        params = dict(parse_qsl(url.query))
+        if method == "OPTIONS":
+            return Response(204, headers=dict(CORS_HEADERS))
+
+        try:
+            route_method = "GET" if method == "HEAD" else method
+            allowed = []
+            for candidate_method, pattern, handler_name in ROUTES:
+                match = pattern.match(path)
+                if not match:
+                    continue
+                allowed.append(candidate_method)
+                if candidate_method == route_method:
+                    break
+            else:
+                if allowed:
+                    raise ApiError(405, f"método no permitido (usar {', '.join(allowed)})")
+                raise ApiError(404, f"ruta desconocida: {path}")
+
+            handler = getattr(self, handler_name)
+            if route_method == "GET":
+                return await self._conditional_get(handler, match.groups(), params, path, headers)
+            status, payload = await self._run(handler, params, body, *match.groups())
+            return self._json_response(status, payload, headers)
+        except ApiError as e:
+            return self._json_response(e.status, {"error": str(e)}, headers)
+        except Exception as e:
+            logger.exception(f"Error al atender {method} {target}: {e}")
+            return self._json_response(500, {"error": "error interno"}, headers)
+
+    async def _conditional_get(self, handler: Callable, args: Tuple, params: Dict[str, str],
+                               path: str, headers: Dict[str, str]) -> Response:
+        """GET con ETag: 304 si el cliente ya tiene esta versión; si no, la respuesta
+        cacheada para esta URL y versión, o se consulta al gestor una sola vez"""
+        # La versión se lee antes de consultar: la respuesta nunca es más vieja que su ETag
+        etag = await self.current_etag()
+        if _etag_matches(headers.get("if-none-match", ""), etag):
+            return Response(304, headers={"ETag": etag, **CORS_HEADERS})
+
+        key = path + "?" + urlencode(sorted(params.items()))
+        entry = self._responses.get(key)
+        if entry is None or entry[0] != etag:
+            status, payload = await self._run(handler, params, *args)
+            raw = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            compressed = gzip.compress(raw, compresslevel=6) if len(raw) >= GZIP_MIN_BYTES else None
+            entry = (etag, raw, compressed)
+            self._responses[key] = entry
+            if len(self._responses) > self._cache_size:
+                self._responses.popitem(last=False)
+        self._responses.move_to_end(key)
+
+        _, raw, compressed = entry
+        response_headers = {
+            "Content-Type": "application/json; charset=utf-8",
+            "ETag": etag,
+            # El cliente puede guardar la respuesta pero debe revalidarla con el ETag
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+            **CORS_HEADERS
+        }
+        if compressed is not None and _accepts_gzip(headers.get("accept-encoding", "")):
+            response_headers["Content-Encoding"] = "gzip"
+            return Response(200, compressed, response_headers)
+        return Response(200, raw, response_headers)
+
+    @staticmethod
+    def _json_response(status: int, payload: Any, headers: Dict[str, str]) -> Response:
+        if payload is None:
+            return Response(status, headers=dict(CORS_HEADERS))
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        response_headers = {"Content-Type": "application/json; charset=utf-8", **CORS_HEADERS}
+        if status == 201 and isinstance(payload, dict) and "id" in payload:
+            response_headers["Location"] = f"/recetas/{payload['id']}"
+        if len(body) >= GZIP_MIN_BYTES and _accepts_gzip(headers.get("accept-encoding", "")):
+            body = gzip.compress(body, compresslevel=6)
+            response_headers["Content-Encoding"] = "gzip"
+        return Response(status, body, response_headers)
+
+    # ---- HTTP/1.1 mínimo sobre asyncio ----
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Atiende los pedidos de una conexión (con keep-alive) hasta que se cierre"""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._send(writer, self._json_response(400, {"error": "pedido inválido"}, {}), False, False)
+                    break
+
+                headers: Dict[str, str] = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                else:
+                    await self._send(writer, self._json_response(431, {"error": "demasiados encabezados"}, {}), False, False)
+                    break
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0 or length > MAX_BODY_BYTES:
+                    status = 400 if length < 0 else 413
+                    await self._send(writer, self._json_response(status, {"error": "cuerpo inválido"}, {}), False, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                response = await self.handle(method.upper(), target, headers, body)
+                await self._send(writer, response, keep_alive, method.upper() == "HEAD")
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, response: Response, keep_alive: bool, head_only: bool) -> None:
+        status = HTTPStatus(response.status)
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        headers = {
+            **response.headers,
+            "Content-Length": str(len(response.body)),
+            "Connection": "keep-alive" if keep_alive else "close"
+        }
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if response.body and not head_only:
+            writer.write(response.body)
+        await writer.drain()
+
+async def run_server(db_name: str = DB_NAME, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                     ready: Optional[Callable[[asyncio.AbstractServer], None]] = None, shards: int = 0,
+                     bit_matrix: bool = False) -> None:
+    """Sirve la API hasta que se cancele la tarea (Ctrl+C en la línea de comandos)"""
+    with open_manager(db_name, shards, bit_matrix) as manager:
+        api = RecipeApi(manager)
+        try:
+            server = await asyncio.start_server(api.handle_connection, host, port)
+            async with server:
+                if ready:
+                    ready(server)
+                await server.serve_forever()
+        finally:
+            api.close()
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    def ready(server: asyncio.AbstractServer) -> None:
+        address = server.sockets[0].getsockname()
+        print(f"API de Yumlist en http://{address[0]}:{address[1]}/recetas (Ctrl+C para salir)", file=sys.stderr)
+
+    try:
+        asyncio.run(run_server(
+            args.db, args.host, args.port, ready, getattr(args, "shards", 0), getattr(args, "bit_matrix", False)
+        ))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def add_commands(commands) -> None:
+    """Registra el subcomando serve (también lo usa cli.py)"""
+    serve = commands.add_parser("serve", help="sirve la API HTTP JSON local")
+    serve.add_argument("--host", default=DEFAULT_HOST, help="dirección (por defecto: %(default)s)")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT, help="puerto (por defecto: %(default)s)")
+    serve.set_defaults(handler=cmd_serve)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="API HTTP JSON de Yumlist")
+    parser.add_argument("--db", default=DB_NAME, help="base de datos SQLite (por defecto: %(default)s)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="dirección (por defecto: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="puerto (por defecto: %(default)s)")
+    parser.add_argument("--shards", type=int, default=0, help="usar el catálogo repartido en N fragmentos de --db")
+    parser.add_argument("--bit-matrix", action="store_true", help="búsquedas por ingredientes con NumPy (si está instalado)")
+    parser.set_defaults(handler=cmd_serve)
+    return parser
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
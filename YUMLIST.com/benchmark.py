@@ -0,0 +1,400 @@
+"""Benchmarks del motor de recetas sobre un catálogo sintético reproducible.
+
+El generador crea N recetas (de 1k a 1M) con un vocabulario de ingredientes de
+popularidad Zipf y una mezcla de dietas configurable; con la misma semilla se
+obtiene siempre el mismo catálogo, que se guarda y reutiliza entre corridas.
+
+Se mide RecipeManager (search_recipes, get_all_recipes, _is_recipe_compatible,
+add/update/delete) y, como referencia, la lógica anterior de yumlist.py
+(filtrar_por_dieta + buscar_recetas recorriendo toda la tabla en Python).
+
+Uso:
+    python benchmark.py --recipes 100000
+    python benchmark.py --recipes 1000000 --vocabulary 5000 --output actual.json
+    python benchmark.py --recipes 100000 --baseline base.json --tolerance 1.25
+    python benchmark.py --recipes 1000000 --memory     # bytes por receta en memoria
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+try:
+    import resource
+except ImportError:
+    # No existe en Windows: se omite la memoria máxima del proceso
+    resource = None
+import tracemalloc
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from compact_catalog import CompactCatalog
+from recipe_manager import DIET_BITS, Recipe, RecipeManager, parse_cooking_minutes
+
+# Ingredientes reales al principio del vocabulario (los más populares con Zipf),
+# incluidos los restringidos por dieta para que los filtros descarten recetas
+BASE_INGREDIENTS = (
+    "sal", "aceite", "cebolla", "ajo", "tomate", "arroz", "papa", "huevo", "pollo",
+    "queso", "leche", "carne", "zanahoria", "lechuga", "pimiento", "harina", "azúcar",
+    "mantequilla", "limón", "perejil", "fideos", "lentejas", "garbanzos", "yogur", "miel",
+    "atún", "espinaca", "calabaza", "maíz", "choclo", "poroto", "mandioca", "cerdo"
+)
+DIETS = tuple(DIET_BITS)
+DEFAULT_DIET_MIX = (0.6, 0.25, 0.15)
+LEGACY_LIMIT = 200000
+
+# Lógica anterior a RecipeManager (yumlist.py), reproducida como línea de base
+INGR_PROHIBIDOS = {
+    "Vegano": {"huevo", "huevos", "queso", "pollo", "carne", "leche", "miel", "mantequilla", "yogur"},
+    "Vegetariano": {"pollo", "carne"},
+    "Omnívoro": set()
+}
+
+def filtrar_por_dieta(ingredientes_text, dieta):
+    ingredientes_set = set(i.strip().lower() for i in ingredientes_text.split(","))
+    prohibidos = INGR_PROHIBIDOS.get(dieta, set())
+    return len(prohibidos.intersection(ingredientes_set)) == 0
+
+def buscar_recetas(db_name, ingredientes_usuario, dieta):
+    conn = sqlite3.connect(db_name)
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, nombre, ingredientes, cantidades, preparacion, tiempo_coccion FROM recetas")
+    recetas = cursor.fetchall()
+    conn.close()
+    encontradas = []
+    for receta in recetas:
+        ingredientes_receta = receta[2].lower()
+        if not filtrar_por_dieta(ingredientes_receta, dieta):
+            continue
+        if all(i in ingredientes_receta for i in ingredientes_usuario):
+            encontradas.append(receta[0])
+    return encontradas
+
+# --------- GENERADOR SINTÉTICO ---------
+class ZipfSampler:
+    """Muestreo reproducible de índices 0..n-1 con probabilidad proporcional a 1/(k+1)^s"""
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.rng = rng
+        self.cumulative = list(accumulate(1.0 / (rank + 1) ** s for rank in range(n)))
+        self.total = self.cumulative[-1]
+
+    def sample(self) -> int:
+        return bisect_left(self.cumulative, self.rng.random() * self.total)
+
+    def sample_distinct(self, k: int) -> List[int]:
+        chosen: List[int] = []
+        while len(chosen) < k:
+            index = self.sample()
+            if index not in chosen:
+                chosen.append(index)
+        return chosen
+
+def build_vocabulary(size: int) -> List[str]:
+    vocabulary = list(BASE_INGREDIENTS[:size])
+    vocabulary += [f"ingrediente{index:05d}" for index in range(len(vocabulary), size)]
+    return vocabulary
+
+def generate_recipes(count: int, vocabulary_size: int = 1000, zipf_s: float = 1.1,
+                     diet_mix: Sequence[float] = DEFAULT_DIET_MIX, seed: int = 42,
+                     min_ingredients: int = 3, max_ingredients: int = 10) -> Iterator[Dict]:
+    """Genera recetas sintéticas deterministas (mismos parámetros, mismas recetas)"""
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(vocabulary_size)
+    sampler = ZipfSampler(len(vocabulary), zipf_s, rng)
+    max_ingredients = min(max_ingredients, len(vocabulary))
+    for number in range(count):
+        ingredients = [vocabulary[i] for i in sampler.sample_distinct(rng.randint(min_ingredients, max_ingredients))]
+        diet = rng.choices(DIETS, weights=diet_mix)[0]
+        yield {
+            "nombre": f"Receta sintética {number}",
+            "ingredientes": ", ".join(ingredients),
+            "cantidades": ", ".join(f"{rng.randint(1, 500)} g" for _ in ingredients),
+            "preparacion": f"Mezclar {', '.join(ingredients[:3])} y cocinar {rng.randint(5, 90)} minutos.",
+            "tiempo_coccion": f"{rng.randint(5, 120)} minutos",
+            "dieta": diet
+        }
+
+def generate_queries(count: int, vocabulary_size: int, zipf_s: float, seed: int) -> List[Tuple[List[str], str]]:
+    """Consultas de 1 a 3 ingredientes con la misma popularidad Zipf que el catálogo"""
+    rng = random.Random(seed + 1)
+    vocabulary = build_vocabulary(vocabulary_size)
+    sampler = ZipfSampler(len(vocabulary), zipf_s, rng)
+    return [
+        ([vocabulary[i] for i in sampler.sample_distinct(rng.randint(1, min(3, len(vocabulary))))], rng.choice(DIETS))
+        for _ in range(count)
+    ]
+
+def catalog_path(args: argparse.Namespace) -> str:
+    """Ruta del catálogo generado: el nombre incluye los parámetros para reutilizarlo"""
+    mix = "-".join(f"{weight:g}" for weight in args.diet_mix)
+    name = f"yumlist_bench_{args.recipes}_{args.vocabulary}_{args.zipf:g}_{mix}_{args.seed}.db"
+    return os.path.join(args.db_dir, name)
+
+def build_catalog(args: argparse.Namespace) -> str:
+    path = catalog_path(args)
+    if os.path.exists(path):
+        return path
+    print(f"Generando catálogo de {args.recipes:,} recetas en {path}...", file=sys.stderr)
+    tmp_path = path + ".tmp"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(tmp_path + suffix):
+            os.remove(tmp_path + suffix)
+    with RecipeManager(tmp_path, sample_data=False) as manager:
+        report = manager.bulk_import(generate_recipes(
+            args.recipes, args.vocabulary, args.zipf, args.diet_mix, args.seed
+        ))
+        manager._get_connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    print(f"  {report.inserted:,} recetas en {report.elapsed:.1f} s", file=sys.stderr)
+    os.replace(tmp_path, path)
+    return path
+
+# --------- MEDICIÓN ---------
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def measure(operations: Sequence[Callable[[], object]], before: Optional[Callable[[], None]] = None,
+            memory_operation: Optional[Callable[[], object]] = None) -> Dict:
+    """Ejecuta cada operación una vez y devuelve latencias, rendimiento y memoria pico.
+
+    La memoria pico (asignaciones de Python) se mide aparte, bajo tracemalloc, con
+    memory_operation o repitiendo la primera operación, para no inflar los tiempos.
+    """
+    latencies = []
+    gc.collect()
+    started = time.perf_counter()
+    for operation in operations:
+        if before:
+            before()
+        t0 = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+
+    if before:
+        before()
+    tracemalloc.start()
+    (memory_operation or operations[0])()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "ops": len(latencies),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 4),
+        "ops_per_s": round(len(latencies) / sum(latencies), 2) if sum(latencies) else 0.0,
+        "wall_s": round(wall, 4),
+        "peak_kb": round(peak / 1024, 1)
+    }
+
+def run_benchmarks(db_path: str, args: argparse.Namespace) -> Dict[str, Dict]:
+    results: Dict[str, Dict] = {}
+    queries = generate_queries(args.queries, args.vocabulary, args.zipf, args.seed)
+    rng = random.Random(args.seed + 2)
+
+    def report(name: str, stats: Dict) -> None:
+        results[name] = stats
+        print(f"{name:<28} p50 {stats['p50_ms']:>10.3f} ms   p99 {stats['p99_ms']:>10.3f} ms   "
+              f"{stats['ops_per_s']:>10.1f} op/s   pico {stats['peak_kb']:>10.1f} KB", file=sys.stderr)
+
+    with RecipeManager(db_path, bit_matrix=args.bit_matrix) as manager:
+        # Sin caché de consultas: las búsquedas repetidas (Zipf) no miden aciertos
+        report("search_recipes", measure(
+            [lambda q=q: manager.search_recipes(q[0], q[1]) for q in queries],
+            before=manager._query_cache.invalidate
+        ))
+        # Sin caché: cada llamada vuelve a leer la tabla completa
+        report("get_all_recipes", measure(
+            [manager.get_all_recipes] * args.full_scans, before=manager._mark_written
+        ))
+
+        sample = manager.get_recipes_page("Omnívoro", 0, args.queries, ())
+        pairs = [(recipe, diet) for recipe in sample for diet in DIETS]
+        report("_is_recipe_compatible", measure(
+            [lambda p=p: manager._is_recipe_compatible(p[0], p[1]) for p in pairs]
+        ))
+
+        new_records = list(generate_recipes(args.writes, args.vocabulary, args.zipf, args.diet_mix, args.seed + 3))
+        last_id = manager._get_connection().execute("SELECT MAX(id) FROM recetas").fetchone()[0]
+        report("add_recipe", measure([
+            lambda r=r: manager.add_recipe({
+                "name": r["nombre"], "ingredients": r["ingredientes"], "quantities": r["cantidades"],
+                "preparation": r["preparacion"], "cooking_time": r["tiempo_coccion"], "diets": r["dieta"]
+            })
+            for r in new_records
+        ]))
+        added_ids = [row[0] for row in manager._get_connection().execute(
+            "SELECT id FROM recetas WHERE id > ? ORDER BY id", (last_id,)
+        )]
+        report("update_recipe", measure([
+            lambda recipe_id=recipe_id, r=r: manager.update_recipe(recipe_id, {
+                "name": r["nombre"] + " (editada)", "ingredients": r["ingredientes"],
+                "quantities": r["cantidades"], "preparation": r["preparacion"],
+                "cooking_time": r["tiempo_coccion"], "diets": rng.choice(DIETS)
+            })
+            for recipe_id, r in zip(added_ids, new_records)
+        ]))
+        deletes = [lambda recipe_id=recipe_id: manager.delete_recipe(recipe_id) for recipe_id in added_ids]
+        report("delete_recipe", measure(deletes[:-1], memory_operation=deletes[-1]))
+
+    if args.recipes <= args.legacy_limit:
+        legacy_queries = queries[:args.legacy_queries]
+        report("legacy_buscar_recetas", measure(
+            [lambda q=q: buscar_recetas(db_path, q[0], q[1]) for q in legacy_queries]
+        ))
+        conn = sqlite3.connect(db_path)
+        texts = [row[0] for row in conn.execute("SELECT ingredientes FROM recetas LIMIT ?", (args.queries,))]
+        conn.close()
+        report("legacy_filtrar_por_dieta", measure(
+            [lambda t=t, d=d: filtrar_por_dieta(t, d) for t in texts for d in DIETS]
+        ))
+    else:
+        print(f"(lógica anterior omitida: más de {args.legacy_limit:,} recetas)", file=sys.stderr)
+    return results
+
+def recipe_list_bytes(recipes: Sequence[Recipe]) -> int:
+    """Memoria de una lista de Recipe: la lista, cada objeto con su __dict__ y cada
+    campo (como al leer de la base, un objeto por campo y fila)"""
+    size = sys.getsizeof(recipes)
+    for recipe in recipes:
+        size += sys.getsizeof(recipe) + sys.getsizeof(recipe.__dict__)
+        size += sum(sys.getsizeof(value) for value in recipe.__dict__.values())
+    return size
+
+def compact_catalog_bytes(catalog: CompactCatalog) -> int:
+    """Memoria de un CompactCatalog: sus columnas y la tabla de textos compartida"""
+    size = sum(sys.getsizeof(value) for value in vars(catalog).values())
+    return size + sum(sys.getsizeof(text) for text in catalog.texts.strings)
+
+def measure_memory(args: argparse.Namespace) -> Dict[str, Dict]:
+    """Bytes por receta del catálogo en memoria: lista de Recipe (un objeto con cinco
+    textos largos por fila) contra CompactCatalog (columnas y textos internados, sin
+    preparación). Las recetas se generan en memoria, sin pasar por la base."""
+    records = generate_recipes(args.recipes, args.vocabulary, args.zipf, args.diet_mix, args.seed)
+    rows = [
+        (recipe_id, record["nombre"], record["ingredientes"], record["cantidades"], record["preparacion"],
+         record["tiempo_coccion"], record["dieta"], parse_cooking_minutes(record["tiempo_coccion"]))
+        for recipe_id, record in enumerate(records, 1)
+    ]
+    results = {}
+
+    started = time.perf_counter()
+    recipes = [Recipe(*row) for row in rows]
+    elapsed = time.perf_counter() - started
+    results["recipe_list"] = {"bytes": recipe_list_bytes(recipes), "build_s": elapsed}
+    del recipes
+
+    started = time.perf_counter()
+    catalog = CompactCatalog.from_rows((row[:4] + row[5:] for row in rows), lambda recipe_id: "")
+    elapsed = time.perf_counter() - started
+    results["compact_catalog"] = {"bytes": compact_catalog_bytes(catalog), "build_s": elapsed}
+
+    for name, stats in results.items():
+        stats["bytes_per_recipe"] = round(stats["bytes"] / len(rows), 1)
+        stats["build_s"] = round(stats["build_s"], 2)
+        print(f"{name:<28} {stats['bytes_per_recipe']:>10.1f} bytes/receta   "
+              f"{stats['bytes'] / 2 ** 20:>10.1f} MB   {stats['build_s']:>7.2f} s", file=sys.stderr)
+    before, after = (results[name]["bytes_per_recipe"] for name in ("recipe_list", "compact_catalog"))
+    print(f"{'reducción':<28} {before / after:>10.1f}x", file=sys.stderr)
+    return results
+
+# --------- RESULTADOS ---------
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Compara p50 contra la línea de base; devuelve las regresiones"""
+    regressions = []
+    print(f"\n{'benchmark':<28} {'base p50':>12} {'actual p50':>12} {'cambio':>8}", file=sys.stderr)
+    for name, stats in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base["p50_ms"]:
+            print(f"{name:<28} {'-':>12} {stats['p50_ms']:>12.3f}", file=sys.stderr)
+            continue
+        ratio = stats["p50_ms"] / base["p50_ms"]
+        flag = "  REGRESIÓN" if ratio > tolerance else ""
+        print(f"{name:<28} {base['p50_ms']:>12.3f} {stats['p50_ms']:>12.3f} {ratio:>7.2f}x{flag}", file=sys.stderr)
+        if flag:
+            regressions.append(name)
+    if baseline.get("config") != current["config"]:
+        print("Atención: la línea de base se midió con otra configuración", file=sys.stderr)
+    return regressions
+
+def parse_mix(text: str) -> Tuple[float, ...]:
+    weights = tuple(float(value) for value in text.split(","))
+    if len(weights) != len(DIETS) or any(weight < 0 for weight in weights) or not sum(weights):
+        raise argparse.ArgumentTypeError(f"se esperan {len(DIETS)} pesos no negativos ({', '.join(DIETS)})")
+    return weights
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmarks del motor de recetas de Yumlist")
+    parser.add_argument("--recipes", type=int, default=10000, help="recetas del catálogo (por defecto: %(default)s)")
+    parser.add_argument("--vocabulary", type=int, default=1000, help="ingredientes distintos (por defecto: %(default)s)")
+    parser.add_argument("--zipf", type=float, default=1.1, help="exponente Zipf de popularidad (por defecto: %(default)s)")
+    parser.add_argument("--diet-mix", type=parse_mix, default=DEFAULT_DIET_MIX,
+                        help="pesos Omnívoro,Vegetariano,Vegano (por defecto: 0.6,0.25,0.15)")
+    parser.add_argument("--seed", type=int, default=42, help="semilla del generador (por defecto: %(default)s)")
+    parser.add_argument("--queries", type=int, default=200, help="consultas de búsqueda (por defecto: %(default)s)")
+    parser.add_argument("--writes", type=int, default=200, help="altas, ediciones y bajas (por defecto: %(default)s)")
+    parser.add_argument("--full-scans", type=int, default=5, help="repeticiones de get_all_recipes (por defecto: %(default)s)")
+    parser.add_argument("--legacy-queries", type=int, default=5, help="búsquedas con la lógica anterior (por defecto: %(default)s)")
+    parser.add_argument("--legacy-limit", type=int, default=LEGACY_LIMIT,
+                        help="no medir la lógica anterior por encima de estas recetas (por defecto: %(default)s)")
+    parser.add_argument("--bit-matrix", action="store_true",
+                        help="medir RecipeManager con la matriz de bits en NumPy (bitmatrix)")
+    parser.add_argument("--memory", action="store_true",
+                        help="solo medir bytes por receta en memoria (lista de Recipe contra catálogo compacto)")
+    parser.add_argument("--db-dir", default=tempfile.gettempdir(), help="dónde guardar los catálogos generados")
+    parser.add_argument("--output", default="benchmark_results.json", help="archivo JSON de resultados (por defecto: %(default)s)")
+    parser.add_argument("--baseline", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=1.2,
+                        help="factor de p50 a partir del cual se considera regresión (por defecto: %(default)s)")
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    memory = None
+    if args.memory:
+        results: Dict[str, Dict] = {}
+        memory = measure_memory(args)
+    else:
+        results = run_benchmarks(db_path=build_catalog(args), args=args)
+    current = {
+        "config": {
+            "recipes": args.recipes, "vocabulary": args.vocabulary, "zipf": args.zipf,
+            "diet_mix": list(args.diet_mix), "seed": args.seed, "queries": args.queries, "writes": args.writes,
+            "bit_matrix": args.bit_matrix
+        },
+        "environment": {
+            "python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(), "cpus": os.cpu_count()
+        },
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+        "results": results
+    }
+    if memory:
+        current["memory"] = memory
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(current, json.load(f), args.tolerance)
+        if regressions:
+            print(f"Regresiones: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
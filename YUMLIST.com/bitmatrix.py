@@ -0,0 +1,172 @@
+"""Motor de coincidencias opcional con NumPy: matriz de bits receta × ingrediente.
+
+Cada receta es una columna de bits (un bit por ingrediente canónico) y cada grupo
+de 8 ingredientes es una fila contigua de bytes, así que una consulta solo lee las
+filas de sus propios ingredientes, para todo el catálogo de una vez:
+
+- contiene todos:  (bits & consulta) == consulta en cada byte de la consulta
+- dieta:           diet_masks & bit de la dieta (la exclusión de ingredientes
+                   prohibidos ya está en la máscara, calculada al guardar)
+- cobertura:       popcount(bits & consulta), para el puntaje de search_closest
+
+La matriz se actualiza receta por receta en altas, ediciones y bajas. Ocupa
+(ingredientes distintos / 8) bytes por receta: con 1.000 ingredientes y 1M de
+recetas, unos 125 MB. Si NumPy no está instalado, RecipeManager usa SQL.
+"""
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+# Bits en 1 de cada valor de byte (popcount por tabla, válido en cualquier versión de NumPy)
+POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8) if np is not None else None
+
+def available() -> bool:
+    """Indica si NumPy está instalado"""
+    return np is not None
+
+class IngredientBitMatrix:
+    """Matriz de bits receta × ingrediente, vector de dietas y cantidad de ingredientes,
+    indexados por ID de receta"""
+
+    def __init__(self, capacity: int = 1024, ingredients: int = 64):
+        if np is None:
+            raise RuntimeError("IngredientBitMatrix necesita NumPy")
+        self.columns: Dict[str, int] = {}
+        self.bits = np.zeros((max(1, (ingredients + 7) // 8), max(1, capacity)), dtype=np.uint8)
+        self.diet_masks = np.zeros(self.bits.shape[1], dtype=np.uint8)
+        self.sizes = np.zeros(self.bits.shape[1], dtype=np.uint16)
+
+    @classmethod
+    def from_rows(cls, recipes: Iterable[Tuple[int, int, int]], links: Iterable[Tuple[int, int]],
+                  ingredient_names: Iterable[Tuple[int, str]]) -> "IngredientBitMatrix":
+        """Construye la matriz a partir de (id, dieta_mask, num_ingredientes),
+        (receta_id, ingrediente_id) e (ingrediente_id, nombre) de las tablas normalizadas"""
+        recipe_rows = np.fromiter(chain.from_iterable(recipes), dtype=np.int64).reshape(-1, 3)
+        link_rows = np.fromiter(chain.from_iterable(links), dtype=np.int64).reshape(-1, 2)
+        names = list(ingredient_names)
+        max_id = int(recipe_rows[:, 0].max()) if len(recipe_rows) else 0
+        matrix = cls(capacity=max_id + 1, ingredients=len(names))
+        # Columna de cada ingrediente en el orden de sus IDs en la base
+        column_of = np.full(max((ingredient_id for ingredient_id, _ in names), default=0) + 1, -1, dtype=np.int64)
+        for column, (ingredient_id, name) in enumerate(sorted(names)):
+            matrix.columns[name] = column
+            column_of[ingredient_id] = column
+        if len(recipe_rows):
+            matrix.diet_masks[recipe_rows[:, 0]] = recipe_rows[:, 1]
+            matrix.sizes[recipe_rows[:, 0]] = recipe_rows[:, 2]
+        if len(link_rows):
+            columns = column_of[link_rows[:, 1]]
+            np.bitwise_or.at(
+                matrix.bits, (columns >> 3, link_rows[:, 0]), np.left_shift(1, columns & 7).astype(np.uint8)
+            )
+        return matrix
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes + self.diet_masks.nbytes + self.sizes.nbytes
+
+    def _ensure_capacity(self, recipe_id: int) -> None:
+        """Agranda (al doble) los vectores indexados por ID para que entre recipe_id"""
+        capacity = self.bits.shape[1]
+        if recipe_id < capacity:
+            return
+        capacity = max(recipe_id + 1, capacity * 2)
+        bits = np.zeros((self.bits.shape[0], capacity), dtype=np.uint8)
+        bits[:, :self.bits.shape[1]] = self.bits
+        self.bits = bits
+        self.diet_masks = np.concatenate([self.diet_masks, np.zeros(capacity - len(self.diet_masks), np.uint8)])
+        self.sizes = np.concatenate([self.sizes, np.zeros(capacity - len(self.sizes), np.uint16)])
+
+    def _column(self, name: str) -> int:
+        """Columna del ingrediente; agrega una (y duplica el ancho si hace falta) si es nuevo"""
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns[name] = len(self.columns)
+            if column >> 3 >= self.bits.shape[0]:
+                bits = np.zeros((self.bits.shape[0] * 2, self.bits.shape[1]), dtype=np.uint8)
+                bits[:self.bits.shape[0]] = self.bits
+                self.bits = bits
+        return column
+
+    def set_recipe(self, recipe_id: int, ingredients: Iterable[str], diet_mask: int) -> None:
+        """Registra (o reemplaza) la fila de una receta con sus ingredientes canónicos"""
+        names = set(ingredients)
+        columns = [self._column(name) for name in names]
+        self._ensure_capacity(recipe_id)
+        self.bits[:, recipe_id] = 0
+        for column in columns:
+            self.bits[column >> 3, recipe_id] |= 1 << (column & 7)
+        self.diet_masks[recipe_id] = diet_mask
+        self.sizes[recipe_id] = len(names)
+
+    def remove_recipe(self, recipe_id: int) -> None:
+        if recipe_id < self.bits.shape[1]:
+            self.bits[:, recipe_id] = 0
+            self.diet_masks[recipe_id] = 0
+            self.sizes[recipe_id] = 0
+
+    def _query_bytes(self, terms: Iterable[str], skip_unknown: bool = False) -> Optional[Dict[int, int]]:
+        """Bytes de la consulta por fila de la matriz. Un ingrediente que no figura en
+        ninguna receta se omite con skip_unknown; si no, devuelve None"""
+        query: Dict[int, int] = {}
+        for term in terms:
+            column = self.columns.get(term)
+            if column is None:
+                if skip_unknown:
+                    continue
+                return None
+            query[column >> 3] = query.get(column >> 3, 0) | 1 << (column & 7)
+        return query
+
+    def matching_ids(self, terms: Iterable[str], diet_bit: int) -> List[int]:
+        """IDs (en orden) de las recetas de la dieta que contienen todos los ingredientes"""
+        query = self._query_bytes(terms)
+        if query is None:
+            return []
+        selected = (self.diet_masks & diet_bit) != 0
+        for row, value in query.items():
+            selected &= (self.bits[row] & value) == value
+        return np.flatnonzero(selected).tolist()
+
+    def coverage(self, terms: Iterable[str]):
+        """Cantidad de ingredientes de la consulta que tiene cada receta (popcount)"""
+        counts = np.zeros(self.bits.shape[1], dtype=np.uint16)
+        for row, value in self._query_bytes(terms, skip_unknown=True).items():
+            counts += POPCOUNT[self.bits[row] & value]
+        return counts
+
+    def allowed_by_range(self, minutes: Sequence[int], low: Optional[int], high: Optional[int]):
+        """Vector de recetas cuyo tiempo (minutes indexado por ID, -1 = sin tiempo)
+        está en el rango; las que no figuran en minutes quedan fuera"""
+        values = np.full(self.bits.shape[1], -1, dtype=np.int64)
+        count = min(len(minutes), len(values))
+        values[:count] = np.asarray(minutes[:count], dtype=np.int64)
+        allowed = values >= (0 if low is None else low)
+        if high is not None:
+            allowed &= values <= high
+        return allowed
+
+    def closest(self, terms: List[str], diet_bit: int, k: int, allowed=None) -> List[Tuple[float, int, int]]:
+        """Las k mejores (puntaje Jaccard, -faltantes, id) entre las recetas de la dieta
+        (y de allowed, si se indica) con al menos un ingrediente de la consulta, de mejor a peor"""
+        matched = self.coverage(terms)
+        selected = (matched > 0) & ((self.diet_masks & diet_bit) != 0)
+        if allowed is not None:
+            selected &= allowed
+        candidates = np.flatnonzero(selected)
+        if not len(candidates) or k <= 0:
+            return []
+        matched = matched[candidates].astype(np.int64)
+        sizes = np.maximum(self.sizes[candidates].astype(np.int64), matched)
+        scores = matched / (sizes + len(terms) - matched)
+        if len(candidates) > k:
+            # Solo se ordenan en Python los que empatan o superan al k-ésimo puntaje
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            keep = scores >= kth
+            candidates, matched, sizes, scores = candidates[keep], matched[keep], sizes[keep], scores[keep]
+        items = zip(scores.tolist(), (matched - sizes).tolist(), candidates.tolist())
+        return sorted(items, reverse=True)[:k]
@@ -0,0 +1,209 @@
+"""Consultas de recetas desde la línea de comandos, sin interfaz gráfica.
+
+No importa tkinter, pygame ni PIL: sirve en servidores sin pantalla y para
+automatizar o medir consultas. También se llega aquí con `python -m yumlist ...`.
+
+Uso:
+    python cli.py search --diet Vegano arroz,tomate
+    python cli.py search --closest -k 5 arroz,tomate,cebolla --json
+    python cli.py search --max-minutes 20 --sort tiempo huevo
+    python cli.py text "sopa de verduras" --diet Vegetariano
+    python cli.py show 3
+    python cli.py count --diet Vegano
+    python cli.py migrate --backup recetas.antes.db
+    python cli.py serve --port 8080
+    python cli.py shard 4                      # recetas.1-de-4.db ... recetas.4-de-4.db
+    python cli.py --shards 4 search arroz,tomate
+"""
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+from typing import Dict, List
+
+from recipe_manager import DB_NAME, DIET_BITS, SCHEMA_VERSION, RankedRecipe, Recipe, RecipeManager
+from sharded_manager import open_manager, shard_paths, split_catalog
+import api
+import recipe_io
+
+DEFAULT_LIMIT = 20
+
+# --sort de la línea de comandos -> orden de RecipeManager
+SORT_ORDERS = {"id": "id", "tiempo": "minutos", "tiempo-desc": "-minutos"}
+
+def parse_ingredients(values: List[str]) -> List[str]:
+    """Acepta ingredientes separados por comas, por espacios o ambos"""
+    return [ing.strip() for value in values for ing in value.split(",") if ing.strip()]
+
+def ranked_record(ranked: RankedRecipe) -> Dict:
+    record = recipe_io.recipe_record(ranked.recipe)
+    record.update(puntaje=round(ranked.score, 4), coincidencias=ranked.matched, faltan=ranked.missing)
+    return record
+
+def print_recipes(recipes: List[Recipe], as_json: bool) -> None:
+    if as_json:
+        json.dump([recipe_io.recipe_record(recipe) for recipe in recipes], sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    for recipe in recipes:
+        print(f"{recipe.id:>7}  {recipe.name:<35}  {recipe.cooking_time:<10}  {recipe.diets}")
+
+def print_ranked(results: List[RankedRecipe], as_json: bool) -> None:
+    if as_json:
+        json.dump([ranked_record(ranked) for ranked in results], sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    for ranked in results:
+        missing = ", ".join(ranked.missing) or "-"
+        print(f"{ranked.recipe.id:>7}  {ranked.recipe.name:<35}  {ranked.score:5.2f}  faltan: {missing}")
+
+def cmd_search(args: argparse.Namespace) -> int:
+    ingredients = parse_ingredients(args.ingredients)
+    with open_manager(args.db, args.shards, args.bit_matrix) as manager:
+        if args.closest:
+            if not ingredients:
+                print("Error: --closest necesita al menos un ingrediente", file=sys.stderr)
+                return 2
+            print_ranked(manager.search_closest(ingredients, args.diet, args.limit, args.min_minutes, args.max_minutes),
+                         args.json)
+            return 0
+        total = manager.count_recipes(args.diet, ingredients, args.min_minutes, args.max_minutes)
+        recipes = manager.get_recipes_page(
+            args.diet, args.offset, args.limit, ingredients,
+            args.min_minutes, args.max_minutes, SORT_ORDERS[args.sort]
+        )
+        print_recipes(recipes, args.json)
+    if not args.json:
+        print(f"-- {len(recipes)} de {total} recetas", file=sys.stderr)
+    return 0
+
+def cmd_text(args: argparse.Namespace) -> int:
+    with open_manager(args.db, args.shards, args.bit_matrix) as manager:
+        print_recipes(manager.search_text(" ".join(args.text), args.diet, args.limit, args.min_minutes, args.max_minutes),
+                      args.json)
+    return 0
+
+def cmd_show(args: argparse.Namespace) -> int:
+    with open_manager(args.db, args.shards, args.bit_matrix) as manager:
+        recipe = manager.get_recipe(args.id)
+    if recipe is None:
+        print(f"Error: no existe la receta {args.id}", file=sys.stderr)
+        return 1
+    if args.json:
+        json.dump(recipe_io.recipe_record(recipe), sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+    print(f"{recipe.name} ({recipe.cooking_time}, {recipe.diets})\n")
+    print("Ingredientes:")
+    for ingredient, quantity in zip(recipe.ingredients.split(","), recipe.quantities.split(",")):
+        print(f"  - {ingredient.strip()}: {quantity.strip()}")
+    print(f"\nPreparación:\n{recipe.preparation}")
+    return 0
+
+def cmd_count(args: argparse.Namespace) -> int:
+    with open_manager(args.db, args.shards, args.bit_matrix) as manager:
+        print(manager.count_recipes(args.diet, parse_ingredients(args.ingredients), args.min_minutes, args.max_minutes))
+    return 0
+
+def cmd_migrate(args: argparse.Namespace) -> int:
+    # La versión se lee sin RecipeManager, que migraría la base al abrirla
+    source = sqlite3.connect(args.db)
+    try:
+        before = source.execute("PRAGMA user_version").fetchone()[0]
+        if args.backup and before != SCHEMA_VERSION:
+            with sqlite3.connect(args.backup) as backup:
+                source.backup(backup)
+            print(f"Copia de seguridad en {args.backup}", file=sys.stderr)
+    finally:
+        source.close()
+    if before == SCHEMA_VERSION:
+        print(f"El esquema ya está en la versión {SCHEMA_VERSION}", file=sys.stderr)
+        return 0
+    with RecipeManager(args.db) as manager:
+        after = manager.schema_version()
+        stats = manager.catalog_stats()
+    print(
+        f"Esquema migrado de la versión {before} a la {after}: {stats['recetas']:,} recetas, "
+        f"{stats['ingredientes']:,} ingredientes distintos, {stats['receta_ingredientes']:,} filas receta-ingrediente",
+        file=sys.stderr
+    )
+    return 0 if after == SCHEMA_VERSION else 1
+
+def cmd_shard(args: argparse.Namespace) -> int:
+    if args.count < 2:
+        print("Error: se necesitan al menos 2 fragmentos", file=sys.stderr)
+        return 2
+    try:
+        report = split_catalog(args.db, args.target or args.db, args.count, progress=recipe_io.print_progress)
+    except FileExistsError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(file=sys.stderr)
+    paths = ", ".join(shard_paths(args.target or args.db, args.count))
+    print(f"{report.inserted:,} recetas repartidas en {args.count} fragmentos: {paths}", file=sys.stderr)
+    return 0
+
+def add_time_filters(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--min-minutes", type=int, help="tiempo de cocción mínimo en minutos")
+    parser.add_argument("--max-minutes", type=int, help="tiempo de cocción máximo en minutos")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="yumlist", description="Consultas de recetas de Yumlist sin interfaz gráfica")
+    parser.add_argument("--db", default=DB_NAME, help="base de datos SQLite (por defecto: %(default)s)")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="usar el catálogo repartido en N fragmentos de --db (creado con el comando shard)")
+    parser.add_argument("--bit-matrix", action="store_true",
+                        help="búsquedas por ingredientes con la matriz de bits en NumPy (si está instalado)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="recetas que contienen todos los ingredientes")
+    search.add_argument("ingredients", nargs="*", help="ingredientes separados por comas")
+    search.add_argument("--diet", choices=list(DIET_BITS), default="Omnívoro", help="dieta (por defecto: %(default)s)")
+    search.add_argument("--closest", action="store_true", help="mejores coincidencias aunque falten ingredientes")
+    search.add_argument("--limit", "-k", type=int, default=DEFAULT_LIMIT, help="máximo de resultados (por defecto: %(default)s)")
+    search.add_argument("--offset", type=int, default=0, help="resultados a saltear (paginación)")
+    search.add_argument("--sort", choices=list(SORT_ORDERS), default="id", help="orden de los resultados (por defecto: %(default)s)")
+    add_time_filters(search)
+    search.add_argument("--json", action="store_true", help="salida en JSON")
+    search.set_defaults(handler=cmd_search)
+
+    text = commands.add_parser("text", help="búsqueda de texto libre por relevancia")
+    text.add_argument("text", nargs="+", help="palabras a buscar")
+    text.add_argument("--diet", choices=list(DIET_BITS), help="filtrar por dieta")
+    text.add_argument("--limit", "-k", type=int, default=DEFAULT_LIMIT, help="máximo de resultados (por defecto: %(default)s)")
+    add_time_filters(text)
+    text.add_argument("--json", action="store_true", help="salida en JSON")
+    text.set_defaults(handler=cmd_text)
+
+    show = commands.add_parser("show", help="detalle de una receta")
+    show.add_argument("id", type=int, help="ID de la receta")
+    show.add_argument("--json", action="store_true", help="salida en JSON")
+    show.set_defaults(handler=cmd_show)
+
+    count = commands.add_parser("count", help="cantidad de recetas que coinciden")
+    count.add_argument("ingredients", nargs="*", help="ingredientes separados por comas")
+    count.add_argument("--diet", choices=list(DIET_BITS), default="Omnívoro", help="dieta (por defecto: %(default)s)")
+    add_time_filters(count)
+    count.set_defaults(handler=cmd_count)
+
+    migrate = commands.add_parser("migrate", help="lleva la base al esquema actual (normalizado)")
+    migrate.add_argument("--backup", help="copia la base a este archivo antes de migrar")
+    migrate.set_defaults(handler=cmd_migrate)
+
+    shard = commands.add_parser("shard", help="reparte el catálogo de --db en varios fragmentos")
+    shard.add_argument("count", type=int, help="cantidad de fragmentos")
+    shard.add_argument("--target", help="nombre base de los fragmentos (por defecto: el de --db)")
+    shard.set_defaults(handler=cmd_shard)
+
+    recipe_io.add_commands(commands)
+    api.add_commands(commands)
+    return parser
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""Catálogo compacto en memoria: una receta ocupa unos pocos enteros, no un objeto.
+
+Las columnas se guardan en arreglos (`array`) en lugar de un objeto Recipe por fila:
+
+- IDs, minutos y desplazamientos: enteros de 4 bytes.
+- Nombres: un solo texto concatenado con desplazamientos (sin un str por receta).
+- Ingredientes y cantidades: cada elemento de la lista se interna una sola vez en
+  una tabla de textos compartida; la receta guarda solo sus IDs.
+- Tiempo de cocción y dietas: también internados (se repiten mucho).
+- La preparación, el texto más largo, no se carga: se lee de la base al pedirla.
+
+Cada acceso devuelve un CompactRecipe, una vista con __slots__ que reconstruye los
+textos a demanda y expone los mismos atributos que Recipe.
+"""
+from array import array
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+class StringTable:
+    """Tabla de textos internados: cada texto distinto se guarda una sola vez"""
+    __slots__ = ("strings", "_ids")
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, text: str) -> int:
+        text_id = self._ids.get(text)
+        if text_id is None:
+            text_id = self._ids[text] = len(self.strings)
+            self.strings.append(text)
+        return text_id
+
+    def __getitem__(self, text_id: int) -> str:
+        return self.strings[text_id]
+
+    def freeze(self) -> None:
+        """Descarta el índice de internado (la tabla queda de solo lectura)"""
+        self._ids = {}
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+class CompactRecipe:
+    """Vista de una fila del catálogo compacto (mismos atributos que Recipe)"""
+    __slots__ = ("_catalog", "_row")
+
+    def __init__(self, catalog: "CompactCatalog", row: int):
+        self._catalog = catalog
+        self._row = row
+
+    @property
+    def id(self) -> int:
+        return self._catalog.ids[self._row]
+
+    @property
+    def name(self) -> str:
+        return self._catalog.name(self._row)
+
+    @property
+    def ingredients(self) -> str:
+        return ",".join(self._catalog.ingredient_names(self._row))
+
+    @property
+    def quantities(self) -> str:
+        return ",".join(self._catalog.quantity_texts(self._row))
+
+    @property
+    def preparation(self) -> str:
+        return self._catalog.preparation(self.id)
+
+    @property
+    def cooking_time(self) -> str:
+        return self._catalog.texts[self._catalog.cooking_times[self._row]]
+
+    @property
+    def diets(self) -> str:
+        return self._catalog.texts[self._catalog.diets[self._row]]
+
+    @property
+    def minutes(self) -> Optional[int]:
+        minutes = self._catalog.minutes[self._row]
+        return None if minutes < 0 else minutes
+
+    def astuple(self) -> Tuple:
+        """Campos en el orden de Recipe (lee la preparación de la base)"""
+        return (self.id, self.name, self.ingredients, self.quantities, self.preparation,
+                self.cooking_time, self.diets, self.minutes)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CompactRecipe):
+            return self._catalog is other._catalog and self._row == other._row
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((id(self._catalog), self._row))
+
+    def __repr__(self) -> str:
+        return f"CompactRecipe(id={self.id}, name={self.name!r})"
+
+class CompactCatalog:
+    """Catálogo de solo lectura en columnas, ordenado por ID (se reconstruye al cambiar
+    la base, igual que el resto de la caché de RecipeManager)"""
+
+    def __init__(self, preparation_loader: Callable[[int], str]):
+        self.preparation = preparation_loader
+        self.ids = array("I")
+        self.minutes = array("i")
+        self.cooking_times = array("I")
+        self.diets = array("I")
+        # Desplazamientos de inicio de cada fila (con uno extra al final)
+        self.name_offsets = array("I", [0])
+        self.ingredient_offsets = array("I", [0])
+        self.quantity_offsets = array("I", [0])
+        self.ingredient_ids = array("I")
+        self.quantity_ids = array("I")
+        self.names = ""
+        # Textos compartidos: elementos de ingredientes y cantidades, tiempos y dietas
+        self.texts = StringTable()
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, str, str, str, str, str, Optional[int]]],
+                  preparation_loader: Callable[[int], str]) -> "CompactCatalog":
+        """Construye el catálogo desde filas (id, nombre, ingredientes, cantidades,
+        tiempo_coccion, dieta, minutos) en orden de ID"""
+        catalog = cls(preparation_loader)
+        intern = catalog.texts.intern
+        names: List[str] = []
+        name_end = 0
+        for recipe_id, name, ingredients, quantities, cooking_time, diets, minutes in rows:
+            catalog.ids.append(recipe_id)
+            catalog.minutes.append(-1 if minutes is None else minutes)
+            catalog.cooking_times.append(intern(cooking_time or ""))
+            catalog.diets.append(intern(diets or ""))
+            names.append(name)
+            name_end += len(name)
+            catalog.name_offsets.append(name_end)
+            # split(",") sin limpiar espacios: ",".join reconstruye el texto exacto
+            catalog.ingredient_ids.extend(intern(item) for item in (ingredients or "").split(","))
+            catalog.ingredient_offsets.append(len(catalog.ingredient_ids))
+            catalog.quantity_ids.extend(intern(item) for item in (quantities or "").split(","))
+            catalog.quantity_offsets.append(len(catalog.quantity_ids))
+        catalog.names = "".join(names)
+        # El índice de internado solo hace falta mientras se construye
+        catalog.texts.freeze()
+        return catalog
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[CompactRecipe]:
+        return (CompactRecipe(self, row) for row in range(len(self.ids)))
+
+    def __getitem__(self, row: int) -> CompactRecipe:
+        if row < 0:
+            row += len(self.ids)
+        if not 0 <= row < len(self.ids):
+            raise IndexError("fila fuera de rango")
+        return CompactRecipe(self, row)
+
+    def row_of(self, recipe_id: int) -> Optional[int]:
+        """Fila de una receta por ID (búsqueda binaria), o None si no está"""
+        row = bisect_left(self.ids, recipe_id)
+        return row if row < len(self.ids) and self.ids[row] == recipe_id else None
+
+    def get(self, recipe_id: int) -> Optional[CompactRecipe]:
+        row = self.row_of(recipe_id)
+        return None if row is None else CompactRecipe(self, row)
+
+    def get_many(self, recipe_ids: Sequence[int]) -> List[CompactRecipe]:
+        """Recetas indicadas respetando el orden (se omiten los IDs inexistentes)"""
+        return [recipe for recipe in map(self.get, recipe_ids) if recipe is not None]
+
+    def name(self, row: int) -> str:
+        return self.names[self.name_offsets[row]:self.name_offsets[row + 1]]
+
+    def ingredient_names(self, row: int) -> List[str]:
+        strings = self.texts.strings
+        return [strings[text_id] for text_id in
+                self.ingredient_ids[self.ingredient_offsets[row]:self.ingredient_offsets[row + 1]]]
+
+    def quantity_texts(self, row: int) -> List[str]:
+        strings = self.texts.strings
+        return [strings[text_id] for text_id in
+                self.quantity_ids[self.quantity_offsets[row]:self.quantity_offsets[row + 1]]]
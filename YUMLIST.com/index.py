@@ -1,78 +1,19 @@
-import pygame
+from startup import STARTUP, BackgroundRecipeManager, cached_button_image, cached_image
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
-import sqlite3
 import os
+from widgets import VirtualTreeview
 
-# --- FUNCIONES PARA CREAR BOTONES OVALADOS PNG CON PYGAME ---
+# --- BOTONES OVALADOS ---
 def crear_boton_ovalado(texto, color, color_borde, color_texto, ancho=140, alto=44):
-    """Devuelve un botón ovalado con el texto, listo para PhotoImage Tkinter."""
-    pygame.init()
-    surface = pygame.Surface((ancho, alto), pygame.SRCALPHA)
-    # Fondo ovalado
-    pygame.draw.ellipse(surface, color, (0, 0, ancho, alto))
-    pygame.draw.ellipse(surface, color_borde, (0, 0, ancho, alto), 3)
-    font = pygame.font.SysFont("Arial", 21, bold=True)
-    rendered_text = font.render(texto, True, color_texto)
-    rect = rendered_text.get_rect(center=(ancho//2, alto//2))
-    surface.blit(rendered_text, rect)
-    raw = pygame.image.tostring(surface, "RGBA")
-    img = Image.frombytes("RGBA", (ancho, alto), raw)
-    return ImageTk.PhotoImage(img)
-
-# --------- BASE DE DATOS ---------
-def crear_base_datos():
-    conn = sqlite3.connect("recetas.db")
-    cursor = conn.cursor()
-    cursor.execute("PRAGMA table_info(recetas)")
-    columns = [col[1] for col in cursor.fetchall()]
-    if 'dieta' not in columns:
-        try:
-            cursor.execute("ALTER TABLE recetas ADD COLUMN dieta TEXT DEFAULT 'Omnívoro'")
-        except:
-            pass
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS recetas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nombre TEXT NOT NULL,
-            ingredientes TEXT NOT NULL,
-            cantidades TEXT NOT NULL,
-            preparacion TEXT NOT NULL,
-            tiempo_coccion TEXT NOT NULL,
-            dieta TEXT DEFAULT 'Omnívoro'
-        )
-    ''')
-    cursor.execute("SELECT COUNT(*) FROM recetas")
-    if cursor.fetchone()[0] == 0:
-        recetas_ejemplo = [
-            ("Tortilla de papa", "papa, huevo, cebolla, sal, aceite", "3 papas, 3 huevos, 1 cebolla, sal, aceite", "Freír papas y cebolla. Mezclar con huevo batido. Cocinar en sartén.", "25 minutos", "Omnívoro"),
-            ("Ensalada fresca", "lechuga, tomate, zanahoria, sal, aceite", "4 hojas lechuga, 1 tomate, 1 zanahoria, 1 cdita sal, 1 cda aceite", "Lavar y cortar los vegetales. Mezclar con aceite y sal.", "10 minutos", "Vegano,Vegetariano,Omnívoro")
-        ]
-        cursor.executemany(
-            "INSERT INTO recetas (nombre, ingredientes, cantidades, preparacion, tiempo_coccion, dieta) VALUES (?, ?, ?, ?, ?, ?)",
-            recetas_ejemplo
-        )
-    conn.commit()
-    conn.close()
+    """Devuelve un botón ovalado con el texto, listo para PhotoImage Tkinter.
+    Se dibuja con pygame solo la primera vez; luego se lee de la caché en disco."""
+    return cached_button_image(texto, color, color_borde, color_texto, ancho, alto)
 
 # --------- FUNCIONES DE LÓGICA ---------
-INGR_PROHIBIDOS = {
-    "Vegano": {"huevo", "huevos", "queso", "pollo", "carne", "leche", "miel", "mantequilla", "yogur"},
-    "Vegetariano": {"pollo", "carne"},
-    "Omnívoro": set()
-}
-
-def filtrar_por_dieta(ingredientes_text, dieta, dieta_receta):
-    if dieta not in [d.strip() for d in dieta_receta.split(",")]:
-        return False
-    ingredientes_set = set(i.strip().lower() for i in ingredientes_text.split(","))
-    prohibidos = INGR_PROHIBIDOS.get(dieta, set())
-    return len(prohibidos.intersection(ingredientes_set)) == 0
-
 def buscar_recetas():
     entrada = entrada_ingredientes.get().lower()
-    resultados.delete(*resultados.get_children())
+    resultados.clear()
     limpiar_detalle()
     error_label.config(text="", fg="red")
     if not entrada.strip():
@@ -83,50 +24,34 @@ def buscar_recetas():
         error_label.config(text="Debes ingresar ingredientes separados por comas.")
         return
     dieta = dieta_seleccionada.get()
-    conn = sqlite3.connect("recetas.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM recetas")
-    recetas = cursor.fetchall()
-    conn.close()
-    encontrados = 0
-    for receta in recetas:
-        ingredientes_receta = receta[2].lower()
-        dieta_receta = receta[6] if len(receta) > 6 else "Omnívoro"
-        if not filtrar_por_dieta(ingredientes_receta, dieta, dieta_receta):
-            continue
-        if all(i in ingredientes_receta for i in ingredientes_usuario):
-            resultados.insert("", "end", iid=receta[0], values=(receta[1], receta[5], receta[3]))
-            encontrados += 1
-    if encontrados == 0:
+    # Intersección de listas de ocurrencias en el índice de ingredientes
+    total = gestor.count_recipes(dieta, ingredientes_usuario)
+    mostrar_resultados(total, dieta, ingredientes_usuario)
+    if not total:
         error_label.config(text="No se encontraron recetas con esos ingredientes para la dieta seleccionada.")
 
 def mostrar_todas():
-    resultados.delete(*resultados.get_children())
+    resultados.clear()
     limpiar_detalle()
     error_label.config(text="", fg="red")
     dieta = dieta_seleccionada.get()
-    conn = sqlite3.connect("recetas.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM recetas")
-    recetas = cursor.fetchall()
-    conn.close()
-    for receta in recetas:
-        ingredientes_receta = receta[2].lower()
-        dieta_receta = receta[6] if len(receta) > 6 else "Omnívoro"
-        if filtrar_por_dieta(ingredientes_receta, dieta, dieta_receta):
-            resultados.insert("", "end", iid=receta[0], values=(receta[1], receta[5], receta[3]))
+    # Una sola consulta indexada sobre la máscara de dietas precalculada
+    mostrar_resultados(gestor.count_recipes(dieta), dieta)
+
+def mostrar_resultados(total, dieta, ingredientes=()):
+    # Solo se piden a la base las filas visibles en la tabla virtualizada
+    def pagina(offset, limite):
+        return [(r.id, (r.name, r.cooking_time, r.quantities))
+                for r in gestor.get_recipes_page(dieta, offset, limite, ingredientes)]
+    resultados.set_source(total, pagina)
 
 def mostrar_detalle(event):
     item = resultados.focus()
     if not item:
         return
-    conn = sqlite3.connect("recetas.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT ingredientes, cantidades, preparacion FROM recetas WHERE id=?", (item,))
-    data = cursor.fetchone()
-    conn.close()
-    if data:
-        ingredientes, cantidades, preparacion = data
+    receta = gestor.get_recipe(int(item))
+    if receta:
+        ingredientes, cantidades, preparacion = receta.ingredients, receta.quantities, receta.preparation
         texto = f"Ingredientes:\n{ingredientes}\n\nCantidades:\n{cantidades}"
         detalle_text.config(state="normal")
         detalle_text.delete("1.0", tk.END)
@@ -144,23 +69,44 @@ def limpiar_detalle():
 def limpiar_busqueda():
     entrada_ingredientes.delete(0, tk.END)
     limpiar_detalle()
-    resultados.delete(*resultados.get_children())
+    resultados.clear()
     error_label.config(text="")
 
+# Búsqueda en vivo: se ejecuta al dejar de escribir; al agregar un ingrediente
+# el gestor refina en memoria el resultado anterior
+RETARDO_BUSQUEDA_MS = 150
+busqueda_pendiente = None
+ultima_busqueda = None
+
+def programar_busqueda(event=None):
+    global busqueda_pendiente
+    if busqueda_pendiente is not None:
+        app.after_cancel(busqueda_pendiente)
+    busqueda_pendiente = app.after(RETARDO_BUSQUEDA_MS, buscar_en_vivo)
+
+def buscar_en_vivo():
+    global busqueda_pendiente, ultima_busqueda
+    busqueda_pendiente = None
+    entrada = entrada_ingredientes.get().lower()
+    if entrada == ultima_busqueda:
+        return
+    ultima_busqueda = entrada
+    if entrada.strip():
+        buscar_recetas()
+    else:
+        mostrar_todas()
+
 def ventana_alimento(modo="agregar"):
     if modo == "editar":
         item = resultados.focus()
         if not item:
             messagebox.showerror("Error", "Selecciona una receta para editar.")
             return
-        conn = sqlite3.connect("recetas.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT nombre, ingredientes, cantidades, preparacion, tiempo_coccion, dieta FROM recetas WHERE id=?", (item,))
-        data = cursor.fetchone()
-        conn.close()
-        if not data:
+        receta = gestor.get_recipe(int(item))
+        if not receta:
             messagebox.showerror("Error", "No se pudo obtener la receta.")
             return
+        data = (receta.name, receta.ingredients, receta.quantities, receta.preparation, receta.cooking_time, receta.diets)
     else:
         data = ("", "", "", "", "", "")
 
@@ -178,17 +124,22 @@ def ventana_alimento(modo="agregar"):
             messagebox.showerror("Error", "Todos los campos y al menos una dieta son requeridos.")
             return
         dieta_str = ",".join(dietas_sel)
-        conn = sqlite3.connect("recetas.db")
-        cursor = conn.cursor()
+        datos = {
+            "name": nombre,
+            "ingredients": ingredientes,
+            "quantities": cantidades,
+            "preparation": preparacion,
+            "cooking_time": tiempo,
+            "diets": dieta_str
+        }
+        # Las escrituras pasan por el gestor para mantener el índice de ingredientes
         if modo == "agregar":
-            cursor.execute("INSERT INTO recetas (nombre, ingredientes, cantidades, preparacion, tiempo_coccion, dieta) VALUES (?, ?, ?, ?, ?, ?)",
-                           (nombre, ingredientes, cantidades, preparacion, tiempo, dieta_str))
+            ok = gestor.add_recipe(datos)
         else:
-            rid = item
-            cursor.execute("UPDATE recetas SET nombre=?, ingredientes=?, cantidades=?, preparacion=?, tiempo_coccion=?, dieta=? WHERE id=?",
-                           (nombre, ingredientes, cantidades, preparacion, tiempo, dieta_str, rid))
-        conn.commit()
-        conn.close()
+            ok = gestor.update_recipe(int(item), datos)
+        if not ok:
+            messagebox.showerror("Error", "No se pudo guardar la receta.")
+            return
         win.destroy()
         mostrar_todas()
 
@@ -238,14 +189,15 @@ def eliminar_alimento():
         return
     nombre = resultados.item(item, "values")[0]
     if messagebox.askyesno("Confirmar", f"¿Seguro que deseas eliminar '{nombre}'?"):
-        conn = sqlite3.connect("recetas.db")
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM recetas WHERE id=?", (item,))
-        conn.commit()
-        conn.close()
+        if not gestor.delete_recipe(int(item)):
+            messagebox.showerror("Error", "No se pudo eliminar la receta.")
+            return
         mostrar_todas()
 
 # -------- INTERFAZ TKINTER --------
+# Migraciones del esquema y carga inicial en segundo plano mientras se construye la ventana
+gestor = BackgroundRecipeManager()
+
 app = tk.Tk()
 app.title("Yumlist - Gestor de Recetas")
 app.geometry("980x700")
@@ -253,8 +205,8 @@ app.geometry("980x700")
 # Fondo principal
 bg_image_path = "imagen.jpg"
 if os.path.exists(bg_image_path):
-    img = Image.open(bg_image_path).resize((980, 700))
-    bg_img = ImageTk.PhotoImage(img)
+    # Ya redimensionada en la caché de imágenes: sin decodificar el JPEG completo
+    bg_img = cached_image(bg_image_path, (980, 700))
     bg_label = tk.Label(app, image=bg_img)
     bg_label.place(x=0, y=0, relwidth=1, relheight=1)
 
@@ -270,8 +222,7 @@ frame_logo = tk.Frame(app, bg="#f3f9f1")
 frame_logo.pack(pady=10)
 try:
     if os.path.exists("logo.jpg"):
-        img_logo = Image.open("logo.jpg").resize((100, 100))
-        logo_img = ImageTk.PhotoImage(img_logo)
+        logo_img = cached_image("logo.jpg", (100, 100))
         label_logo = tk.Label(frame_logo, image=logo_img, bg="#f3f9f1")
         label_logo.image = logo_img
     else:
@@ -305,6 +256,7 @@ label = tk.Label(frame_busqueda, text="Ingredientes disponibles (separados por c
 label.grid(row=0, column=0, columnspan=7, pady=3, sticky="w")
 entrada_ingredientes = tk.Entry(frame_busqueda, width=52, font=("Arial", 12))
 entrada_ingredientes.grid(row=1, column=0, columnspan=6, padx=3, pady=5, sticky="w")
+entrada_ingredientes.bind("<KeyRelease>", programar_busqueda)
 
 # Botones ovalados en su propio frame y bien separados
 frame_botones = tk.Frame(frame_busqueda, bg="#d0f0c0")
@@ -336,12 +288,15 @@ error_label.pack()
 frame_resultados = tk.Frame(app, bg="#f3f9f1")
 frame_resultados.pack(fill="both", expand=True, padx=8, pady=(5,0))
 columnas = ("Nombre", "Tiempo", "Preparación")
-resultados = ttk.Treeview(frame_resultados, columns=columnas, show="headings", height=8, selectmode="browse")
+resultados = VirtualTreeview(frame_resultados, columns=columnas, show="headings", height=8, selectmode="browse")
 for col in columnas:
     resultados.heading(col, text=col)
     resultados.column(col, width=260 if col != "Preparación" else 360)
 resultados.pack(fill="both", expand=True)
 resultados.bind("<<TreeviewSelect>>", mostrar_detalle)
+barra_resultados = ttk.Scrollbar(resultados, orient="vertical")
+barra_resultados.pack(side="right", fill="y")
+resultados.set_scrollbar(barra_resultados)
 
 # Detalle de ingredientes y cantidades
 frame_detalle = tk.Frame(app, bg="#e2f0d9", bd=0)
@@ -361,6 +316,8 @@ paso_paso_text.delete("1.0", tk.END)
 paso_paso_text.insert(tk.END, "Paso a paso")
 paso_paso_text.config(state="disabled")
 
-crear_base_datos()
-mostrar_todas()
-app.mainloop()
\ No newline at end of file
+STARTUP.mark("interfaz construida")
+STARTUP.watch_first_frame(app)
+gestor.when_ready(app, mostrar_todas)
+app.mainloop()
+gestor.close()
\ No newline at end of file
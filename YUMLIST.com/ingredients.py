@@ -0,0 +1,100 @@
+"""Normalización de nombres de ingredientes.
+
+Cada nombre pasa por: minúsculas y espacios, eliminación de tildes (se conserva
+la ñ), singular en español palabra por palabra y tabla de sinónimos. El resultado
+es el nombre canónico que se guarda en la tabla `ingredientes`; su id es el que
+se compara en las búsquedas.
+
+Se aplica una vez al guardar cada receta y una vez por ingrediente de la consulta,
+nunca por fila durante una búsqueda. Si cambian las reglas o los sinónimos, hace
+falta una migración que reconstruya las tablas normalizadas.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+# Palabras que no se pasan a singular ("diente de ajo", "pan con ajo")
+CONNECTORS = {"de", "del", "con", "sin", "en", "al", "a", "la", "el", "las", "los", "y"}
+
+# Plurales que las reglas generales resuelven mal
+IRREGULAR_SINGULARS = {
+    "carnes": "carne",
+    "chiles": "chile",
+    "leches": "leche",
+    "especies": "especie",
+    "ajies": "aji",
+    "manies": "mani",
+    "tes": "te"
+}
+
+# Palabras terminadas en "s" que ya son singulares
+INVARIABLE = {"ananas", "anis", "cuscus", "gas"}
+
+# Plural con "-es" tras estas consonantes: limones -> limón, nopales -> nopal
+ES_PLURAL_STEMS = set("lnrdjy")
+
+# Variante (ya normalizada y en singular) -> nombre canónico
+SYNONYMS = {
+    "patata": "papa",
+    "jitomate": "tomate",
+    "palta": "aguacate",
+    "habichuela": "frijol",
+    "poroto": "frijol",
+    "alubia": "frijol",
+    "judia": "frijol",
+    "choclo": "maiz",
+    "elote": "maiz",
+    "zapallo": "calabaza",
+    "ayote": "calabaza",
+    "zucchini": "calabacin",
+    "arveja": "guisante",
+    "chicharo": "guisante",
+    "betabel": "remolacha",
+    "frutilla": "fresa",
+    "cacahuate": "mani",
+    "cacahuete": "mani",
+    "gamba": "camaron",
+    "puerco": "cerdo",
+    "chancho": "cerdo",
+    "carne de res": "carne",
+    "carne molida": "carne",
+    "spaghetti": "espagueti",
+    "espaguetti": "espagueti",
+    "yogurt": "yogur",
+    "huevo de gallina": "huevo",
+    "manteca de vaca": "mantequilla"
+}
+
+def fold_accents(text: str) -> str:
+    """Quita tildes y diéresis; conserva la ñ"""
+    decomposed = unicodedata.normalize("NFD", text)
+    folded = []
+    for char in decomposed:
+        if unicodedata.combining(char):
+            # La tilde de la ñ es la única que distingue palabras
+            if char == "\u0303" and folded and folded[-1] in "nN":
+                folded[-1] = "ñ" if folded[-1] == "n" else "Ñ"
+            continue
+        folded.append(char)
+    return "".join(folded)
+
+def singularize(word: str) -> str:
+    """Singular de una palabra en español (ya en minúsculas y sin tildes)"""
+    if word in IRREGULAR_SINGULARS:
+        return IRREGULAR_SINGULARS[word]
+    if len(word) <= 3 or word in INVARIABLE or not word.endswith("s"):
+        return word
+    if word.endswith("ces"):
+        return word[:-3] + "z"  # nueces -> nuez
+    if word.endswith("es") and word[-3] in ES_PLURAL_STEMS:
+        return word[:-2]  # limones -> limon, frijoles -> frijol
+    if word[-2] in "aeiou":
+        return word[:-1]  # papas -> papa, tomates -> tomate
+    return word
+
+@lru_cache(maxsize=65536)
+def normalize_ingredient(name: str) -> str:
+    """Nombre canónico de un ingrediente ("Huevos " -> "huevo", "Patatas" -> "papa")"""
+    words = re.findall(r"[^\W_]+", fold_accents(name.lower()))
+    canonical = " ".join(word if word in CONNECTORS else singularize(word) for word in words)
+    return SYNONYMS.get(canonical, canonical)
@@ -1,12 +1,16 @@
+from startup import STARTUP, BackgroundRecipeManager, cached_image
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-from PIL import Image, ImageTk
-import sqlite3
 import os
 import logging
-from typing import List, Dict, Tuple, Optional, Set
-from dataclasses import dataclass
+from typing import List, Optional, TYPE_CHECKING
 import platform
+from widgets import VirtualTreeview
+from query_executor import QueryExecutor
+
+if TYPE_CHECKING:
+    # Solo para las anotaciones: recipe_manager se importa en segundo plano (BackgroundRecipeManager)
+    from recipe_manager import Recipe
 
 # Configuración de logging para depuración
 logging.basicConfig(
@@ -20,7 +24,6 @@ logger = logging.getLogger(__name__)
 # Constantes y configuración
 APP_NAME = "Yumlist - Gestor de Recetas Inteligente"
 APP_VERSION = "2.0"
-DB_NAME = "recetas.db"
 DEFAULT_IMAGE_SIZE = (980, 700)
 LOGO_SIZE = (100, 100)
 BUTTON_SIZE = (140, 44)
@@ -28,6 +31,12 @@ FONT_TITLE = ("Arial", 24, "bold")
 FONT_SUBTITLE = ("Arial", 12, "bold")
 FONT_NORMAL = ("Arial", 11)
 FONT_SMALL = ("Arial", 10)
+TEXT_SEARCH_LIMIT = 200
+CLOSEST_MATCH_LIMIT = 50
+LIVE_SEARCH_DELAY_MS = 150
+# Clic en el encabezado "Tiempo": por ID -> más rápidas primero -> más lentas primero
+TIME_ORDERS = ("id", "minutos", "-minutos")
+TIME_HEADINGS = {"id": "Tiempo", "minutos": "Tiempo ▲", "-minutos": "Tiempo ▼"}
 COLORS = {
     "primary": "#4CAF50",
     "primary_dark": "#388E3C",
@@ -42,181 +51,6 @@ COLORS = {
     "info": "#2196F3"
 }
 
-@dataclass
-class Recipe:
-    id: int
-    name: str
-    ingredients: str
-    quantities: str
-    preparation: str
-    cooking_time: str
-    diets: str
-
-class RecipeManager:
-    """Clase para gestionar las operaciones con recetas en la base de datos"""
-    
-    INGREDIENT_RESTRICTIONS = {
-        "Vegano": {"huevo", "huevos", "queso", "pollo", "carne", "leche", "miel", "mantequilla", "yogur"},
-        "Vegetariano": {"pollo", "carne"},
-        "Omnívoro": set()
-    }
-    
-    def __init__(self, db_name: str = DB_NAME):
-        self.db_name = db_name
-        self._initialize_db()
-    
-    def _initialize_db(self) -> None:
-        """Inicializa la base de datos con la estructura necesaria"""
-        try:
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                
-                # Verificar si existe la columna 'dieta'
-                cursor.execute("PRAGMA table_info(recetas)")
-                columns = [col[1] for col in cursor.fetchall()]
-                
-                if 'dieta' not in columns:
-                    cursor.execute("ALTER TABLE recetas ADD COLUMN dieta TEXT DEFAULT 'Omnívoro'")
-                
-                # Crear tabla si no existe
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS recetas (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        nombre TEXT NOT NULL,
-                        ingredientes TEXT NOT NULL,
-                        cantidades TEXT NOT NULL,
-                        preparacion TEXT NOT NULL,
-                        tiempo_coccion TEXT NOT NULL,
-                        dieta TEXT DEFAULT 'Omnívoro'
-                    )
-                ''')
-                
-                # Insertar datos de ejemplo si la tabla está vacía
-                cursor.execute("SELECT COUNT(*) FROM recetas")
-                if cursor.fetchone()[0] == 0:
-                    self._insert_sample_data(cursor)
-                
-                conn.commit()
-        except sqlite3.Error as e:
-            logger.error(f"Error al inicializar la base de datos: {e}")
-            raise
-    
-    def _insert_sample_data(self, cursor: sqlite3.Cursor) -> None:
-        """Inserta datos de ejemplo en la base de datos"""
-        sample_recipes = [
-            ("Tortilla de papa", "papa, huevo, cebolla, sal, aceite", 
-             "3 papas, 3 huevos, 1 cebolla, sal, aceite", 
-             "Freír papas y cebolla. Mezclar con huevo batido. Cocinar en sartén.", 
-             "25 minutos", "Omnívoro"),
-            ("Ensalada fresca", "lechuga, tomate, zanahoria, sal, aceite", 
-             "4 hojas lechuga, 1 tomate, 1 zanahoria, 1 cdita sal, 1 cda aceite", 
-             "Lavar y cortar los vegetales. Mezclar con aceite y sal.", 
-             "10 minutos", "Vegano,Vegetariano,Omnívoro")
-        ]
-        cursor.executemany(
-            "INSERT INTO recetas (nombre, ingredientes, cantidades, preparacion, tiempo_coccion, dieta) VALUES (?, ?, ?, ?, ?, ?)",
-            sample_recipes
-        )
-    
-    def get_all_recipes(self) -> List[Recipe]:
-        """Obtiene todas las recetas de la base de datos"""
-        try:
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM recetas")
-                return [Recipe(*row) for row in cursor.fetchall()]
-        except sqlite3.Error as e:
-            logger.error(f"Error al obtener todas las recetas: {e}")
-            return []
-    
-    def search_recipes(self, ingredients: List[str], diet: str) -> List[Recipe]:
-        """Busca recetas que contengan los ingredientes especificados y cumplan con la dieta"""
-        try:
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM recetas")
-                recipes = [Recipe(*row) for row in cursor.fetchall()]
-                
-                matching_recipes = []
-                for recipe in recipes:
-                    if not self._is_recipe_compatible(recipe, diet):
-                        continue
-                    
-                    recipe_ingredients = {i.strip().lower() for i in recipe.ingredients.split(",")}
-                    if all(ing.lower() in recipe_ingredients for ing in ingredients):
-                        matching_recipes.append(recipe)
-                
-                return matching_recipes
-        except sqlite3.Error as e:
-            logger.error(f"Error al buscar recetas: {e}")
-            return []
-    
-    def _is_recipe_compatible(self, recipe: Recipe, diet: str) -> bool:
-        """Verifica si una receta es compatible con la dieta especificada"""
-        if diet not in [d.strip() for d in recipe.diets.split(",")]:
-            return False
-            
-        recipe_ingredients = {i.strip().lower() for i in recipe.ingredients.split(",")}
-        prohibited = self.INGREDIENT_RESTRICTIONS.get(diet, set())
-        return len(prohibited.intersection(recipe_ingredients)) == 0
-    
-    def add_recipe(self, recipe_data: Dict) -> bool:
-        """Agrega una nueva receta a la base de datos"""
-        try:
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT INTO recetas (nombre, ingredientes, cantidades, preparacion, tiempo_coccion, dieta) VALUES (?, ?, ?, ?, ?, ?)",
-                    (
-                        recipe_data["name"],
-                        recipe_data["ingredients"],
-                        recipe_data["quantities"],
-                        recipe_data["preparation"],
-                        recipe_data["cooking_time"],
-                        recipe_data["diets"]
-                    )
-                )
-                conn.commit()
-                return True
-        except sqlite3.Error as e:
-            logger.error(f"Error al agregar receta: {e}")
-            return False
-    
-    def update_recipe(self, recipe_id: int, recipe_data: Dict) -> bool:
-        """Actualiza una receta existente"""
-        try:
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "UPDATE recetas SET nombre=?, ingredientes=?, cantidades=?, preparacion=?, tiempo_coccion=?, dieta=? WHERE id=?",
-                    (
-                        recipe_data["name"],
-                        recipe_data["ingredients"],
-                        recipe_data["quantities"],
-                        recipe_data["preparation"],
-                        recipe_data["cooking_time"],
-                        recipe_data["diets"],
-                        recipe_id
-                    )
-                )
-                conn.commit()
-                return True
-        except sqlite3.Error as e:
-            logger.error(f"Error al actualizar receta: {e}")
-            return False
-    
-    def delete_recipe(self, recipe_id: int) -> bool:
-        """Elimina una receta de la base de datos"""
-        try:
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM recetas WHERE id=?", (recipe_id,))
-                conn.commit()
-                return True
-        except sqlite3.Error as e:
-            logger.error(f"Error al eliminar receta: {e}")
-            return False
-
 class ModernButton(tk.Button):
     """Clase para crear botones modernos con estilo consistente"""
     
@@ -256,13 +90,25 @@ class RecipeApp:
     
     def __init__(self, root: tk.Tk):
         self.root = root
-        self.recipe_manager = RecipeManager()
+        # Se abre y precalienta en segundo plano mientras se construye la interfaz
+        self.recipe_manager = BackgroundRecipeManager()
         self.current_diet = tk.StringVar(value="Omnívoro")
+        self.closest_match = tk.BooleanVar(value=False)
+        self.live_search = tk.BooleanVar(value=True)
+        self._live_search_job = None
+        self._last_live_query = None
+        self.max_minutes = tk.StringVar(value="")
+        self.time_order = "id"
         self.selected_recipe_id = None
+        # Consultas en un hilo de trabajo; los resultados llegan por bloques
+        self.query_executor = QueryExecutor(self.root)
+        self.result_ids: List[int] = []
         
         self._setup_ui()
         self._load_images()
-        self._show_all_recipes()
+        STARTUP.mark("interfaz construida")
+        STARTUP.watch_first_frame(self.root)
+        self.recipe_manager.when_ready(self.root, self._show_all_recipes)
     
     def _setup_ui(self) -> None:
         """Configura la interfaz de usuario principal"""
@@ -322,16 +168,15 @@ class RecipeApp:
             # Fondo principal
             bg_image_path = os.path.join("assets", "background.jpg")
             if os.path.exists(bg_image_path):
-                img = Image.open(bg_image_path).resize(DEFAULT_IMAGE_SIZE)
-                self.bg_img = ImageTk.PhotoImage(img)
+                # Desde la caché de imágenes: ya redimensionada y sin decodificar el JPEG
+                self.bg_img = cached_image(bg_image_path, DEFAULT_IMAGE_SIZE)
                 bg_label = tk.Label(self.root, image=self.bg_img)
                 bg_label.place(x=0, y=0, relwidth=1, relheight=1)
             
             # Logo
             logo_path = os.path.join("assets", "logo.png")
             if os.path.exists(logo_path):
-                img_logo = Image.open(logo_path).resize(LOGO_SIZE)
-                self.logo_img = ImageTk.PhotoImage(img_logo)
+                self.logo_img = cached_image(logo_path, LOGO_SIZE)
                 self.logo_label.config(image=self.logo_img)
         except Exception as e:
             logger.error(f"Error al cargar imágenes: {e}")
@@ -391,6 +236,44 @@ class RecipeApp:
         self.ingredients_entry = tk.Entry(self.search_frame, width=52, font=FONT_NORMAL)
         self.ingredients_entry.grid(row=1, column=0, columnspan=5, padx=3, pady=5, sticky="w")
         
+        tk.Checkbutton(
+            self.search_frame, 
+            text="Mejores coincidencias", 
+            variable=self.closest_match, 
+            font=FONT_NORMAL, 
+            bg=COLORS["primary_light"], 
+            activebackground=COLORS["primary_light"]
+        ).grid(row=1, column=5, padx=3, pady=5, sticky="w")
+        
+        tk.Checkbutton(
+            self.search_frame, 
+            text="Búsqueda en vivo", 
+            variable=self.live_search, 
+            font=FONT_NORMAL, 
+            bg=COLORS["primary_light"], 
+            activebackground=COLORS["primary_light"]
+        ).grid(row=1, column=6, padx=3, pady=5, sticky="w")
+        self.ingredients_entry.bind("<KeyRelease>", self._schedule_live_search)
+        
+        # Filtro por tiempo de cocción (vacío: sin límite)
+        time_frame = tk.Frame(self.search_frame, bg=COLORS["primary_light"])
+        time_frame.grid(row=2, column=5, columnspan=2, padx=3, pady=5, sticky="w")
+        tk.Label(time_frame, text="Máx. minutos:", font=FONT_NORMAL, 
+                bg=COLORS["primary_light"]).pack(side="left")
+        self.max_minutes_spinbox = tk.Spinbox(
+            time_frame, 
+            from_=0, 
+            to=600, 
+            increment=5, 
+            width=5, 
+            textvariable=self.max_minutes, 
+            font=FONT_NORMAL, 
+            command=self._on_time_filter_change
+        )
+        self.max_minutes_spinbox.pack(side="left", padx=3)
+        self.max_minutes.set("")
+        self.max_minutes_spinbox.bind("<KeyRelease>", self._on_time_filter_change)
+        
         # Frame para botones de acción
         self.button_frame = tk.Frame(self.search_frame, bg=COLORS["primary_light"])
         self.button_frame.grid(row=2, column=0, columnspan=5, pady=10)
@@ -428,6 +311,14 @@ class RecipeApp:
         )
         self.add_btn.grid(row=0, column=3, padx=12, pady=5)
         
+        self.text_search_btn = ModernButton(
+            self.button_frame, 
+            text="📝 Buscar Texto", 
+            command=self._search_text,
+            bg=COLORS["primary_dark"]
+        )
+        self.text_search_btn.grid(row=0, column=4, padx=12, pady=5)
+        
         # Etiqueta para mensajes de error
         self.error_label = tk.Label(
             self.root, 
@@ -443,28 +334,31 @@ class RecipeApp:
         self.results_frame = tk.Frame(self.root, bg=COLORS["background"])
         self.results_frame.pack(fill="both", expand=True, padx=8, pady=(5, 0))
         
-        # Treeview para mostrar las recetas
-        columns = ("Nombre", "Tiempo", "Ingredientes")
-        self.results_tree = ttk.Treeview(
+        # Treeview virtualizado: solo se materializan las filas visibles
+        columns = ("Nombre", "Tiempo", "Ingredientes", "Faltan")
+        self.results_tree = VirtualTreeview(
             self.results_frame, 
             columns=columns, 
             show="headings", 
             height=8, 
-            selectmode="browse"
+            selectmode="extended"
         )
         
         # Configurar columnas
         for col in columns:
             self.results_tree.heading(col, text=col)
-            self.results_tree.column(col, width=260 if col != "Ingredientes" else 360)
+            self.results_tree.column(col, width={"Ingredientes": 360, "Faltan": 180}.get(col, 260))
+        # Ordenar por tiempo de cocción (lo resuelve el gestor en SQL)
+        self.results_tree.heading("Tiempo", command=self._toggle_time_order)
         
         self.results_tree.pack(fill="both", expand=True)
-        self.results_tree.bind("<<TreeviewSelect>>", self._show_recipe_details)
+        self.results_tree.bind("<<TreeviewSelect>>", self._on_results_select)
+        self.results_tree.bind("<Control-a>", self._select_all_results)
         
         # Barra de desplazamiento
-        scrollbar = ttk.Scrollbar(self.results_tree, orient="vertical", command=self.results_tree.yview)
+        scrollbar = ttk.Scrollbar(self.results_tree, orient="vertical")
         scrollbar.pack(side="right", fill="y")
-        self.results_tree.configure(yscrollcommand=scrollbar.set)
+        self.results_tree.set_scrollbar(scrollbar)
     
     def _create_details_section(self) -> None:
         """Crea la sección de detalles de la receta seleccionada"""
@@ -525,6 +419,32 @@ class RecipeApp:
             bg=COLORS["error"]
         )
         self.delete_btn.pack(side="left", padx=5)
+        
+        # Operaciones sobre varias recetas (Ctrl/Shift + clic o Ctrl+A en los resultados)
+        self.retag_btn = ModernButton(
+            self.edit_frame, 
+            text="🏷️ Cambiar dieta", 
+            command=self._open_retag_dialog,
+            bg=COLORS["warning"]
+        )
+        self.retag_btn.pack(side="left", padx=5)
+        
+        self.select_all_btn = ModernButton(
+            self.edit_frame, 
+            text="☑️ Seleccionar todo", 
+            command=self._select_all_results,
+            bg=COLORS["primary"]
+        )
+        self.select_all_btn.pack(side="left", padx=5)
+        
+        self.selection_label = tk.Label(
+            self.edit_frame, 
+            text="", 
+            bg=COLORS["background"], 
+            fg=COLORS["secondary_text"],
+            font=FONT_NORMAL
+        )
+        self.selection_label.pack(side="left", padx=10)
     
     def _create_footer(self) -> None:
         """Crea el pie de página"""
@@ -542,51 +462,192 @@ class RecipeApp:
     def _search_recipes(self) -> None:
         """Busca recetas basadas en los ingredientes ingresados"""
         ingredients_input = self.ingredients_entry.get().lower()
-        self.results_tree.delete(*self.results_tree.get_children())
+        self.query_executor.cancel()
         self._clear_recipe_details()
         self.error_label.config(text="", fg=COLORS["error"])
         
         if not ingredients_input.strip():
+            self.results_tree.clear()
             self.error_label.config(text="Ingresa al menos un ingrediente.")
             return
         
         ingredients_list = [i.strip() for i in ingredients_input.split(",") if i.strip()]
         if not ingredients_list:
+            self.results_tree.clear()
             self.error_label.config(text="Debes ingresar ingredientes separados por comas.")
             return
         
         diet = self.current_diet.get()
-        matching_recipes = self.recipe_manager.search_recipes(ingredients_list, diet)
+        if self.closest_match.get():
+            self._show_closest_recipes(ingredients_list, diet)
+            return
         
-        if not matching_recipes:
-            self.error_label.config(text="No se encontraron recetas con esos ingredientes para la dieta seleccionada.")
+        self._show_results(diet, ingredients_list,
+                           "No se encontraron recetas con esos ingredientes para la dieta seleccionada.")
+    
+    def _schedule_live_search(self, event=None) -> None:
+        """Reprograma la búsqueda en vivo: se ejecuta cuando se deja de escribir"""
+        if not self.live_search.get():
+            return
+        if self._live_search_job is not None:
+            self.root.after_cancel(self._live_search_job)
+        self._live_search_job = self.root.after(LIVE_SEARCH_DELAY_MS, self._run_live_search)
+    
+    def _run_live_search(self) -> None:
+        """Busca con el texto actual si cambió desde la última búsqueda en vivo.
+        Al agregar un ingrediente, el gestor refina el resultado anterior en memoria."""
+        self._live_search_job = None
+        query = self.ingredients_entry.get().lower()
+        if query == self._last_live_query:
             return
+        self._last_live_query = query
+        self._refresh_results()
+    
+    def _on_time_filter_change(self, event=None) -> None:
+        """Vuelve a buscar al cambiar el máximo de minutos (con o sin búsqueda en vivo)"""
+        self._last_live_query = None
+        self._refresh_results()
+    
+    def _toggle_time_order(self) -> None:
+        """Alterna el orden de los resultados por tiempo de cocción y vuelve a buscar"""
+        self.time_order = TIME_ORDERS[(TIME_ORDERS.index(self.time_order) + 1) % len(TIME_ORDERS)]
+        self.results_tree.heading("Tiempo", text=TIME_HEADINGS[self.time_order])
+        self._refresh_results()
+    
+    def _refresh_results(self) -> None:
+        """Repite la búsqueda actual (o muestra todas si no hay ingredientes)"""
+        if self.ingredients_entry.get().strip():
+            self._search_recipes()
+        else:
+            self._show_all_recipes()
+    
+    def _max_minutes_filter(self) -> Optional[int]:
+        """Máximo de minutos ingresado, o None si está vacío o no es un número"""
+        value = self.max_minutes.get().strip()
+        return int(value) if value.isdigit() else None
+    
+    def _show_closest_recipes(self, ingredients_list: List[str], diet: str) -> None:
+        """Muestra las recetas más parecidas a los ingredientes, con lo que falta para cada una"""
+        def show(ranked) -> None:
+            if not ranked:
+                # Sin resultados no deben quedar (ni poder abrirse) los de la búsqueda anterior
+                self.results_tree.clear()
+                self.result_ids = []
+                self.error_label.config(text="Ninguna receta usa esos ingredientes para la dieta seleccionada.")
+                return
+            rows = [
+                (item.recipe.id, (item.recipe.name, item.recipe.cooking_time, item.recipe.quantities,
+                                  ", ".join(item.missing) or "Nada"))
+                for item in ranked
+            ]
+            self.result_ids = [recipe_id for recipe_id, _ in rows]
+            self.results_tree.set_source(len(rows), lambda offset, limit: rows[offset:offset + limit])
+        
+        max_minutes = self._max_minutes_filter()
+        self._run_query(
+            lambda: [self.recipe_manager.search_closest(ingredients_list, diet, CLOSEST_MATCH_LIMIT, max_minutes=max_minutes)],
+            show
+        )
+    
+    def _search_text(self) -> None:
+        """Busca el texto ingresado en nombres, ingredientes y preparación (por relevancia)"""
+        text = self.ingredients_entry.get()
+        self.query_executor.cancel()
+        self.results_tree.clear()
+        self._clear_recipe_details()
+        self.error_label.config(text="", fg=COLORS["error"])
         
-        for recipe in matching_recipes:
-            self.results_tree.insert(
-                "", 
-                "end", 
-                iid=recipe.id, 
-                values=(recipe.name, recipe.cooking_time, recipe.quantities)
-            )
+        if not text.strip():
+            self.error_label.config(text="Ingresa un texto para buscar.")
+            return
+        
+        def show(ranked) -> None:
+            if not ranked:
+                self.error_label.config(text="No se encontraron recetas con ese texto para la dieta seleccionada.")
+                return
+            rows = [(recipe.id, (recipe.name, recipe.cooking_time, recipe.quantities)) for recipe in ranked]
+            self.result_ids = [recipe_id for recipe_id, _ in rows]
+            self.results_tree.set_source(len(rows), lambda offset, limit: rows[offset:offset + limit])
+        
+        diet = self.current_diet.get()
+        max_minutes = self._max_minutes_filter()
+        self._run_query(
+            lambda: [self.recipe_manager.search_text(text, diet, TEXT_SEARCH_LIMIT, max_minutes=max_minutes)],
+            show
+        )
     
     def _show_all_recipes(self) -> None:
         """Muestra todas las recetas compatibles con la dieta seleccionada"""
-        self.results_tree.delete(*self.results_tree.get_children())
+        self.query_executor.cancel()
         self._clear_recipe_details()
         self.error_label.config(text="", fg=COLORS["error"])
         
-        diet = self.current_diet.get()
-        all_recipes = self.recipe_manager.get_all_recipes()
+        self._show_results(self.current_diet.get(), [], "No hay recetas para la dieta seleccionada.")
+    
+    def _show_results(self, diet: str, ingredients: List[str], empty_message: str) -> None:
+        """Llena la vista virtualizada con los IDs que el hilo de consultas entrega por
+        bloques; las filas visibles se piden al gestor por ID a medida que se desplaza"""
+        result_ids: List[int] = []
+        self.result_ids = result_ids
+        max_minutes = self._max_minutes_filter()
+        order = self.time_order
+        
+        def fetch_page(offset: int, limit: int):
+            recipes = self.recipe_manager.get_recipes_by_ids(result_ids[offset:offset + limit])
+            return [(recipe.id, (recipe.name, recipe.cooking_time, recipe.quantities)) for recipe in recipes]
+        
+        def add_chunk(chunk: List[int]) -> None:
+            first_chunk = not result_ids
+            result_ids.extend(chunk)
+            if first_chunk:
+                self.results_tree.set_source(len(result_ids), fetch_page)
+            else:
+                self.results_tree.set_total(len(result_ids))
+        
+        def finish() -> None:
+            if not result_ids:
+                self.results_tree.clear()
+                self.error_label.config(text=empty_message, fg=COLORS["error"])
+        
+        # La vista anterior queda hasta que llega el primer bloque (sin parpadeo al escribir)
+        self._run_query(
+            lambda: self.recipe_manager.iter_recipe_ids(diet, ingredients, max_minutes=max_minutes, order=order),
+            add_chunk,
+            finish
+        )
+    
+    def _run_query(self, producer, on_chunk, on_done=None) -> None:
+        """Ejecuta la consulta en segundo plano; reemplaza (y cancela) la anterior"""
+        self.error_label.config(text="Buscando...", fg=COLORS["secondary_text"])
+        
+        def done() -> None:
+            if self.error_label.cget("text") == "Buscando...":
+                self.error_label.config(text="", fg=COLORS["error"])
+            if on_done:
+                on_done()
+        
+        def failed(error: Exception) -> None:
+            self.error_label.config(text=f"Error en la búsqueda: {error}", fg=COLORS["error"])
         
-        for recipe in all_recipes:
-            if self.recipe_manager._is_recipe_compatible(recipe, diet):
-                self.results_tree.insert(
-                    "", 
-                    "end", 
-                    iid=recipe.id, 
-                    values=(recipe.name, recipe.cooking_time, recipe.quantities)
-                )
+        self.query_executor.submit(producer, on_chunk, done, failed)
+    
+    def _on_results_select(self, event) -> None:
+        """Actualiza el contador de seleccionadas y los detalles de la receta con foco"""
+        count = len(self.results_tree.selected_ids())
+        self.selection_label.config(text=f"{count} recetas seleccionadas" if count > 1 else "")
+        self._show_recipe_details(event)
+    
+    def _select_all_results(self, event=None) -> Optional[str]:
+        """Selecciona todos los resultados de la búsqueda, no solo los visibles"""
+        self.results_tree.select_ids(self.result_ids)
+        return "break"
+    
+    def _selected_recipe_ids(self) -> List[int]:
+        """IDs seleccionados en los resultados (o la receta con foco si no hay selección)"""
+        recipe_ids = [int(iid) for iid in self.results_tree.selected_ids()]
+        if not recipe_ids and self.selected_recipe_id:
+            recipe_ids = [self.selected_recipe_id]
+        return recipe_ids
     
     def _show_recipe_details(self, event) -> None:
         """Muestra los detalles de la receta seleccionada"""
@@ -627,21 +688,15 @@ class RecipeApp:
     def _clear_search(self) -> None:
         """Limpia la búsqueda actual"""
         self.ingredients_entry.delete(0, tk.END)
+        self.max_minutes.set("")
+        self.query_executor.cancel()
         self._clear_recipe_details()
-        self.results_tree.delete(*self.results_tree.get_children())
+        self.results_tree.clear()
         self.error_label.config(text="")
     
-    def _get_recipe_by_id(self, recipe_id: int) -> Optional[Recipe]:
+    def _get_recipe_by_id(self, recipe_id: int) -> Optional["Recipe"]:
         """Obtiene una receta por su ID"""
-        try:
-            with sqlite3.connect(DB_NAME) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM recetas WHERE id=?", (recipe_id,))
-                row = cursor.fetchone()
-                return Recipe(*row) if row else None
-        except sqlite3.Error as e:
-            logger.error(f"Error al obtener receta por ID: {e}")
-            return None
+        return self.recipe_manager.get_recipe(recipe_id)
     
     def _open_add_recipe_dialog(self) -> None:
         """Abre el diálogo para agregar una nueva receta"""
@@ -660,7 +715,7 @@ class RecipeApp:
         
         self._recipe_dialog("Editar Receta", recipe)
     
-    def _recipe_dialog(self, title: str, recipe: Optional[Recipe] = None) -> None:
+    def _recipe_dialog(self, title: str, recipe: Optional["Recipe"] = None) -> None:
         """Crea un diálogo para agregar/editar recetas"""
         dialog = tk.Toplevel(self.root)
         dialog.title(title)
@@ -787,13 +842,22 @@ class RecipeApp:
         btn_save.pack(pady=10)
     
     def _delete_recipe(self) -> None:
-        """Elimina la receta seleccionada"""
-        if not self.selected_recipe_id:
+        """Elimina la receta seleccionada (o todas las seleccionadas, en una transacción)"""
+        recipe_ids = self._selected_recipe_ids()
+        if not recipe_ids:
             messagebox.showerror("Error", "Selecciona una receta para eliminar.")
             return
+        if len(recipe_ids) > 1:
+            self._delete_recipes(recipe_ids)
+            return
+        self.selected_recipe_id = recipe_ids[0]
         
-        recipe_name = self.results_tree.item(self.selected_recipe_id, "values")[0]
-        if not messagebox.askyesno("Confirmar", f"¿Seguro que deseas eliminar '{recipe_name}'?"):
+        recipe = self._get_recipe_by_id(self.selected_recipe_id)
+        if not recipe:
+            messagebox.showerror("Error", "No se pudo obtener la receta seleccionada.")
+            return
+        
+        if not messagebox.askyesno("Confirmar", f"¿Seguro que deseas eliminar '{recipe.name}'?"):
             return
         
         if self.recipe_manager.delete_recipe(self.selected_recipe_id):
@@ -801,12 +865,77 @@ class RecipeApp:
             self._show_all_recipes()
         else:
             messagebox.showerror("Error", "No se pudo eliminar la receta.")
+    
+    def _delete_recipes(self, recipe_ids: List[int]) -> None:
+        """Elimina varias recetas con una sola confirmación"""
+        if not messagebox.askyesno("Confirmar", f"¿Seguro que deseas eliminar {len(recipe_ids)} recetas?"):
+            return
+        
+        deleted = self.recipe_manager.delete_recipes(recipe_ids)
+        if deleted:
+            messagebox.showinfo("Éxito", f"{deleted} recetas eliminadas correctamente.")
+            self._show_all_recipes()
+        else:
+            messagebox.showerror("Error", "No se pudieron eliminar las recetas.")
+    
+    def _open_retag_dialog(self) -> None:
+        """Abre el diálogo para reemplazar las dietas de las recetas seleccionadas"""
+        recipe_ids = self._selected_recipe_ids()
+        if not recipe_ids:
+            messagebox.showerror("Error", "Selecciona al menos una receta.")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Cambiar dieta")
+        dialog.grab_set()
+        dialog.resizable(False, False)
+        dialog.configure(bg=COLORS["background"])
+        
+        tk.Label(dialog, text=f"Dietas compatibles para {len(recipe_ids)} recetas:", 
+                bg=COLORS["background"], font=FONT_NORMAL).pack(anchor="w", padx=10, pady=(10, 0))
+        
+        frame_diets = tk.Frame(dialog, bg=COLORS["background"])
+        frame_diets.pack(anchor="w", padx=20, pady=5)
+        
+        diet_vars = {}
+        for diet in ("Omnívoro", "Vegetariano", "Vegano"):
+            diet_vars[diet] = tk.IntVar(value=0)
+            tk.Checkbutton(
+                frame_diets, 
+                text=diet, 
+                variable=diet_vars[diet], 
+                bg=COLORS["background"],
+                font=FONT_NORMAL
+            ).pack(anchor="w")
+        
+        def apply_diets():
+            diets = [diet for diet, var in diet_vars.items() if var.get()]
+            if not diets:
+                messagebox.showerror("Error", "Selecciona al menos una dieta.", parent=dialog)
+                return
+            
+            updated = self.recipe_manager.set_recipes_diets(recipe_ids, ",".join(diets))
+            if updated:
+                messagebox.showinfo("Éxito", f"Dieta actualizada en {updated} recetas.")
+                dialog.destroy()
+                self._refresh_results()
+            else:
+                messagebox.showerror("Error", "No se pudo actualizar la dieta.", parent=dialog)
+        
+        ModernButton(
+            dialog, 
+            text="💾 Aplicar", 
+            command=apply_diets,
+            bg=COLORS["success"]
+        ).pack(pady=10)
 
 def main():
     """Función principal para iniciar la aplicación"""
     root = tk.Tk()
     app = RecipeApp(root)
     root.mainloop()
+    app.query_executor.shutdown()
+    app.recipe_manager.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
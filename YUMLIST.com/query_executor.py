@@ -0,0 +1,107 @@
+import logging
+import queue
+import threading
+from typing import Any, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cada cuánto revisa Tk si llegaron resultados, y cuántos bloques entrega por revisión
+POLL_MS = 15
+MAX_CHUNKS_PER_POLL = 8
+
+ChunkProducer = Callable[[], Iterable[Any]]
+
+class QueryExecutor:
+    """Ejecuta consultas del motor en un hilo de trabajo y entrega los resultados
+    al hilo de Tk por bloques, revisando una cola con after().
+
+    Cada submit() cancela la consulta anterior: el hilo deja de producir en el
+    siguiente bloque y los bloques que ya estaban en la cola se descartan, así los
+    resultados viejos nunca pisan a los nuevos.
+    """
+
+    def __init__(self, widget, poll_ms: int = POLL_MS):
+        self._widget = widget
+        self._poll_ms = poll_ms
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._results: "queue.Queue" = queue.Queue()
+        self._current_job = 0
+        self._cancel = threading.Event()
+        self._handlers = None
+        self._polling = False
+        self._thread = threading.Thread(target=self._work, name="yumlist-queries", daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self) -> bool:
+        """True mientras la consulta actual no terminó de entregar sus resultados"""
+        return self._handlers is not None
+
+    def submit(self, producer: ChunkProducer, on_chunk: Callable[[Any], None],
+               on_done: Optional[Callable[[], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None) -> int:
+        """Encola una consulta. producer se ejecuta en el hilo de trabajo y devuelve
+        un iterable de bloques; on_chunk, on_done y on_error se llaman en el hilo de Tk."""
+        self.cancel()
+        self._current_job += 1
+        self._cancel = threading.Event()
+        self._handlers = (on_chunk, on_done, on_error)
+        self._jobs.put((self._current_job, producer, self._cancel))
+        self._schedule_poll()
+        return self._current_job
+
+    def cancel(self) -> None:
+        """Cancela la consulta en curso (sus resultados pendientes se descartan)"""
+        self._cancel.set()
+        self._handlers = None
+
+    def shutdown(self) -> None:
+        """Cancela lo pendiente y detiene el hilo de trabajo"""
+        self.cancel()
+        self._jobs.put(None)
+        self._thread.join(timeout=1)
+
+    def _work(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            job_id, producer, cancel = job
+            if cancel.is_set():
+                continue
+            try:
+                for chunk in producer():
+                    if cancel.is_set():
+                        break
+                    self._results.put((job_id, "chunk", chunk))
+                else:
+                    self._results.put((job_id, "done", None))
+            except Exception as e:
+                logger.error(f"Error en consulta en segundo plano: {e}")
+                self._results.put((job_id, "error", e))
+
+    def _schedule_poll(self) -> None:
+        if not self._polling:
+            self._polling = True
+            self._widget.after(self._poll_ms, self._poll)
+
+    def _poll(self) -> None:
+        self._polling = False
+        for _ in range(MAX_CHUNKS_PER_POLL):
+            try:
+                job_id, kind, payload = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if job_id != self._current_job or self._handlers is None:
+                continue  # resultado de una consulta ya reemplazada
+            on_chunk, on_done, on_error = self._handlers
+            if kind == "chunk":
+                on_chunk(payload)
+            else:
+                self._handlers = None
+                if kind == "done" and on_done:
+                    on_done()
+                elif kind == "error" and on_error:
+                    on_error(payload)
+        if self._handlers is not None or not self._results.empty():
+            self._schedule_poll()
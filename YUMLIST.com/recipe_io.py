@@ -0,0 +1,177 @@
+"""Importación y exportación masiva de recetas en CSV o JSONL.
+
+Uso:
+    python recipe_io.py import recetas.csv
+    python recipe_io.py import recetas.jsonl.gz --db recetas.db --batch-size 20000
+    cat recetas.jsonl | python recipe_io.py import - --format jsonl
+    python recipe_io.py export veganas.csv.gz --diet Vegano
+    python recipe_io.py export - --format jsonl --search "arroz" | jq .nombre
+"""
+import argparse
+import contextlib
+import csv
+import gzip
+import io
+import json
+import logging
+import sys
+from typing import Dict, Iterable, Iterator, Optional
+
+from recipe_manager import (
+    DB_NAME, DIET_BITS, EXPORT_CHUNK_SIZE, IMPORT_BATCH_SIZE, ImportReport, Recipe
+)
+from sharded_manager import open_manager
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl")
+
+# Columnas exportadas (los mismos nombres que acepta la importación)
+EXPORT_FIELDS = ("id", "nombre", "ingredientes", "cantidades", "preparacion", "tiempo_coccion", "dieta")
+
+def detect_format(path: str) -> str:
+    """Deduce el formato a partir de la extensión (ignorando .gz)"""
+    name = path.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "csv"
+
+def open_text(path: str, mode: str = "r"):
+    """Abre un archivo de texto UTF-8, comprimido si termina en .gz; '-' es stdin/stdout"""
+    if path == "-":
+        return _standard_stream(sys.stdin if "r" in mode else sys.stdout)
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+@contextlib.contextmanager
+def _standard_stream(stream) -> Iterator[io.TextIOWrapper]:
+    """stdin/stdout en UTF-8; al salir se separa del buffer (detach) en lugar de
+    cerrarlo, para que el flujo real siga abierto"""
+    wrapper = io.TextIOWrapper(stream.buffer, encoding="utf-8", newline="")
+    try:
+        yield wrapper
+    finally:
+        wrapper.detach()
+
+def read_recipes(path: str, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """Lee registros de receta uno a uno, sin cargar el archivo completo en memoria"""
+    fmt = fmt or detect_format(path)
+    with open_text(path) as stream:
+        if fmt == "csv":
+            yield from csv.DictReader(stream)
+        else:
+            for number, line in enumerate(stream, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Línea {number} ignorada: JSON inválido ({e})")
+                    # Se entrega vacío para que el importador lo cuente como rechazado
+                    record = {}
+                yield record if isinstance(record, dict) else {}
+
+def recipe_record(recipe: Recipe) -> Dict:
+    """Convierte una receta en un registro con los nombres de columna de la base"""
+    return dict(zip(EXPORT_FIELDS, (
+        recipe.id, recipe.name, recipe.ingredients, recipe.quantities,
+        recipe.preparation, recipe.cooking_time, recipe.diets
+    )))
+
+def write_recipes(recipes: Iterable[Recipe], path: str, fmt: Optional[str] = None) -> int:
+    """Escribe las recetas a medida que llegan y devuelve cuántas se escribieron"""
+    fmt = fmt or detect_format(path)
+    count = 0
+    with open_text(path, "w") as stream:
+        if fmt == "csv":
+            writer = csv.DictWriter(stream, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+            for recipe in recipes:
+                writer.writerow(recipe_record(recipe))
+                count += 1
+        else:
+            for recipe in recipes:
+                stream.write(json.dumps(recipe_record(recipe), ensure_ascii=False))
+                stream.write("\n")
+                count += 1
+    return count
+
+def print_progress(report: ImportReport) -> None:
+    """Muestra el avance de la importación en stderr"""
+    print(
+        f"\r{report.inserted:,} recetas importadas "
+        f"({report.rejected:,} rechazadas, {report.rows_per_second:,.0f} filas/s)",
+        end="", file=sys.stderr, flush=True
+    )
+
+def cmd_import(args: argparse.Namespace) -> int:
+    with open_manager(args.db, getattr(args, "shards", 0), sample_data=False) as manager:
+        report = manager.bulk_import(
+            read_recipes(args.path, args.format),
+            batch_size=args.batch_size,
+            progress=print_progress
+        )
+    print(file=sys.stderr)
+    for error in report.errors:
+        print(f"  rechazado: {error}", file=sys.stderr)
+    print(
+        f"Leídas {report.read:,}, importadas {report.inserted:,}, rechazadas {report.rejected:,} "
+        f"en {report.elapsed:.1f} s ({report.rows_per_second:,.0f} filas/s)",
+        file=sys.stderr
+    )
+    return 0 if report.inserted or not report.read else 1
+
+def cmd_export(args: argparse.Namespace) -> int:
+    with open_manager(args.db, getattr(args, "shards", 0), sample_data=False) as manager:
+        recipes = manager.iter_recipes(
+            diet=args.diet,
+            ingredients=args.ingredients.split(",") if args.ingredients else (),
+            text=args.search,
+            chunk_size=args.chunk_size,
+            min_minutes=args.min_minutes,
+            max_minutes=args.max_minutes
+        )
+        count = write_recipes(recipes, args.path, args.format)
+    if args.path != "-":
+        print(f"Exportadas {count:,} recetas a {args.path}", file=sys.stderr)
+    return 0
+
+def add_commands(commands) -> None:
+    """Registra los subcomandos import y export (también los usa cli.py)"""
+    importer = commands.add_parser("import", help="importa recetas desde CSV o JSONL")
+    importer.add_argument("path", help="archivo de entrada (.csv, .jsonl, opcionalmente .gz; '-' para stdin)")
+    importer.add_argument("--format", choices=FORMATS, help="formato de entrada (por defecto según la extensión)")
+    importer.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE,
+                          help="filas por transacción (por defecto: %(default)s)")
+    importer.set_defaults(handler=cmd_import)
+
+    exporter = commands.add_parser("export", help="exporta recetas a CSV o JSONL")
+    exporter.add_argument("path", help="archivo de salida (.csv, .jsonl, opcionalmente .gz; '-' para stdout)")
+    exporter.add_argument("--format", choices=FORMATS, help="formato de salida (por defecto según la extensión)")
+    exporter.add_argument("--diet", choices=list(DIET_BITS), help="solo recetas compatibles con la dieta")
+    exporter.add_argument("--ingredients", help="solo recetas con todos estos ingredientes (separados por comas)")
+    exporter.add_argument("--search", help="solo recetas que coincidan con el texto (nombre, ingredientes, preparación)")
+    exporter.add_argument("--min-minutes", type=int, help="solo recetas con al menos estos minutos de cocción")
+    exporter.add_argument("--max-minutes", type=int, help="solo recetas con a lo sumo estos minutos de cocción")
+    exporter.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE,
+                          help="filas leídas por consulta (por defecto: %(default)s)")
+    exporter.set_defaults(handler=cmd_export)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Importación y exportación de recetas de Yumlist")
+    parser.add_argument("--db", default=DB_NAME, help="base de datos SQLite (por defecto: %(default)s)")
+    parser.add_argument("--shards", type=int, default=0, help="usar el catálogo repartido en N fragmentos de --db")
+    add_commands(parser.add_subparsers(dest="command", required=True))
+    return parser
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1644 @@
+import sqlite3
+import logging
+import re
+import heapq
+import random
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Set, Iterable, Iterator, Tuple, Callable, Any, Sequence, TYPE_CHECKING
+from dataclasses import dataclass, field
+
+from compact_catalog import CompactCatalog
+from ingredients import fold_accents, normalize_ingredient
+
+if TYPE_CHECKING:
+    from bitmatrix import IngredientBitMatrix
+
+logger = logging.getLogger(__name__)
+
+DB_NAME = "recetas.db"
+
+# Bits de compatibilidad por dieta (columna dieta_mask)
+DIET_BITS = {
+    "Omnívoro": 1,
+    "Vegetariano": 2,
+    "Vegano": 4
+}
+ALL_DIETS_MASK = sum(DIET_BITS.values())
+
+# Ajustes de la conexión persistente
+CACHED_STATEMENTS = 256
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-32000",      # ~32 MB de caché de páginas
+    "PRAGMA mmap_size=268435456",    # 256 MB mapeados en memoria
+    "PRAGMA temp_store=MEMORY"
+)
+
+# Varios procesos sobre la misma base (por ejemplo, dos ventanas de la aplicación):
+# WAL deja leer mientras otro escribe; los escritores esperan su turno hasta
+# BUSY_TIMEOUT y, si igual encuentran la base bloqueada, se reintenta la transacción
+BUSY_TIMEOUT = 2.0           # segundos
+WRITE_RETRIES = 3
+RETRY_BACKOFF = 0.05         # espera antes del primer reintento; se duplica en cada uno
+
+# Columnas en el orden de los campos de Recipe
+RECIPE_COLUMNS = "id, nombre, ingredientes, cantidades, preparacion, tiempo_coccion, dieta, minutos"
+
+# Pesos bm25 de la búsqueda de texto (nombre, ingredientes, preparacion)
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+# Índices secundarios (se eliminan y recrean durante las cargas masivas)
+SECONDARY_INDEXES = {
+    "idx_recetas_dieta_mask": "CREATE INDEX IF NOT EXISTS idx_recetas_dieta_mask ON recetas (dieta_mask)",
+    "idx_receta_ingredientes_ingrediente":
+        "CREATE INDEX IF NOT EXISTS idx_receta_ingredientes_ingrediente ON receta_ingredientes (ingrediente_id, receta_id)",
+    "idx_receta_dietas_dieta": "CREATE INDEX IF NOT EXISTS idx_receta_dietas_dieta ON receta_dietas (dieta, receta_id)",
+    "idx_recetas_minutos": "CREATE INDEX IF NOT EXISTS idx_recetas_minutos ON recetas (minutos)"
+}
+
+# Lista de ocurrencias de un ingrediente (por nombre) en las tablas normalizadas
+POSTING_SQL = (
+    "SELECT receta_id FROM receta_ingredientes "
+    "WHERE ingrediente_id = (SELECT id FROM ingredientes WHERE nombre = ?)"
+)
+
+INSERT_RECIPE_SQL = (
+    "INSERT INTO recetas (nombre, ingredientes, cantidades, preparacion, tiempo_coccion, dieta, dieta_mask, "
+    "num_ingredientes, minutos) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+UPDATE_RECIPE_SQL = (
+    "UPDATE recetas SET nombre=?, ingredientes=?, cantidades=?, preparacion=?, tiempo_coccion=?, dieta=?, "
+    "dieta_mask=?, num_ingredientes=?, minutos=? WHERE id=?"
+)
+
+# Orden de los resultados: por ID (el de carga) o por tiempo de cocción; las
+# recetas sin tiempo reconocible van al final
+RESULT_ORDERS = {
+    "id": "id",
+    "minutos": "minutos IS NULL, minutos, id",
+    "-minutos": "minutos IS NULL, minutos DESC, id"
+}
+
+# Importación masiva
+IMPORT_BATCH_SIZE = 50000
+MAX_REPORTED_ERRORS = 100
+
+# Filas leídas por consulta al recorrer el catálogo completo (exportación)
+EXPORT_CHUNK_SIZE = 5000
+# IDs por bloque al entregar resultados de a partes (consultas en segundo plano)
+ID_CHUNK_SIZE = 2000
+# Al refinar un resultado previo, hasta cuántos IDs se verifican con el índice
+# en lugar de cargar la lista de ocurrencias completa del ingrediente nuevo
+NARROW_LOOKUP_LIMIT = 2000
+# Resultados de consultas (IDs, ocurrencias, recetas por dieta) que guarda la caché LRU
+QUERY_CACHE_SIZE = 1024
+# Recetas modificadas a partir de las cuales se vacía la caché de consultas completa
+# en lugar de revisar entrada por entrada cuáles cambian
+INVALIDATION_LIMIT = 256
+REQUIRED_FIELDS = ("name", "ingredients", "quantities", "preparation", "cooking_time")
+FIELD_ALIASES = {
+    "nombre": "name",
+    "ingredientes": "ingredients",
+    "cantidades": "quantities",
+    "preparacion": "preparation",
+    "preparación": "preparation",
+    "tiempo_coccion": "cooking_time",
+    "tiempo": "cooking_time",
+    "dieta": "diets",
+    "dietas": "diets"
+}
+
+# Triggers que mantienen recetas_fts sincronizada con la tabla recetas
+FTS_TRIGGERS = (
+    '''
+    CREATE TRIGGER IF NOT EXISTS recetas_fts_insert AFTER INSERT ON recetas BEGIN
+        INSERT INTO recetas_fts (rowid, nombre, ingredientes, preparacion)
+        VALUES (new.id, new.nombre, new.ingredientes, new.preparacion);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS recetas_fts_delete AFTER DELETE ON recetas BEGIN
+        INSERT INTO recetas_fts (recetas_fts, rowid, nombre, ingredientes, preparacion)
+        VALUES ('delete', old.id, old.nombre, old.ingredientes, old.preparacion);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS recetas_fts_update
+    AFTER UPDATE OF nombre, ingredientes, preparacion ON recetas BEGIN
+        INSERT INTO recetas_fts (recetas_fts, rowid, nombre, ingredientes, preparacion)
+        VALUES ('delete', old.id, old.nombre, old.ingredientes, old.preparacion);
+        INSERT INTO recetas_fts (rowid, nombre, ingredientes, preparacion)
+        VALUES (new.id, new.nombre, new.ingredientes, new.preparacion);
+    END
+    '''
+)
+
+# Migraciones del esquema: (versión, descripción, método de RecipeManager).
+# La versión aplicada se guarda en PRAGMA user_version; al iniciar solo se compara
+# ese entero con SCHEMA_VERSION.
+MIGRATIONS = (
+    (1, "tabla de recetas", "_migrate_base_table"),
+    (2, "tablas normalizadas de ingredientes y dietas", "_migrate_normalized_tables"),
+    (3, "índice de texto completo", "_migrate_fulltext_index"),
+    (4, "ingredientes canónicos (tildes, plurales y sinónimos)", "_migrate_canonical_ingredients"),
+    (5, "tiempo de cocción en minutos", "_migrate_cooking_minutes"),
+    (6, "minutos recalculados (fracciones y números sin unidad)", "_migrate_recompute_minutes"),
+    (7, "minutos recalculados (solo unidades de tiempo exactas)", "_migrate_recompute_minutes")
+)
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+QUANTITY_PATTERN = re.compile(r"^(\d+/\d+|\d+(?:[.,]\d+)?)\s*(\S*)")
+
+# Tiempo de cocción: número (o rango "30-40", "1 a 2") seguido de la unidad
+DURATION_PATTERN = re.compile(r"(\d+(?:[.,]\d+)?)(?:\s*(?:-|a)\s*(\d+(?:[.,]\d+)?))?\s*([a-z]*)")
+# Fracciones "1/2", "1 1/2" y "½" (se pasan a decimales antes de leer las duraciones)
+FRACTION_PATTERN = re.compile(r"(?:(\d+)\s+)?(\d+)/(\d+)")
+DURATION_PHRASES = (
+    (re.compile(r"(\d+):(\d{2})"), r"\1 h \2 min"),
+    (re.compile(r"\bunas?\b|\bun\b"), "1"),
+    # "1 y media horas": la fracción es del número; "2 horas y media", de la unidad
+    (re.compile(r"(\d+(?:[.,]\d+)?) y medi[ao]\b"), lambda m: f"{float(m.group(1).replace(',', '.')) + 0.5:g}"),
+    (re.compile(r"(?<!\d )\bhora y media\b"), "90 min"),
+    (re.compile(r"\by media\b"), "y 30 min"),
+    (re.compile(r"\by cuarto\b"), "y 15 min"),
+    (re.compile(r"\b(?:1 )?cuarto de hora\b"), "15 min"),
+    (re.compile(r"\bmedia hora\b"), "30 min")
+)
+# Unidades de tiempo reconocidas (ya en minúsculas y sin tildes) -> minutos. Solo
+# estas palabras exactas: "3 huevos" o "2 hamburguesas" no son horas
+DURATION_UNITS = {
+    **dict.fromkeys(("m", "min", "mins", "minuto", "minutos"), 1),
+    **dict.fromkeys(("h", "hs", "hr", "hrs", "hora", "horas"), 60),
+    **dict.fromkeys(("dia", "dias"), 24 * 60),
+    **dict.fromkeys(("seg", "segs", "segundo", "segundos"), 1 / 60)
+}
+
+@dataclass
+class Recipe:
+    id: int
+    name: str
+    ingredients: str
+    quantities: str
+    preparation: str
+    cooking_time: str
+    diets: str
+    minutes: Optional[int] = None
+
+@dataclass
+class RankedRecipe:
+    recipe: Recipe
+    score: float
+    matched: int
+    missing: List[str]
+
+@dataclass
+class ImportReport:
+    read: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    elapsed: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.inserted / self.elapsed if self.elapsed else 0.0
+
+class QueryCache:
+    """Caché LRU acotada de resultados de consultas, con contadores de aciertos,
+    fallos, desalojos (por tamaño) e invalidaciones (por escrituras)"""
+
+    def __init__(self, max_entries: int = QUERY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __contains__(self, key: Tuple) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def items(self) -> List[Tuple[Tuple, Any]]:
+        """Entradas actuales (sin contar aciertos ni cambiar el orden LRU)"""
+        return list(self._entries.items())
+
+    def peek(self, key: Tuple) -> Any:
+        """Valor en caché o None, sin contar aciertos ni cambiar el orden LRU"""
+        return self._entries.get(key)
+
+    def get(self, key: Tuple) -> Any:
+        """Valor en caché (y lo marca como usado recientemente) o None"""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Tuple, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, predicate: Optional[Callable[[Tuple], bool]] = None) -> int:
+        """Descarta las entradas afectadas (todas si no hay predicado); devuelve cuántas"""
+        if predicate is None:
+            keys = list(self._entries)
+        else:
+            keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            del self._entries[key]
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits,
+            "misses": self.misses, "evictions": self.evictions, "invalidations": self.invalidations
+        }
+
+def normalize_recipe_data(record: Dict) -> Dict:
+    """Valida un registro de receta (acepta claves en inglés o los nombres de columna
+    en español) y devuelve el diccionario normalizado que usa RecipeManager"""
+    data = {}
+    for key, value in record.items():
+        if key is None:
+            continue
+        key = key.strip().lower()
+        data[FIELD_ALIASES.get(key, key)] = value.strip() if isinstance(value, str) else value
+
+    missing = [name for name in REQUIRED_FIELDS if not data.get(name)]
+    if missing:
+        raise ValueError(f"faltan campos: {', '.join(missing)}")
+    for name in REQUIRED_FIELDS:
+        if not isinstance(data[name], str):
+            data[name] = str(data[name])
+
+    diets = data.get("diets") or "Omnívoro"
+    if isinstance(diets, (list, tuple)):
+        diets = ",".join(diets)
+    diet_list = [d.strip() for d in str(diets).split(",") if d.strip()]
+    unknown = [d for d in diet_list if d not in DIET_BITS]
+    if unknown or not diet_list:
+        raise ValueError(f"dieta desconocida: {', '.join(unknown) or diets}")
+    data["diets"] = ",".join(diet_list)
+    return data
+
+def is_lock_error(error: sqlite3.Error) -> bool:
+    """Indica si el error es de bloqueo (otro proceso tiene la base) y vale reintentar"""
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ("locked" in message or "busy" in message)
+
+def split_ingredients(ingredients_text: str) -> Set[str]:
+    """Convierte el texto de ingredientes separado por comas en el conjunto de nombres canónicos"""
+    return {name for name in map(normalize_ingredient, ingredients_text.split(",")) if name}
+
+def parse_quantity(text: str) -> Tuple[Optional[float], Optional[str]]:
+    """Separa una cantidad como "200g", "1 cda aceite" o "1/2 taza" en (número, unidad).
+    Devuelve (None, None) si el texto no empieza con un número ("sal", "a gusto")."""
+    match = QUANTITY_PATTERN.match(text.strip())
+    if not match:
+        return None, None
+    number, unit = match.groups()
+    if "/" in number:
+        numerator, denominator = number.split("/")
+        amount = int(numerator) / int(denominator) if int(denominator) else None
+    else:
+        amount = float(number.replace(",", "."))
+    return amount, unit.lower() or None
+
+def parse_recipe_ingredients(ingredients_text: str, quantities_text: str) -> List[Tuple[str, Optional[float], Optional[str], str]]:
+    """Ingredientes en orden, con nombre canónico y sin repetir, con la cantidad de la
+    misma posición: [(nombre, número, unidad, texto de la cantidad), ...]"""
+    quantities = [q.strip() for q in quantities_text.split(",")]
+    result = []
+    seen: Set[str] = set()
+    for position, name in enumerate(map(normalize_ingredient, ingredients_text.split(","))):
+        if not name or name in seen:
+            continue
+        seen.add(name)
+        description = quantities[position] if position < len(quantities) else ""
+        result.append((name, *parse_quantity(description), description))
+    return result
+
+def _fraction_to_decimal(match: "re.Match") -> str:
+    whole, numerator, denominator = int(match.group(1) or 0), int(match.group(2)), int(match.group(3))
+    return f"{whole + numerator / denominator:g}" if denominator else match.group(0)
+
+def parse_cooking_minutes(text: Optional[str]) -> Optional[int]:
+    """Minutos de un tiempo de cocción escrito a mano: "25 minutos", "1 h 30 min",
+    "1:30", "una hora y media", "1 1/2 horas", "30-40 minutos" (se toma el máximo del
+    rango). Los números sin unidad cuentan como minutos solo si ningún otro la tiene
+    ("40 min a 180°" son 40), salvo los minutos que siguen a las horas ("1 hora 30").
+    Devuelve None si no hay ninguna duración reconocible ("a gusto")."""
+    text = fold_accents((text or "").lower()).replace("½", " 1/2")
+    text = FRACTION_PATTERN.sub(_fraction_to_decimal, text)
+    for pattern, replacement in DURATION_PHRASES:
+        text = pattern.sub(replacement, text)
+    timed: List[float] = []
+    bare: List[float] = []
+    after_hours = False
+    for number, upper, unit in DURATION_PATTERN.findall(text):
+        value = float((upper or number).replace(",", "."))
+        if not unit:
+            (timed if after_hours and value < 60 else bare).append(value)
+            after_hours = False
+            continue
+        factor = DURATION_UNITS.get(unit)
+        if factor is None:
+            after_hours = False
+            continue  # "4 porciones", "2 personas", "180 grados", "3 huevos"
+        timed.append(value * factor)
+        after_hours = factor == 60
+    values = timed or bare
+    return round(sum(values)) if values else None
+
+def split_diets(diets_text: Optional[str]) -> List[str]:
+    """Dietas declaradas de una receta (por omisión, Omnívoro)"""
+    return [d.strip() for d in (diets_text or "Omnívoro").split(",") if d.strip()]
+
+class RecipeManager:
+    """Clase para gestionar las operaciones con recetas en la base de datos"""
+
+    # Nombres canónicos (ver ingredients.normalize_ingredient): "huevos" ya es "huevo"
+    INGREDIENT_RESTRICTIONS = {
+        "Vegano": {"huevo", "queso", "pollo", "carne", "leche", "miel", "mantequilla", "yogur"},
+        "Vegetariano": {"pollo", "carne"},
+        "Omnívoro": set()
+    }
+
+    def __init__(self, db_name: str = DB_NAME, sample_data: bool = True, bit_matrix: bool = False,
+                 cache_size: int = QUERY_CACHE_SIZE, busy_timeout: float = BUSY_TIMEOUT,
+                 write_retries: int = WRITE_RETRIES):
+        self.db_name = db_name
+        self.busy_timeout = busy_timeout
+        self.write_retries = write_retries
+        # Transacciones de escritura reintentadas y abandonadas por bloqueo
+        self._lock_retries = 0
+        self._lock_failures = 0
+        # Recetas de ejemplo al crear una base vacía (no en fragmentos ni copias)
+        self.sample_data = sample_data
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        # Caché en memoria, validada contra PRAGMA data_version: estructuras de todo el
+        # catálogo (se descartan con cada escritura propia) y resultados de consultas
+        # (LRU acotada; una escritura propia descarta solo los que puede cambiar)
+        self._write_generation = 0
+        self._cache: Dict[Tuple, Any] = {}
+        self._query_cache = QueryCache(cache_size)
+        self._cache_version: Optional[int] = None
+        self._fts_enabled: Optional[bool] = None
+        # Motor opcional con NumPy (bitmatrix) para las búsquedas por ingredientes
+        self.bit_matrix = False
+        if bit_matrix:
+            import bitmatrix  # NumPy solo se carga si se pide el motor
+            self.bit_matrix = bitmatrix.available()
+        if bit_matrix and not self.bit_matrix:
+            logger.warning("NumPy no está instalado: las búsquedas por ingredientes usan SQL")
+        self._matrix: Optional["IngredientBitMatrix"] = None
+        self._matrix_version: Optional[int] = None
+        self._initialize_db()
+
+    def __enter__(self) -> "RecipeManager":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Abre (una sola vez) la conexión persistente con WAL y los pragmas de rendimiento"""
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self.db_name,
+                timeout=self.busy_timeout,
+                cached_statements=CACHED_STATEMENTS,
+                check_same_thread=False
+            )
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Entrega la conexión persistente dentro de una transacción:
+        confirma al salir o revierte si ocurre un error"""
+        with self._lock:
+            conn = self._get_connection()
+            with conn:
+                yield conn
+
+    @contextmanager
+    def _snapshot(self) -> Iterator[sqlite3.Connection]:
+        """Como _connection, pero en una transacción de lectura: varias consultas ven la
+        misma versión de la base aunque otro proceso confirme escrituras entre ellas"""
+        with self._connection() as conn:
+            conn.execute("BEGIN")
+            yield conn
+
+    def _write(self, apply: Callable[[sqlite3.Cursor], Any]) -> Any:
+        """Ejecuta apply en una transacción de escritura corta y devuelve su resultado.
+
+        BEGIN IMMEDIATE toma el bloqueo de escritura al empezar, antes de leer el estado
+        previo, así dos procesos no pueden intercalar su lectura y su escritura. Si la
+        base sigue bloqueada después de busy_timeout, se revierte y se reintenta hasta
+        write_retries veces con espera exponencial (con variación aleatoria para que
+        los procesos no reintenten a la vez).
+        """
+        for attempt in range(self.write_retries + 1):
+            try:
+                with self._lock:
+                    conn = self._get_connection()
+                    with conn:
+                        conn.execute("BEGIN IMMEDIATE")
+                        return apply(conn.cursor())
+            except sqlite3.OperationalError as e:
+                if not is_lock_error(e):
+                    raise
+                if attempt == self.write_retries:
+                    self._lock_failures += 1
+                    raise
+                self._lock_retries += 1
+                logger.warning(f"Base bloqueada por otro proceso, reintento {attempt + 1} de {self.write_retries}")
+                time.sleep(RETRY_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    def lock_stats(self) -> Dict[str, int]:
+        """Escrituras reintentadas y abandonadas porque otro proceso tenía la base"""
+        return {"retries": self._lock_retries, "failures": self._lock_failures}
+
+    def close(self) -> None:
+        """Cierra la conexión persistente"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._cache.clear()
+            self._query_cache.invalidate()
+            self._cache_version = None
+            self._matrix = None
+
+    def catalog_version(self) -> Tuple[int, int]:
+        """Versión actual del catálogo: PRAGMA data_version (cambia cuando otra
+        conexión o proceso confirma escrituras) más el contador de escrituras propias"""
+        with self._connection() as conn:
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        return data_version, self._write_generation
+
+    def _cached(self, key: Tuple, loader: Callable[[], Any]) -> Any:
+        """Devuelve el valor en caché para la clave o lo carga si el catálogo cambió.
+        Los valores devueltos son compartidos y no deben modificarse."""
+        with self._lock:
+            self._validate_cache()
+            if key not in self._cache:
+                self._cache[key] = loader()
+            return self._cache[key]
+
+    def _cached_query(self, key: Tuple, loader: Callable[[], Any]) -> Any:
+        """Como _cached, para resultados de consultas: van a la caché LRU acotada"""
+        with self._lock:
+            self._validate_cache()
+            value = self._query_cache.get(key)
+            if value is None:
+                value = loader()
+                self._query_cache.put(key, value)
+            return value
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Contadores de la caché de consultas: aciertos, fallos, desalojos e invalidaciones"""
+        with self._lock:
+            return self._query_cache.stats()
+
+    def _validate_cache(self) -> Tuple[int, int]:
+        """Vacía la caché si otro proceso o conexión escribió; devuelve la versión vigente"""
+        version = self.catalog_version()
+        if version[0] != self._cache_version:
+            self._cache.clear()
+            self._query_cache.invalidate()
+            self._cache_version = version[0]
+        return version
+
+    def _mark_written(self, changes: Optional[List[Tuple[Set[str], int]]] = None) -> None:
+        """Registra una escritura propia e invalida la caché. changes describe las
+        recetas afectadas como (ingredientes canónicos, dieta_mask), antes y después
+        del cambio; sin changes (importación, migración) se descarta todo."""
+        with self._lock:
+            self._write_generation += 1
+            self._cache.clear()
+            if changes is None or len(changes) > INVALIDATION_LIMIT:
+                self._query_cache.invalidate()
+            else:
+                self._query_cache.invalidate(lambda key: self._query_affected(key, changes))
+
+    @staticmethod
+    def _query_affected(key: Tuple, changes: List[Tuple[Set[str], int]]) -> bool:
+        """Indica si el resultado en caché puede cambiar por escribir recetas que, antes
+        o después de la escritura, tienen estos ingredientes y esta máscara de dietas"""
+        kind = key[0]
+        if kind == "posting":
+            return any(key[1] in names for names, _ in changes)
+        bit = DIET_BITS.get(key[1], 0)
+        if kind == "diet":
+            return any(mask & bit for _, mask in changes)
+        if kind == "ids":
+            terms = set(key[2])
+            return any(mask & bit and terms <= names for names, mask in changes)
+        return True
+
+    def _recipe_state(self, cursor: sqlite3.Cursor, recipe_id: int) -> List[Tuple[Set[str], int]]:
+        """Ingredientes canónicos y dieta_mask guardados de la receta (para _mark_written)"""
+        row = cursor.execute("SELECT ingredientes, dieta_mask FROM recetas WHERE id=?", (recipe_id,)).fetchone()
+        return [(split_ingredients(row[0]), row[1] or 0)] if row else []
+
+    def _data_state(self, recipe_data: Dict) -> List[Tuple[Set[str], int]]:
+        """Como _recipe_state, para los datos que se van a guardar"""
+        return [(
+            split_ingredients(recipe_data["ingredients"]),
+            self.compute_diet_mask(recipe_data["diets"], recipe_data["ingredients"])
+        )]
+
+    def _initialize_db(self) -> None:
+        """Lleva la base al esquema actual; si ya está al día es una sola comparación"""
+        try:
+            with self._lock:
+                conn = self._get_connection()
+                if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                    self.migrate()
+        except sqlite3.Error as e:
+            logger.error(f"Error al inicializar la base de datos: {e}")
+            raise
+
+    def schema_version(self) -> int:
+        """Versión del esquema de la base (PRAGMA user_version)"""
+        with self._connection() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def catalog_stats(self) -> Dict[str, int]:
+        """Cantidad de filas de las tablas principales del catálogo"""
+        tables = ("recetas", "ingredientes", "receta_ingredientes", "receta_dietas")
+        try:
+            with self._connection() as conn:
+                return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+        except sqlite3.Error as e:
+            logger.error(f"Error al contar las filas del catálogo: {e}")
+            return {}
+
+    def migrate(self) -> Tuple[int, int]:
+        """Aplica las migraciones pendientes, cada una en su propia transacción.
+        Devuelve (versión inicial, versión final)."""
+        with self._lock:
+            conn = self._get_connection()
+            initial = conn.execute("PRAGMA user_version").fetchone()[0]
+            if initial > SCHEMA_VERSION:
+                logger.warning(f"La base tiene el esquema {initial}, más nuevo que el soportado ({SCHEMA_VERSION})")
+                return initial, initial
+            for version, description, method in MIGRATIONS:
+                # BEGIN IMMEDIATE toma el bloqueo de escritura: si otro proceso migró
+                # mientras tanto, se vuelve a leer la versión y no se repite el paso
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if conn.execute("PRAGMA user_version").fetchone()[0] < version:
+                        logger.info(f"Migrando la base a la versión {version}: {description}")
+                        getattr(self, method)(conn.cursor())
+                        conn.execute(f"PRAGMA user_version = {version}")
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+            self._fts_enabled = None
+        self._mark_written()
+        return initial, SCHEMA_VERSION
+
+    def _migrate_base_table(self, cursor: sqlite3.Cursor) -> None:
+        """Versión 1: tabla de recetas, completando columnas de bases de versiones anteriores"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS recetas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nombre TEXT NOT NULL,
+                ingredientes TEXT NOT NULL,
+                cantidades TEXT NOT NULL,
+                preparacion TEXT NOT NULL,
+                tiempo_coccion TEXT NOT NULL,
+                dieta TEXT DEFAULT 'Omnívoro',
+                dieta_mask INTEGER,
+                num_ingredientes INTEGER
+            )
+        ''')
+        cursor.execute("PRAGMA table_info(recetas)")
+        columns = [col[1] for col in cursor.fetchall()]
+        if 'dieta' not in columns:
+            cursor.execute("ALTER TABLE recetas ADD COLUMN dieta TEXT DEFAULT 'Omnívoro'")
+        if 'dieta_mask' not in columns:
+            cursor.execute("ALTER TABLE recetas ADD COLUMN dieta_mask INTEGER")
+        if 'num_ingredientes' not in columns:
+            cursor.execute("ALTER TABLE recetas ADD COLUMN num_ingredientes INTEGER")
+
+        # Insertar datos de ejemplo si la tabla está vacía
+        cursor.execute("SELECT COUNT(*) FROM recetas")
+        if cursor.fetchone()[0] == 0 and self.sample_data:
+            self._insert_sample_data(cursor)
+
+    def _migrate_normalized_tables(self, cursor: sqlite3.Cursor) -> None:
+        """Versión 2: ingredientes, receta_ingredientes (con cantidad y unidad) y
+        receta_dietas, cargadas a partir de las columnas de texto"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ingredientes (
+                id INTEGER PRIMARY KEY,
+                nombre TEXT NOT NULL UNIQUE
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS receta_ingredientes (
+                receta_id INTEGER NOT NULL,
+                ingrediente_id INTEGER NOT NULL,
+                posicion INTEGER NOT NULL,
+                cantidad REAL,
+                unidad TEXT,
+                descripcion TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (receta_id, ingrediente_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS receta_dietas (
+                receta_id INTEGER NOT NULL,
+                dieta TEXT NOT NULL,
+                PRIMARY KEY (receta_id, dieta)
+            ) WITHOUT ROWID
+        ''')
+        for index in ("idx_recetas_dieta_mask", "idx_receta_ingredientes_ingrediente", "idx_receta_dietas_dieta"):
+            cursor.execute(SECONDARY_INDEXES[index])
+        # Reemplazada por receta_ingredientes (bases creadas por versiones anteriores)
+        cursor.execute("DROP TABLE IF EXISTS indice_ingredientes")
+
+        self._rebuild_links(cursor, "dieta_mask IS NULL")
+
+    def _migrate_canonical_ingredients(self, cursor: sqlite3.Cursor) -> None:
+        """Versión 4: vuelve a cargar las tablas normalizadas con nombres canónicos
+        y recalcula las máscaras de dieta ("Huevos" ahora es "huevo")"""
+        self._rebuild_links(cursor, "1")
+
+    def _migrate_cooking_minutes(self, cursor: sqlite3.Cursor) -> None:
+        """Versión 5: columna minutos (tiempo de cocción como entero) con su índice,
+        para filtrar y ordenar por tiempo en SQL"""
+        cursor.execute("PRAGMA table_info(recetas)")
+        if "minutos" not in [col[1] for col in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE recetas ADD COLUMN minutos INTEGER")
+        reader = cursor.connection.execute("SELECT id, tiempo_coccion FROM recetas")
+        while True:
+            rows = reader.fetchmany(IMPORT_BATCH_SIZE)
+            if not rows:
+                break
+            cursor.executemany(
+                "UPDATE recetas SET minutos=? WHERE id=?",
+                [(parse_cooking_minutes(cooking_time), recipe_id) for recipe_id, cooking_time in rows]
+            )
+        cursor.execute(SECONDARY_INDEXES["idx_recetas_minutos"])
+
+    def _migrate_recompute_minutes(self, cursor: sqlite3.Cursor) -> None:
+        """Versiones 6 y 7: vuelve a calcular los minutos con el intérprete corregido
+        ("1 1/2 horas" eran 122, "40 min a 180°" eran 220 y "3 huevos, 10 min" eran 190)"""
+        self._migrate_cooking_minutes(cursor)
+
+    def _rebuild_links(self, cursor: sqlite3.Cursor, masks_where: str) -> None:
+        """Carga de nuevo ingredientes, receta_ingredientes y receta_dietas desde las
+        columnas de texto, y recalcula num_ingredientes y dieta_mask (donde masks_where)"""
+        cursor.execute("DELETE FROM receta_ingredientes")
+        cursor.execute("DELETE FROM receta_dietas")
+        cursor.execute("DELETE FROM ingredientes")
+        self._store_links_after(cursor.connection, 0)
+        cursor.execute('''
+            UPDATE recetas SET num_ingredientes = (
+                SELECT COUNT(*) FROM receta_ingredientes WHERE receta_id = recetas.id
+            )
+        ''')
+        # NOT INDEXED: recorrido por id, sin depender del índice de la columna que se actualiza
+        reader = cursor.connection.execute(
+            f"SELECT id, dieta, ingredientes FROM recetas NOT INDEXED WHERE {masks_where}"
+        )
+        while True:
+            rows = reader.fetchmany(IMPORT_BATCH_SIZE)
+            if not rows:
+                break
+            cursor.executemany(
+                "UPDATE recetas SET dieta_mask=? WHERE id=?",
+                [(self.compute_diet_mask(diets or "Omnívoro", ingredients_text), recipe_id)
+                 for recipe_id, diets, ingredients_text in rows]
+            )
+
+    def _migrate_fulltext_index(self, cursor: sqlite3.Cursor) -> None:
+        """Versión 3: tabla FTS5 sobre nombre, ingredientes y preparación, sincronizada
+        con triggers. Si SQLite no fue compilado con FTS5 se omite (búsqueda con LIKE)."""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='recetas_fts'")
+        exists = cursor.fetchone() is not None
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS recetas_fts USING fts5(
+                    nombre, ingredientes, preparacion,
+                    content='recetas', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Búsqueda de texto completo no disponible: {e}")
+            return
+
+        for trigger in FTS_TRIGGERS:
+            cursor.execute(trigger)
+        if not exists:
+            # Indexar las recetas que ya estaban en la base
+            cursor.execute("INSERT INTO recetas_fts (recetas_fts) VALUES ('rebuild')")
+
+    @property
+    def fts_enabled(self) -> bool:
+        """True si la base tiene la tabla FTS5 (se consulta una sola vez)"""
+        if self._fts_enabled is None:
+            with self._connection() as conn:
+                self._fts_enabled = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='recetas_fts'"
+                ).fetchone() is not None
+        return self._fts_enabled
+
+    def _insert_sample_data(self, cursor: sqlite3.Cursor) -> None:
+        """Inserta datos de ejemplo en la base de datos"""
+        sample_recipes = [
+            ("Tortilla de papa", "papa, huevo, cebolla, sal, aceite",
+             "3 papas, 3 huevos, 1 cebolla, sal, aceite",
+             "Freír papas y cebolla. Mezclar con huevo batido. Cocinar en sartén.",
+             "25 minutos", "Omnívoro"),
+            ("Ensalada fresca", "lechuga, tomate, zanahoria, sal, aceite",
+             "4 hojas lechuga, 1 tomate, 1 zanahoria, 1 cdita sal, 1 cda aceite",
+             "Lavar y cortar los vegetales. Mezclar con aceite y sal.",
+             "10 minutos", "Vegano,Vegetariano,Omnívoro")
+        ]
+        cursor.executemany(
+            "INSERT INTO recetas (nombre, ingredientes, cantidades, preparacion, tiempo_coccion, dieta) VALUES (?, ?, ?, ?, ?, ?)",
+            sample_recipes
+        )
+
+    def _store_links_after(self, conn: sqlite3.Connection, after_id: int) -> None:
+        """Carga receta_ingredientes y receta_dietas de las recetas con id > after_id,
+        por lotes y con los IDs de ingredientes en memoria (migración e importación)"""
+        ingredient_ids = dict(conn.execute("SELECT nombre, id FROM ingredientes"))
+        reader = conn.execute(
+            "SELECT id, ingredientes, cantidades, dieta FROM recetas WHERE id > ? ORDER BY id", (after_id,)
+        )
+        while True:
+            rows = reader.fetchmany(IMPORT_BATCH_SIZE)
+            if not rows:
+                break
+            links = []
+            diets = []
+            for recipe_id, ingredients_text, quantities_text, diets_text in rows:
+                for position, (name, amount, unit, description) in enumerate(
+                        parse_recipe_ingredients(ingredients_text, quantities_text)):
+                    if name not in ingredient_ids:
+                        ingredient_ids[name] = conn.execute(
+                            "INSERT INTO ingredientes (nombre) VALUES (?)", (name,)
+                        ).lastrowid
+                    links.append((recipe_id, ingredient_ids[name], position, amount, unit, description))
+                diets += [(recipe_id, diet) for diet in split_diets(diets_text)]
+            conn.executemany(
+                "INSERT OR IGNORE INTO receta_ingredientes (receta_id, ingrediente_id, posicion, cantidad, unidad, descripcion) "
+                "VALUES (?, ?, ?, ?, ?, ?)", links
+            )
+            conn.executemany("INSERT OR IGNORE INTO receta_dietas (receta_id, dieta) VALUES (?, ?)", diets)
+
+    @classmethod
+    def compute_diet_mask(cls, diets_text: str, ingredients_text: str) -> int:
+        """Calcula la máscara de dietas compatibles: las dietas declaradas
+        filtradas por las restricciones de ingredientes"""
+        recipe_ingredients = split_ingredients(ingredients_text)
+        mask = 0
+        for diet in (d.strip() for d in diets_text.split(",")):
+            bit = DIET_BITS.get(diet, 0)
+            if bit and not cls.INGREDIENT_RESTRICTIONS.get(diet, set()) & recipe_ingredients:
+                mask |= bit
+        return mask
+
+    @staticmethod
+    def _diet_mask_values(diet: str) -> List[int]:
+        """Valores de dieta_mask que incluyen la dieta, para consultar el índice con IN (...)"""
+        bit = DIET_BITS.get(diet, 0)
+        return [mask for mask in range(ALL_DIETS_MASK + 1) if mask & bit]
+
+    def _store_links(self, cursor: sqlite3.Cursor, recipe_id: int, recipe_data: Dict) -> None:
+        """Registra los ingredientes (con cantidad y unidad) y las dietas de la receta
+        en las tablas normalizadas"""
+        links = []
+        for position, (name, amount, unit, description) in enumerate(
+                parse_recipe_ingredients(recipe_data["ingredients"], recipe_data["quantities"])):
+            cursor.execute("INSERT OR IGNORE INTO ingredientes (nombre) VALUES (?)", (name,))
+            cursor.execute("SELECT id FROM ingredientes WHERE nombre=?", (name,))
+            links.append((recipe_id, cursor.fetchone()[0], position, amount, unit, description))
+        cursor.executemany(
+            "INSERT OR IGNORE INTO receta_ingredientes (receta_id, ingrediente_id, posicion, cantidad, unidad, descripcion) "
+            "VALUES (?, ?, ?, ?, ?, ?)", links
+        )
+        cursor.executemany(
+            "INSERT OR IGNORE INTO receta_dietas (receta_id, dieta) VALUES (?, ?)",
+            [(recipe_id, diet) for diet in split_diets(recipe_data["diets"])]
+        )
+
+    def _delete_links(self, cursor: sqlite3.Cursor, recipe_id: int) -> None:
+        """Elimina las filas de la receta en las tablas normalizadas"""
+        cursor.execute("DELETE FROM receta_ingredientes WHERE receta_id=?", (recipe_id,))
+        cursor.execute("DELETE FROM receta_dietas WHERE receta_id=?", (recipe_id,))
+
+    def _query_recipes(self, sql: str, params: Iterable = ()) -> List[Recipe]:
+        """Ejecuta una consulta de recetas y materializa los resultados"""
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, tuple(params))
+            return [Recipe(*row) for row in cursor.fetchall()]
+
+    def get_all_recipes(self) -> CompactCatalog:
+        """Obtiene todas las recetas como catálogo compacto en memoria (en caché): se
+        recorre e indexa como una lista de recetas, y la preparación se lee al pedirla"""
+        def load() -> CompactCatalog:
+            with self._connection() as conn:
+                rows = conn.execute(
+                    "SELECT id, nombre, ingredientes, cantidades, tiempo_coccion, dieta, minutos FROM recetas ORDER BY id"
+                )
+                return CompactCatalog.from_rows(rows, self._load_preparation)
+        try:
+            return self._cached(("all",), load)
+        except sqlite3.Error as e:
+            logger.error(f"Error al obtener todas las recetas: {e}")
+            return CompactCatalog(self._load_preparation)
+
+    def _load_preparation(self, recipe_id: int) -> str:
+        """Preparación de una receta, que el catálogo compacto no guarda en memoria"""
+        try:
+            with self._connection() as conn:
+                row = conn.execute("SELECT preparacion FROM recetas WHERE id=?", (recipe_id,)).fetchone()
+                return row[0] if row else ""
+        except sqlite3.Error as e:
+            logger.error(f"Error al obtener la preparación: {e}")
+            return ""
+
+    def get_recipe(self, recipe_id: int) -> Optional[Recipe]:
+        """Obtiene una receta por su ID"""
+        try:
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"SELECT {RECIPE_COLUMNS} FROM recetas WHERE id=?", (recipe_id,))
+                row = cursor.fetchone()
+                return Recipe(*row) if row else None
+        except sqlite3.Error as e:
+            logger.error(f"Error al obtener receta por ID: {e}")
+            return None
+
+    @staticmethod
+    def _query_terms(ingredients: Iterable[str]) -> List[str]:
+        """Nombres canónicos de los ingredientes de una consulta (sin vacíos ni duplicados)"""
+        return sorted({name for name in map(normalize_ingredient, ingredients) if name})
+
+    def _filter_clause(self, terms: List[str], diet: str, min_minutes: Optional[int] = None,
+                       max_minutes: Optional[int] = None) -> Optional[Tuple[str, List]]:
+        """Construye la condición WHERE para la dieta, los ingredientes requeridos y el
+        rango de minutos de cocción (índice de minutos; las recetas sin tiempo quedan
+        fuera si se pide un rango). Devuelve None si la dieta no existe."""
+        masks = self._diet_mask_values(diet)
+        if not masks:
+            return None
+        where = f"dieta_mask IN ({', '.join('?' * len(masks))})"
+        params: List = list(masks)
+        if terms:
+            # Intersección de las listas de ocurrencias de receta_ingredientes
+            postings = " INTERSECT ".join([POSTING_SQL] * len(terms))
+            where = f"id IN ({postings}) AND {where}"
+            params = terms + params
+        if min_minutes is not None:
+            where += " AND minutos >= ?"
+            params.append(min_minutes)
+        if max_minutes is not None:
+            where += " AND minutos <= ?"
+            params.append(max_minutes)
+        return where, params
+
+    def get_recipes_by_diet(self, diet: str) -> List[Recipe]:
+        """Obtiene las recetas compatibles con la dieta usando el índice de dieta_mask"""
+        clause = self._filter_clause([], diet)
+        if clause is None:
+            return []
+        where, params = clause
+        try:
+            return self._cached_query(
+                ("diet", diet),
+                lambda: self._query_recipes(f"SELECT {RECIPE_COLUMNS} FROM recetas WHERE {where} ORDER BY id", params)
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Error al obtener recetas por dieta: {e}")
+            return []
+
+    def search_recipes(self, ingredients: Iterable[str], diet: str) -> List[Recipe]:
+        """Busca recetas que contengan los ingredientes especificados y cumplan con la dieta.
+
+        La búsqueda intersecta las listas de ocurrencias del índice de ingredientes,
+        por lo que su costo depende de las recetas coincidentes y no del tamaño del catálogo.
+        Los IDs del resultado quedan en la caché de consultas: repetir la búsqueda solo
+        vuelve a leer las filas.
+        """
+        terms = self._query_terms(ingredients)
+        if not terms:
+            return self.get_recipes_by_diet(diet)
+        recipe_ids = self.get_recipe_ids(diet, terms)
+        return [
+            recipe for start in range(0, len(recipe_ids), ID_CHUNK_SIZE)
+            for recipe in self.get_recipes_by_ids(recipe_ids[start:start + ID_CHUNK_SIZE])
+        ]
+
+    def get_recipe_ids(self, diet: str, ingredients: Iterable[str] = (), min_minutes: Optional[int] = None,
+                       max_minutes: Optional[int] = None, order: str = "id") -> List[int]:
+        """Obtiene (y guarda en caché) solo los IDs de las recetas que coinciden,
+        para paginar resultados grandes sin materializar las filas"""
+        terms = self._query_terms(ingredients)
+        clause = self._filter_clause(terms, diet, min_minutes, max_minutes)
+        if clause is None:
+            return []
+        where, params = clause
+        time_key = (min_minutes, max_minutes, order)
+
+        def load_ids() -> List[int]:
+            # La matriz de bits resuelve dieta + ingredientes; el rango y el orden por
+            # minutos siguen en SQL
+            matrix = self._bit_matrix() if time_key == (None, None, "id") else None
+            if matrix is not None:
+                return matrix.matching_ids(terms, DIET_BITS.get(diet, 0))
+            narrowed = self._narrow_cached_ids(diet, terms, time_key)
+            if narrowed is not None:
+                return narrowed
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"SELECT id FROM recetas WHERE {where} ORDER BY {RESULT_ORDERS[order]}", params)
+                return [row[0] for row in cursor.fetchall()]
+
+        try:
+            return self._cached_query(("ids", diet, tuple(terms), time_key), load_ids)
+        except sqlite3.Error as e:
+            logger.error(f"Error al obtener IDs de recetas: {e}")
+            return []
+
+    def _narrow_cached_ids(self, diet: str, terms: List[str], time_key: Tuple) -> Optional[List[int]]:
+        """Refina en memoria el resultado en caché más chico de una consulta anterior
+        con un subconjunto de estos ingredientes (misma dieta, mismo rango de minutos y
+        orden), por ejemplo al escribir un ingrediente más. Devuelve None si no hay
+        ninguno que sirva de punto de partida. Se llama con el bloqueo tomado."""
+        wanted = set(terms)
+        base_terms: Optional[Tuple[str, ...]] = None
+        ids: List[int] = []
+        for key, cached_ids in self._query_cache.items():
+            if key[0] == "ids" and key[1] == diet and key[3] == time_key and key[2] and set(key[2]) < wanted:
+                if base_terms is None or len(cached_ids) < len(ids):
+                    base_terms, ids = key[2], cached_ids
+        if base_terms is None:
+            return None
+
+        for term in sorted(wanted - set(base_terms)):
+            if not ids:
+                break
+            if ("posting", term) in self._query_cache or len(ids) > NARROW_LOOKUP_LIMIT:
+                posting = self._ingredient_posting(term)
+            else:
+                # Pocos candidatos: se verifican con la clave primaria del índice
+                with self._connection() as conn:
+                    posting = {
+                        row[0] for row in conn.execute(
+                            f"{POSTING_SQL} AND receta_id IN ({', '.join('?' * len(ids))})",
+                            [term] + ids
+                        )
+                    }
+            ids = [recipe_id for recipe_id in ids if recipe_id in posting]
+        return ids
+
+    def count_recipes(self, diet: str, ingredients: Iterable[str] = (), min_minutes: Optional[int] = None,
+                      max_minutes: Optional[int] = None) -> int:
+        """Cuenta las recetas que coinciden con la dieta, los ingredientes y el rango de minutos"""
+        return len(self.get_recipe_ids(diet, ingredients, min_minutes, max_minutes))
+
+    def get_recipes_by_ids(self, recipe_ids: Sequence[int]) -> List[Recipe]:
+        """Obtiene las recetas indicadas respetando el orden de los IDs"""
+        if not recipe_ids:
+            return []
+        try:
+            recipes = self._query_recipes(
+                f"SELECT {RECIPE_COLUMNS} FROM recetas WHERE id IN ({', '.join('?' * len(recipe_ids))})",
+                recipe_ids
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Error al obtener recetas por IDs: {e}")
+            return []
+        by_id = {recipe.id: recipe for recipe in recipes}
+        return [by_id[recipe_id] for recipe_id in recipe_ids if recipe_id in by_id]
+
+    def get_recipes_page(self, diet: str, offset: int, limit: int, ingredients: Iterable[str] = (),
+                         min_minutes: Optional[int] = None, max_minutes: Optional[int] = None,
+                         order: str = "id") -> List[Recipe]:
+        """Obtiene una página de resultados: solo se leen las filas de la ventana pedida"""
+        recipe_ids = self.get_recipe_ids(diet, ingredients, min_minutes, max_minutes, order)
+        return self.get_recipes_by_ids(recipe_ids[max(0, offset):max(0, offset) + limit])
+
+    def iter_recipe_ids(self, diet: str, ingredients: Iterable[str] = (), chunk_size: int = ID_CHUNK_SIZE,
+                        min_minutes: Optional[int] = None, max_minutes: Optional[int] = None,
+                        order: str = "id") -> Iterator[List[int]]:
+        """Entrega los IDs que coinciden en bloques ordenados. Si el resultado está en
+        caché (o se puede refinar desde uno anterior) sale de memoria; si no, se consulta
+        de a un bloque por vez: el primero llega sin esperar al resultado completo y se
+        puede abandonar la consulta entre bloques"""
+        terms = self._query_terms(ingredients)
+        clause = self._filter_clause(terms, diet, min_minutes, max_minutes)
+        if clause is None:
+            return
+        where, params = clause
+        time_key = (min_minutes, max_minutes, order)
+        key = ("ids", diet, tuple(terms), time_key)
+
+        # Resultado ya en caché, o refinable a partir de uno anterior
+        try:
+            with self._lock:
+                version = self._validate_cache()
+                ids = self._query_cache.get(key)
+                if ids is None:
+                    ids = self._narrow_cached_ids(diet, terms, time_key)
+                    if ids is not None:
+                        self._query_cache.put(key, ids)
+        except sqlite3.Error as e:
+            logger.error(f"Error al obtener IDs de recetas: {e}")
+            return
+        if ids is None and order != "id":
+            # Orden por tiempo: una sola consulta ordenada por SQLite, que queda en caché
+            ids = self.get_recipe_ids(diet, terms, min_minutes, max_minutes, order)
+        if ids is not None:
+            for start in range(0, len(ids), chunk_size):
+                yield ids[start:start + chunk_size]
+            return
+
+        sql = f"SELECT id FROM recetas WHERE id > ? AND {where} ORDER BY id LIMIT ?"
+        collected: List[int] = []
+        last_id = 0
+        while True:
+            try:
+                with self._connection() as conn:
+                    chunk = [row[0] for row in conn.execute(sql, [last_id] + params + [chunk_size])]
+            except sqlite3.Error as e:
+                logger.error(f"Error al obtener IDs de recetas: {e}")
+                return
+            collected.extend(chunk)
+            if chunk:
+                yield chunk
+            if len(chunk) < chunk_size:
+                break
+            last_id = chunk[-1]
+        # Recorrido completo: queda en caché como punto de partida de consultas más finas,
+        # salvo que haya habido escrituras mientras tanto
+        with self._lock:
+            if self.catalog_version() == version:
+                self._query_cache.put(key, collected)
+
+    def _ingredient_posting(self, ingredient: str) -> frozenset:
+        """Lista de ocurrencias de un ingrediente como conjunto en memoria (en caché)"""
+        def load() -> frozenset:
+            with self._connection() as conn:
+                cursor = conn.execute(POSTING_SQL, (ingredient,))
+                return frozenset(row[0] for row in cursor)
+        return self._cached_query(("posting", ingredient), load)
+
+    def _recipe_stats(self) -> Tuple[array, bytearray]:
+        """Cantidad de ingredientes y máscara de dietas de cada receta, indexadas por ID"""
+        def load() -> Tuple[array, bytearray]:
+            with self._snapshot() as conn:
+                max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM recetas").fetchone()[0]
+                sizes = array("H", [0]) * (max_id + 1)
+                masks = bytearray(max_id + 1)
+                for recipe_id, size, mask in conn.execute("SELECT id, num_ingredientes, dieta_mask FROM recetas"):
+                    sizes[recipe_id] = size or 0
+                    masks[recipe_id] = mask or 0
+                return sizes, masks
+        return self._cached(("recipe_stats",), load)
+
+    def get_recipe_minutes(self) -> array:
+        """Minutos de cocción de cada receta indexados por ID (-1 si no se reconocieron),
+        para ordenar en memoria resultados ya filtrados (en caché)"""
+        def load() -> array:
+            with self._snapshot() as conn:
+                max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM recetas").fetchone()[0]
+                minutes = array("i", [-1]) * (max_id + 1)
+                for recipe_id, value in conn.execute("SELECT id, minutos FROM recetas WHERE minutos IS NOT NULL"):
+                    minutes[recipe_id] = value
+                return minutes
+        return self._cached(("recipe_minutes",), load)
+
+    def _bit_matrix(self) -> Optional["IngredientBitMatrix"]:
+        """Matriz de bits vigente, o None si el motor NumPy está desactivado. Las
+        escrituras propias la actualizan receta por receta (_update_bit_matrix); si otro
+        proceso escribió (cambió PRAGMA data_version) se reconstruye desde las tablas
+        normalizadas."""
+        if not self.bit_matrix:
+            return None
+        with self._lock:
+            data_version = self.catalog_version()[0]
+            if self._matrix is None or data_version != self._matrix_version:
+                from bitmatrix import IngredientBitMatrix  # ya cargado en __init__
+                with self._snapshot() as conn:
+                    self._matrix = IngredientBitMatrix.from_rows(
+                        conn.execute("SELECT id, COALESCE(dieta_mask, 0), COALESCE(num_ingredientes, 0) FROM recetas"),
+                        conn.execute("SELECT receta_id, ingrediente_id FROM receta_ingredientes"),
+                        conn.execute("SELECT id, nombre FROM ingredientes")
+                    )
+                self._matrix_version = data_version
+            return self._matrix
+
+    def _update_bit_matrix(self, recipe_id: int, recipe_data: Optional[Dict]) -> None:
+        """Aplica una escritura propia a la matriz de bits, si está cargada
+        (recipe_data None: la receta ya no existe)"""
+        with self._lock:
+            if self._matrix is None:
+                return
+            if recipe_data is None:
+                self._matrix.remove_recipe(recipe_id)
+            else:
+                self._matrix.set_recipe(
+                    recipe_id,
+                    split_ingredients(recipe_data["ingredients"]),
+                    self.compute_diet_mask(recipe_data["diets"], recipe_data["ingredients"])
+                )
+
+    def search_closest(self, ingredients: Iterable[str], diet: str, k: int = 20,
+                       min_minutes: Optional[int] = None, max_minutes: Optional[int] = None) -> List[RankedRecipe]:
+        """Devuelve las k recetas más parecidas a los ingredientes disponibles.
+
+        La puntuación es el índice de Jaccard entre los ingredientes de la receta y los
+        del usuario (empates: menos faltantes primero). Las listas de ocurrencias se
+        recorren de la más rara a la más común con un heap acotado a k; cuando ninguna
+        receta aún no vista puede superar al peor del heap, se deja de buscar, así que
+        los ingredientes muy comunes (sal, aceite) casi nunca se recorren completos.
+        Con el motor NumPy (bit_matrix=True) la cobertura de todo el catálogo sale de un
+        popcount sobre la matriz de bits. Con min_minutes/max_minutes solo compiten las
+        recetas de ese rango de tiempo (las que no tienen tiempo reconocido quedan fuera).
+        """
+        terms = self._query_terms(ingredients)
+        bit = DIET_BITS.get(diet, 0)
+        if not terms or not bit or k <= 0:
+            return []
+        try:
+            minutes = None
+            if min_minutes is not None or max_minutes is not None:
+                minutes = self.get_recipe_minutes()
+            matrix = self._bit_matrix()
+            if matrix is not None:
+                allowed = None if minutes is None else matrix.allowed_by_range(minutes, min_minutes, max_minutes)
+                best = matrix.closest(terms, bit, k, allowed)
+            else:
+                allowed_id = None
+                if minutes is not None:
+                    low = 0 if min_minutes is None else min_minutes
+                    high = float("inf") if max_minutes is None else max_minutes
+                    allowed_id = lambda recipe_id: recipe_id < len(minutes) and low <= minutes[recipe_id] <= high
+                best = self._closest_by_postings(terms, bit, k, allowed_id)
+        except sqlite3.Error as e:
+            logger.error(f"Error al buscar recetas aproximadas: {e}")
+            return []
+
+        recipes = {recipe.id: recipe for recipe in self.get_recipes_by_ids([item[2] for item in best])}
+        query_set = set(terms)
+        ranked = []
+        for score, _, recipe_id in best:
+            recipe = recipes.get(recipe_id)
+            if recipe is None:
+                continue
+            # Nombre canónico -> nombre tal como figura en la receta
+            recipe_ingredients = {
+                normalize_ingredient(name): name.strip() for name in recipe.ingredients.split(",") if name.strip()
+            }
+            recipe_ingredients.pop("", None)
+            ranked.append(RankedRecipe(
+                recipe,
+                score,
+                len(recipe_ingredients.keys() & query_set),
+                sorted(name for canonical, name in recipe_ingredients.items() if canonical not in query_set)
+            ))
+        return ranked
+
+    def _closest_by_postings(self, terms: List[str], bit: int, k: int,
+                             allowed: Optional[Callable[[int], bool]] = None) -> List[Tuple[float, int, int]]:
+        """Las k mejores (puntaje, -faltantes, id) de search_closest recorriendo las
+        listas de ocurrencias en memoria, de mejor a peor (solo las recetas allowed)"""
+        sizes, masks = self._recipe_stats()
+        postings = sorted((self._ingredient_posting(term) for term in terms), key=len)
+
+        query_size = len(terms)
+        heap: List[Tuple[float, int, int]] = []   # (puntaje, -faltantes, id)
+        seen: Set[int] = set()
+        for position, posting in enumerate(postings):
+            # Una receta vista por primera vez aquí coincide como mucho en max_matched ingredientes;
+            # con ese mismo puntaje y sin faltantes ganaría el desempate, así que solo se
+            # corta si el peor del heap lo supera estrictamente
+            max_matched = query_size - position
+            if len(heap) == k and heap[0][0] > max_matched / query_size:
+                break
+            remaining = postings[position + 1:]
+            for recipe_id in posting:
+                if recipe_id in seen:
+                    continue
+                seen.add(recipe_id)
+                if recipe_id >= len(masks) or not masks[recipe_id] & bit:
+                    continue
+                if allowed is not None and not allowed(recipe_id):
+                    continue
+                size = sizes[recipe_id]
+                if len(heap) == k:
+                    bound = min(max_matched, size)
+                    if bound / (size + query_size - bound) < heap[0][0]:
+                        continue
+                matched = 1 + sum(1 for other in remaining if recipe_id in other)
+                size = max(size, matched)
+                item = (matched / (size + query_size - matched), matched - size, recipe_id)
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+        return sorted(heap, reverse=True)
+
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        """Convierte el texto del usuario en una consulta FTS5 segura: cada palabra
+        es un término entre comillas con búsqueda por prefijo, combinados con AND"""
+        return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text.lower()))
+
+    def search_text(self, text: str, diet: Optional[str] = None, limit: int = 50,
+                    min_minutes: Optional[int] = None, max_minutes: Optional[int] = None) -> List[Recipe]:
+        """Búsqueda de texto libre en nombre, ingredientes y preparación, ordenada por
+        relevancia (bm25) y opcionalmente filtrada por dieta y rango de minutos"""
+        return [recipe for _, recipe in self.search_text_ranked(text, diet, limit, min_minutes, max_minutes)]
+
+    def search_text_ranked(self, text: str, diet: Optional[str] = None, limit: int = 50,
+                           min_minutes: Optional[int] = None,
+                           max_minutes: Optional[int] = None) -> List[Tuple[float, Recipe]]:
+        """Como search_text, con el puntaje bm25 de cada receta (menor es más relevante;
+        0 para todas si no hay FTS5)"""
+        query = self._fts_query(text)
+        if not query:
+            return []
+        params: List = [query]
+        diet_filter = ""
+        if diet is not None:
+            masks = self._diet_mask_values(diet)
+            if not masks:
+                return []
+            diet_filter = f"AND r.dieta_mask IN ({', '.join('?' * len(masks))})"
+            params += masks
+        if min_minutes is not None:
+            diet_filter += " AND r.minutos >= ?"
+            params.append(min_minutes)
+        if max_minutes is not None:
+            diet_filter += " AND r.minutos <= ?"
+            params.append(max_minutes)
+        columns = ", ".join(f"r.{column}" for column in RECIPE_COLUMNS.split(", "))
+
+        if not self.fts_enabled:
+            # Sin FTS5: coincidencia por subcadena de cada palabra, sin ranking
+            words = re.findall(r"\w+", text.lower())
+            conditions = " AND ".join(
+                "lower(r.nombre || ' ' || r.ingredientes || ' ' || r.preparacion) LIKE ?" for _ in words
+            )
+            sql = f"SELECT {columns}, 0.0 FROM recetas r WHERE {conditions} {diet_filter} ORDER BY r.id LIMIT ?"
+            params = [f"%{word}%" for word in words] + params[1:]
+        else:
+            weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+            sql = (
+                f"SELECT {columns}, bm25(recetas_fts, {weights}) AS puntaje "
+                f"FROM recetas_fts JOIN recetas r ON r.id = recetas_fts.rowid "
+                f"WHERE recetas_fts MATCH ? {diet_filter} "
+                f"ORDER BY puntaje LIMIT ?"
+            )
+        try:
+            with self._connection() as conn:
+                return [(row[-1], Recipe(*row[:-1])) for row in conn.execute(sql, params + [limit])]
+        except sqlite3.Error as e:
+            logger.error(f"Error en la búsqueda de texto: {e}")
+            return []
+
+    def iter_recipes(self, diet: Optional[str] = None, ingredients: Iterable[str] = (),
+                     text: Optional[str] = None, chunk_size: int = EXPORT_CHUNK_SIZE,
+                     min_minutes: Optional[int] = None, max_minutes: Optional[int] = None,
+                     after_id: int = 0) -> Iterator[Recipe]:
+        """Recorre el catálogo en orden de ID (desde after_id, sin incluirlo), opcionalmente
+        filtrado por dieta, ingredientes requeridos, texto libre y/o rango de minutos.
+
+        Lee por bloques de chunk_size filas continuando desde el último ID entregado,
+        así que la memoria usada no depende del tamaño del catálogo y la conexión no
+        queda bloqueada mientras el consumidor procesa cada bloque.
+        """
+        conditions: List[str] = []
+        params: List = []
+        if diet is not None:
+            masks = self._diet_mask_values(diet)
+            if not masks:
+                return
+            conditions.append(f"dieta_mask IN ({', '.join('?' * len(masks))})")
+            params += masks
+        terms = self._query_terms(ingredients)
+        if terms:
+            postings = " INTERSECT ".join([POSTING_SQL] * len(terms))
+            conditions.append(f"id IN ({postings})")
+            params += terms
+        if text is not None:
+            words = re.findall(r"\w+", text.lower())
+            if not words:
+                return
+            if self.fts_enabled:
+                conditions.append("id IN (SELECT rowid FROM recetas_fts WHERE recetas_fts MATCH ?)")
+                params.append(self._fts_query(text))
+            else:
+                conditions += ["lower(nombre || ' ' || ingredientes || ' ' || preparacion) LIKE ?"] * len(words)
+                params += [f"%{word}%" for word in words]
+        if min_minutes is not None:
+            conditions.append("minutos >= ?")
+            params.append(min_minutes)
+        if max_minutes is not None:
+            conditions.append("minutos <= ?")
+            params.append(max_minutes)
+        where = "".join(f" AND {condition}" for condition in conditions)
+        sql = f"SELECT {RECIPE_COLUMNS} FROM recetas WHERE id > ?{where} ORDER BY id LIMIT ?"
+
+        last_id = after_id
+        while True:
+            try:
+                chunk = self._query_recipes(sql, [last_id] + params + [chunk_size])
+            except sqlite3.Error as e:
+                logger.error(f"Error al recorrer recetas: {e}")
+                return
+            yield from chunk
+            if len(chunk) < chunk_size:
+                return
+            last_id = chunk[-1].id
+
+    def _is_recipe_compatible(self, recipe: Recipe, diet: str) -> bool:
+        """Verifica si una receta es compatible con la dieta especificada"""
+        return bool(self.compute_diet_mask(recipe.diets, recipe.ingredients) & DIET_BITS.get(diet, 0))
+
+    def _recipe_row(self, recipe_data: Dict) -> Tuple:
+        """Valores para INSERT_RECIPE_SQL y UPDATE_RECIPE_SQL, con los campos precalculados"""
+        return (
+            recipe_data["name"],
+            recipe_data["ingredients"],
+            recipe_data["quantities"],
+            recipe_data["preparation"],
+            recipe_data["cooking_time"],
+            recipe_data["diets"],
+            self.compute_diet_mask(recipe_data["diets"], recipe_data["ingredients"]),
+            len(split_ingredients(recipe_data["ingredients"])),
+            parse_cooking_minutes(recipe_data["cooking_time"])
+        )
+
+    def add_recipe(self, recipe_data: Dict) -> Optional[int]:
+        """Agrega una nueva receta a la base de datos; devuelve su ID (None si falló)"""
+        def apply(cursor: sqlite3.Cursor) -> int:
+            cursor.execute(INSERT_RECIPE_SQL, self._recipe_row(recipe_data))
+            recipe_id = cursor.lastrowid
+            self._store_links(cursor, recipe_id, recipe_data)
+            return recipe_id
+        try:
+            recipe_id = self._write(apply)
+        except sqlite3.Error as e:
+            logger.error(f"Error al agregar receta: {e}")
+            return None
+        self._mark_written(self._data_state(recipe_data))
+        self._update_bit_matrix(recipe_id, recipe_data)
+        return recipe_id
+
+    def bulk_import(self, records: Iterable[Dict], batch_size: int = IMPORT_BATCH_SIZE,
+                    progress: Optional[Callable[[ImportReport], None]] = None) -> ImportReport:
+        """Importa recetas en lotes grandes desde cualquier iterable (se consume como stream).
+
+        Cada registro se valida con normalize_recipe_data; los inválidos se cuentan y se
+        omiten. Las filas se insertan con executemany, un commit por lote. Los índices
+        secundarios, las tablas normalizadas y la tabla FTS se actualizan una sola vez al
+        final de la carga. Es una operación de mantenimiento: no debe haber otros
+        escritores mientras dura.
+        """
+        report = ImportReport()
+        started = time.perf_counter()
+        with self._lock:
+            conn = self._get_connection()
+            first_new_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM recetas").fetchone()[0]
+            self._begin_bulk_load(conn)
+            try:
+                batch: List[Tuple] = []
+                for record in records:
+                    report.read += 1
+                    try:
+                        batch.append(self._recipe_row(normalize_recipe_data(record)))
+                    except (ValueError, AttributeError) as e:
+                        report.rejected += 1
+                        if len(report.errors) < MAX_REPORTED_ERRORS:
+                            report.errors.append(f"registro {report.read}: {e}")
+                        continue
+                    if len(batch) >= batch_size:
+                        self._insert_batch(conn, batch, report, started, progress)
+                        batch = []
+                if batch:
+                    self._insert_batch(conn, batch, report, started, progress)
+            finally:
+                self._finish_bulk_load(conn, first_new_id)
+                self._mark_written()
+                # Más barato reconstruir la matriz de bits que actualizarla fila por fila
+                self._matrix = None
+        report.elapsed = time.perf_counter() - started
+        logger.info(
+            f"Importación: {report.inserted} recetas insertadas, {report.rejected} rechazadas "
+            f"en {report.elapsed:.1f} s ({report.rows_per_second:.0f} filas/s)"
+        )
+        return report
+
+    def _insert_batch(self, conn: sqlite3.Connection, batch: List[Tuple], report: ImportReport,
+                      started: float, progress: Optional[Callable[[ImportReport], None]]) -> None:
+        """Inserta un lote en su propia transacción e informa el avance"""
+        with conn:
+            conn.executemany(INSERT_RECIPE_SQL, batch)
+        report.inserted += len(batch)
+        report.elapsed = time.perf_counter() - started
+        if progress:
+            progress(report)
+
+    def _begin_bulk_load(self, conn: sqlite3.Connection) -> None:
+        """Suspende el mantenimiento de índices secundarios y de la tabla FTS"""
+        with conn:
+            for index in SECONDARY_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {index}")
+            for trigger in ("recetas_fts_insert", "recetas_fts_delete", "recetas_fts_update"):
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+    def _finish_bulk_load(self, conn: sqlite3.Connection, first_new_id: int) -> None:
+        """Indexa de una vez las recetas cargadas (id > first_new_id) y restaura
+        índices y triggers"""
+        # Se resuelve antes de abrir la transacción: consultarlo adentro podría
+        # abrir otra conexión y confirmar la carga a medias
+        fts_enabled = self.fts_enabled
+        with conn:
+            # Tablas normalizadas por lotes, sin índices secundarios que mantener
+            self._store_links_after(conn, first_new_id)
+
+            if fts_enabled:
+                conn.execute(
+                    "INSERT INTO recetas_fts (rowid, nombre, ingredientes, preparacion) "
+                    "SELECT id, nombre, ingredientes, preparacion FROM recetas WHERE id > ?",
+                    (first_new_id,)
+                )
+                for trigger in FTS_TRIGGERS:
+                    conn.execute(trigger)
+            for index in SECONDARY_INDEXES.values():
+                conn.execute(index)
+
+    def update_recipe(self, recipe_id: int, recipe_data: Dict) -> bool:
+        """Actualiza una receta existente"""
+        def apply(cursor: sqlite3.Cursor) -> Tuple[List[Tuple[Set[str], int]], int]:
+            changes = self._recipe_state(cursor, recipe_id)
+            cursor.execute(UPDATE_RECIPE_SQL, self._recipe_row(recipe_data) + (recipe_id,))
+            updated = cursor.rowcount
+            self._delete_links(cursor, recipe_id)
+            if updated:
+                self._store_links(cursor, recipe_id, recipe_data)
+                changes += self._data_state(recipe_data)
+            return changes, updated
+        try:
+            changes, updated = self._write(apply)
+        except sqlite3.Error as e:
+            logger.error(f"Error al actualizar receta: {e}")
+            return False
+        self._mark_written(changes)
+        self._update_bit_matrix(recipe_id, recipe_data if updated else None)
+        return True
+
+    def delete_recipe(self, recipe_id: int) -> bool:
+        """Elimina una receta de la base de datos"""
+        def apply(cursor: sqlite3.Cursor) -> List[Tuple[Set[str], int]]:
+            changes = self._recipe_state(cursor, recipe_id)
+            cursor.execute("DELETE FROM recetas WHERE id=?", (recipe_id,))
+            self._delete_links(cursor, recipe_id)
+            return changes
+        try:
+            changes = self._write(apply)
+        except sqlite3.Error as e:
+            logger.error(f"Error al eliminar receta: {e}")
+            return False
+        self._mark_written(changes)
+        self._update_bit_matrix(recipe_id, None)
+        return True
+
+    # ---- Escrituras por lotes: N cambios en una sola transacción (un solo commit) ----
+
+    def add_recipes(self, recipes: Iterable[Dict]) -> List[int]:
+        """Agrega varias recetas en una transacción; devuelve sus IDs (vacío si falló,
+        en cuyo caso no se agrega ninguna)"""
+        recipes = list(recipes)
+        def apply(cursor: sqlite3.Cursor) -> List[int]:
+            recipe_ids = []
+            for recipe_data in recipes:
+                cursor.execute(INSERT_RECIPE_SQL, self._recipe_row(recipe_data))
+                recipe_ids.append(cursor.lastrowid)
+                self._store_links(cursor, cursor.lastrowid, recipe_data)
+            return recipe_ids
+        try:
+            recipe_ids = self._write(apply)
+        except sqlite3.Error as e:
+            logger.error(f"Error al agregar recetas: {e}")
+            return []
+        self._mark_written([state for recipe_data in recipes for state in self._data_state(recipe_data)])
+        for recipe_id, recipe_data in zip(recipe_ids, recipes):
+            self._update_bit_matrix(recipe_id, recipe_data)
+        return recipe_ids
+
+    def update_recipes(self, changes: Dict[int, Dict]) -> int:
+        """Actualiza varias recetas (ID -> datos) en una transacción; devuelve cuántas
+        existían y se actualizaron (0 si falló: no se aplica ninguna)"""
+        def apply(cursor: sqlite3.Cursor) -> Tuple[List[int], List[Tuple[Set[str], int]]]:
+            updated, states = [], []
+            for recipe_id, recipe_data in changes.items():
+                before = self._recipe_state(cursor, recipe_id)
+                if not before:
+                    continue
+                cursor.execute(UPDATE_RECIPE_SQL, self._recipe_row(recipe_data) + (recipe_id,))
+                self._delete_links(cursor, recipe_id)
+                self._store_links(cursor, recipe_id, recipe_data)
+                updated.append(recipe_id)
+                states += before + self._data_state(recipe_data)
+            return updated, states
+        try:
+            updated, states = self._write(apply)
+        except sqlite3.Error as e:
+            logger.error(f"Error al actualizar recetas: {e}")
+            return 0
+        self._mark_written(states)
+        for recipe_id in updated:
+            self._update_bit_matrix(recipe_id, changes[recipe_id])
+        return len(updated)
+
+    def set_recipes_diets(self, recipe_ids: Iterable[int], diets: str) -> int:
+        """Reemplaza las dietas declaradas de varias recetas en una transacción (la
+        máscara se recalcula con los ingredientes de cada una); devuelve cuántas cambiaron"""
+        recipe_ids = list(dict.fromkeys(recipe_ids))
+        def apply(cursor: sqlite3.Cursor) -> Tuple[List[Tuple[int, Dict]], List[Tuple[Set[str], int]]]:
+            updated, states = [], []
+            for recipe_id in recipe_ids:
+                row = cursor.execute("SELECT ingredientes, dieta_mask FROM recetas WHERE id=?", (recipe_id,)).fetchone()
+                if row is None:
+                    continue
+                recipe_data = {"ingredients": row[0], "diets": diets}
+                cursor.execute(
+                    "UPDATE recetas SET dieta=?, dieta_mask=? WHERE id=?",
+                    (diets, self.compute_diet_mask(diets, row[0]), recipe_id)
+                )
+                updated.append((recipe_id, recipe_data))
+                states += [(split_ingredients(row[0]), row[1] or 0)] + self._data_state(recipe_data)
+            cursor.executemany("DELETE FROM receta_dietas WHERE receta_id=?", [(recipe_id,) for recipe_id, _ in updated])
+            cursor.executemany(
+                "INSERT OR IGNORE INTO receta_dietas (receta_id, dieta) VALUES (?, ?)",
+                [(recipe_id, diet) for recipe_id, _ in updated for diet in split_diets(diets)]
+            )
+            return updated, states
+        try:
+            updated, states = self._write(apply)
+        except sqlite3.Error as e:
+            logger.error(f"Error al cambiar la dieta de las recetas: {e}")
+            return 0
+        self._mark_written(states)
+        for recipe_id, recipe_data in updated:
+            self._update_bit_matrix(recipe_id, recipe_data)
+        return len(updated)
+
+    def delete_recipes(self, recipe_ids: Iterable[int]) -> int:
+        """Elimina varias recetas en una transacción; devuelve cuántas existían
+        (0 si falló: no se elimina ninguna)"""
+        recipe_ids = list(dict.fromkeys(recipe_ids))
+        def apply(cursor: sqlite3.Cursor) -> Tuple[List[int], List[Tuple[Set[str], int]]]:
+            deleted, states = [], []
+            for recipe_id in recipe_ids:
+                before = self._recipe_state(cursor, recipe_id)
+                if before:
+                    deleted.append(recipe_id)
+                    states += before
+            rows = [(recipe_id,) for recipe_id in deleted]
+            cursor.executemany("DELETE FROM recetas WHERE id=?", rows)
+            cursor.executemany("DELETE FROM receta_ingredientes WHERE receta_id=?", rows)
+            cursor.executemany("DELETE FROM receta_dietas WHERE receta_id=?", rows)
+            return deleted, states
+        try:
+            deleted, states = self._write(apply)
+        except sqlite3.Error as e:
+            logger.error(f"Error al eliminar recetas: {e}")
+            return 0
+        self._mark_written(states)
+        for recipe_id in deleted:
+            self._update_bit_matrix(recipe_id, None)
+        return len(deleted)
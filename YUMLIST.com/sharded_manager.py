@@ -0,0 +1,567 @@
+"""Catálogo fragmentado: las recetas se reparten entre N archivos SQLite.
+
+Cada fragmento lo atiende un proceso propio, con su conexión y sus índices en
+memoria (la caché de RecipeManager). Las consultas se envían a todos los procesos a
+la vez y los resultados parciales se combinan aquí: listas de IDs por intercalado
+ordenado, mejores coincidencias (top-k) por puntaje y conteos por suma. Con un
+núcleo por fragmento la latencia baja casi en proporción a la cantidad de núcleos.
+
+Los IDs son globales: id = id_local * N + fragmento, así cada receta se ubica sin
+consultar a nadie y el orden por ID dentro de un fragmento se conserva.
+
+Uso:
+    python cli.py --db recetas.db shard 4               # reparte una base existente
+    python cli.py --db recetas.db --shards 4 search arroz,tomate
+"""
+import heapq
+import logging
+import multiprocessing
+import os
+import threading
+from dataclasses import replace
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from recipe_manager import (
+    DB_NAME, EXPORT_CHUNK_SIZE, ID_CHUNK_SIZE, IMPORT_BATCH_SIZE, MAX_REPORTED_ERRORS,
+    ImportReport, RankedRecipe, Recipe, RecipeManager
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARDS = os.cpu_count() or 1
+
+def shard_paths(db_name: str, shards: int) -> List[str]:
+    """Archivos de los fragmentos: recetas.db -> recetas.1-de-4.db, ..., recetas.4-de-4.db"""
+    root, extension = os.path.splitext(db_name)
+    return [f"{root}.{index + 1}-de-{shards}{extension or '.db'}" for index in range(shards)]
+
+def open_manager(db_name: str = DB_NAME, shards: int = 0, bit_matrix: bool = False,
+                 sample_data: bool = True):
+    """RecipeManager sobre un solo archivo, o ShardedRecipeManager si shards > 1.
+    sample_data=False: una base nueva se crea vacía, sin las recetas de ejemplo"""
+    if shards and shards > 1:
+        return ShardedRecipeManager(db_name, shards, sample_data=sample_data, bit_matrix=bit_matrix)
+    return RecipeManager(db_name, sample_data=sample_data, bit_matrix=bit_matrix)
+
+class ShardError(RuntimeError):
+    """Un proceso de fragmento falló o dejó de responder"""
+
+class _Shard:
+    """Lado del proceso de fragmento: traduce IDs globales y llama a RecipeManager"""
+
+    def __init__(self, manager: RecipeManager, index: int, count: int, connection):
+        self.manager = manager
+        self.index = index
+        self.count = count
+        self.connection = connection
+
+    def _global(self, recipe_id: int) -> int:
+        return recipe_id * self.count + self.index
+
+    def _local(self, recipe_id: int) -> int:
+        return recipe_id // self.count
+
+    def _globalize(self, recipe: Recipe) -> Recipe:
+        return replace(recipe, id=self._global(recipe.id))
+
+    def ids(self, diet, ingredients, min_minutes, max_minutes, order) -> Tuple[List[int], Optional[List[int]]]:
+        """IDs globales en orden y, si el orden es por tiempo, sus minutos (-1 = sin tiempo)"""
+        ids = self.manager.get_recipe_ids(diet, ingredients, min_minutes, max_minutes, order)
+        minutes = None
+        if order != "id":
+            table = self.manager.get_recipe_minutes()
+            minutes = [table[recipe_id] if recipe_id < len(table) else -1 for recipe_id in ids]
+        return [self._global(recipe_id) for recipe_id in ids], minutes
+
+    def count_recipes(self, diet, ingredients, min_minutes, max_minutes) -> int:
+        return self.manager.count_recipes(diet, ingredients, min_minutes, max_minutes)
+
+    def recipes(self, recipe_ids: List[int]) -> List[Recipe]:
+        return [self._globalize(recipe) for recipe in self.manager.get_recipes_by_ids(
+            [self._local(recipe_id) for recipe_id in recipe_ids]
+        )]
+
+    def closest(self, ingredients, diet, k, min_minutes, max_minutes) -> List[RankedRecipe]:
+        return [replace(item, recipe=self._globalize(item.recipe))
+                for item in self.manager.search_closest(ingredients, diet, k, min_minutes, max_minutes)]
+
+    def text(self, text, diet, limit, min_minutes, max_minutes) -> List[Tuple[float, Recipe]]:
+        return [(score, self._globalize(recipe)) for score, recipe
+                in self.manager.search_text_ranked(text, diet, limit, min_minutes, max_minutes)]
+
+    def recipes_after(self, diet, ingredients, text, chunk_size, min_minutes, max_minutes, after_id) -> List[Recipe]:
+        """Un bloque del recorrido en orden de ID, desde el ID global after_id"""
+        recipes = self.manager.iter_recipes(
+            diet, ingredients, text, chunk_size, min_minutes, max_minutes,
+            after_id=self._local(after_id) if after_id else 0
+        )
+        return [self._globalize(recipe) for recipe in islice(recipes, chunk_size)]
+
+    def add_recipe(self, recipe_data: Dict) -> Optional[int]:
+        recipe_id = self.manager.add_recipe(recipe_data)
+        return None if recipe_id is None else self._global(recipe_id)
+
+    def update_recipe(self, recipe_id: int, recipe_data: Dict) -> bool:
+        return self.manager.update_recipe(self._local(recipe_id), recipe_data)
+
+    def delete_recipe(self, recipe_id: int) -> bool:
+        return self.manager.delete_recipe(self._local(recipe_id))
+
+    def add_recipes(self, recipes: List[Dict]) -> List[int]:
+        return [self._global(recipe_id) for recipe_id in self.manager.add_recipes(recipes)]
+
+    def update_recipes(self, changes: Dict[int, Dict]) -> int:
+        return self.manager.update_recipes({self._local(recipe_id): data for recipe_id, data in changes.items()})
+
+    def set_recipes_diets(self, recipe_ids: List[int], diets: str) -> int:
+        return self.manager.set_recipes_diets([self._local(recipe_id) for recipe_id in recipe_ids], diets)
+
+    def delete_recipes(self, recipe_ids: List[int]) -> int:
+        return self.manager.delete_recipes([self._local(recipe_id) for recipe_id in recipe_ids])
+
+    def bulk_import(self, batch_size: int) -> ImportReport:
+        """Importa los registros que el proceso principal envía por lotes (hasta None)
+        e informa el avance después de cada lote insertado"""
+        finished = False
+
+        def records() -> Iterator[Dict]:
+            nonlocal finished
+            while True:
+                batch = self.connection.recv()
+                if batch is None:
+                    finished = True
+                    return
+                yield from batch
+
+        try:
+            return self.manager.bulk_import(
+                records(), batch_size=batch_size,
+                progress=lambda report: self.connection.send(("progress", report))
+            )
+        finally:
+            # Si la importación falla a mitad, se descartan los lotes que todavía llegan
+            # hasta el final del stream: leídos después como operaciones desincronizarían
+            # la tubería
+            while not finished:
+                finished = self.connection.recv() is None
+
+    def catalog_version(self) -> Tuple[int, int]:
+        return self.manager.catalog_version()
+
+    def catalog_stats(self) -> Dict[str, int]:
+        return self.manager.catalog_stats()
+
+    def cache_stats(self) -> Dict[str, int]:
+        return self.manager.cache_stats()
+
+    def lock_stats(self) -> Dict[str, int]:
+        return self.manager.lock_stats()
+
+    def schema_version(self) -> int:
+        return self.manager.schema_version()
+
+def _shard_main(db_name: str, index: int, count: int, sample_data: bool, bit_matrix: bool, connection) -> None:
+    """Bucle del proceso de un fragmento: recibe (operación, argumentos) y responde"""
+    try:
+        manager = RecipeManager(db_name, sample_data=sample_data, bit_matrix=bit_matrix)
+        # Carga inicial de la caché, igual que al abrir la aplicación
+        manager.count_recipes("Omnívoro")
+    except Exception as e:
+        connection.send(("error", f"{type(e).__name__}: {e}"))
+        return
+    shard = _Shard(manager, index, count, connection)
+    connection.send(("ok", None))
+    try:
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            operation, args = message
+            try:
+                connection.send(("ok", getattr(shard, operation)(*args)))
+            except Exception as e:
+                logger.exception(f"Error en el fragmento {index + 1}: {e}")
+                connection.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        manager.close()
+
+class ShardedRecipeManager:
+    """Misma interfaz de consulta y escritura que RecipeManager, sobre N fragmentos
+    atendidos en paralelo por procesos separados"""
+
+    def __init__(self, db_name: str = DB_NAME, shards: int = DEFAULT_SHARDS, sample_data: bool = True,
+                 bit_matrix: bool = False):
+        if shards < 1:
+            raise ValueError("se necesita al menos un fragmento")
+        self.db_name = db_name
+        self.shards = shards
+        self.paths = shard_paths(db_name, shards)
+        # Un solo pedido en curso por vez en las tuberías (las consultas de varios hilos se encolan)
+        self._lock = threading.Lock()
+        # spawn: no hereda hilos ni conexiones abiertas del proceso principal
+        context = multiprocessing.get_context("spawn")
+        self._connections = []
+        self._processes = []
+        for index, path in enumerate(self.paths):
+            parent_end, child_end = context.Pipe()
+            process = context.Process(
+                target=_shard_main,
+                args=(path, index, shards, sample_data and index == 0, bit_matrix, child_end),
+                name=f"yumlist-shard-{index + 1}",
+                daemon=True
+            )
+            process.start()
+            child_end.close()
+            self._connections.append(parent_end)
+            self._processes.append(process)
+        try:
+            self._receive_all(range(shards))
+        except ShardError:
+            self.close()
+            raise
+        # Altas repartidas en ronda, continuando según el tamaño actual del catálogo
+        self._next_shard = sum(stats.get("recetas", 0) for stats in self._fan_out("catalog_stats")) % shards
+
+    def __enter__(self) -> "ShardedRecipeManager":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Detiene los procesos de los fragmentos"""
+        with self._lock:
+            for connection in self._connections:
+                try:
+                    connection.send(None)
+                except (OSError, ValueError):
+                    pass
+            for process in self._processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+            self._processes = []
+
+    # ---- Comunicación con los procesos ----
+
+    def _receive(self, index: int, on_progress: Optional[Callable[[int, ImportReport], None]] = None):
+        """Respuesta del fragmento; los avances de importación previos van a on_progress"""
+        while True:
+            try:
+                status, result = self._connections[index].recv()
+            except (EOFError, OSError) as e:
+                raise ShardError(f"el fragmento {index + 1} dejó de responder: {e}")
+            if status != "progress":
+                break
+            if on_progress:
+                on_progress(index, result)
+        if status != "ok":
+            raise ShardError(f"fragmento {index + 1}: {result}")
+        return result
+
+    def _drain_progress(self, index: int, on_progress: Callable[[int, ImportReport], None]) -> None:
+        """Lee los avances ya enviados por el fragmento sin esperar (durante una importación
+        el fragmento solo responde avances hasta recibir el final del stream)"""
+        connection = self._connections[index]
+        try:
+            while connection.poll():
+                status, result = connection.recv()
+                on_progress(index, result)
+        except (EOFError, OSError):
+            pass  # El fragmento terminó: el error se informa al leer la respuesta final
+
+    def _receive_all(self, indexes: Iterable[int],
+                     on_progress: Optional[Callable[[int, ImportReport], None]] = None) -> List:
+        # Se leen todas las respuestas aunque alguna falle, para no desincronizar las tuberías
+        results, error = [], None
+        for index in indexes:
+            try:
+                results.append(self._receive(index, on_progress))
+            except ShardError as e:
+                results.append(None)
+                error = error or e
+        if error:
+            raise error
+        return results
+
+    def _fan_out(self, operation: str, *args, shards: Optional[Sequence[int]] = None,
+                 per_shard_args: Optional[Dict[int, Tuple]] = None) -> List:
+        """Envía la operación a los fragmentos (todos por omisión) y espera todas las
+        respuestas: los procesos trabajan en paralelo mientras tanto"""
+        indexes = list(range(self.shards)) if shards is None else list(shards)
+        with self._lock:
+            for index in indexes:
+                shard_args = per_shard_args[index] if per_shard_args else args
+                self._connections[index].send((operation, shard_args))
+            return self._receive_all(indexes)
+
+    def _call(self, index: int, operation: str, *args):
+        return self._fan_out(operation, *args, shards=[index])[0]
+
+    def _shard_of(self, recipe_id: int) -> int:
+        return recipe_id % self.shards
+
+    # ---- Consultas ----
+
+    def catalog_version(self) -> Tuple[int, int]:
+        """Versión combinada: cambia si cambia la de cualquier fragmento"""
+        versions = self._fan_out("catalog_version")
+        return sum(version[0] for version in versions), sum(version[1] for version in versions)
+
+    def catalog_stats(self) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for stats in self._fan_out("catalog_stats"):
+            for table, rows in stats.items():
+                totals[table] = totals.get(table, 0) + rows
+        return totals
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Contadores de las cachés de consultas de todos los fragmentos, sumados"""
+        totals: Dict[str, int] = {}
+        for stats in self._fan_out("cache_stats"):
+            for name, value in stats.items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def lock_stats(self) -> Dict[str, int]:
+        """Escrituras reintentadas y abandonadas por bloqueo en todos los fragmentos"""
+        totals: Dict[str, int] = {}
+        for stats in self._fan_out("lock_stats"):
+            for name, value in stats.items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def schema_version(self) -> int:
+        return min(self._fan_out("schema_version"))
+
+    def get_recipe_ids(self, diet: str, ingredients: Iterable[str] = (), min_minutes: Optional[int] = None,
+                       max_minutes: Optional[int] = None, order: str = "id") -> List[int]:
+        """IDs globales de todos los fragmentos, intercalados en el orden pedido"""
+        parts = self._fan_out("ids", diet, list(ingredients), min_minutes, max_minutes, order)
+        if order == "id":
+            return list(heapq.merge(*(ids for ids, _ in parts)))
+        sign = -1 if order.startswith("-") else 1
+        # Mismo orden que en SQL: sin tiempo al final, luego minutos, luego ID
+        keyed = [
+            [(minute < 0, sign * minute, recipe_id) for recipe_id, minute in zip(ids, minutes)]
+            for ids, minutes in parts
+        ]
+        return [recipe_id for _, _, recipe_id in heapq.merge(*keyed)]
+
+    def count_recipes(self, diet: str, ingredients: Iterable[str] = (), min_minutes: Optional[int] = None,
+                      max_minutes: Optional[int] = None) -> int:
+        return sum(self._fan_out("count_recipes", diet, list(ingredients), min_minutes, max_minutes))
+
+    def iter_recipe_ids(self, diet: str, ingredients: Iterable[str] = (), chunk_size: int = ID_CHUNK_SIZE,
+                        min_minutes: Optional[int] = None, max_minutes: Optional[int] = None,
+                        order: str = "id") -> Iterator[List[int]]:
+        ids = self.get_recipe_ids(diet, ingredients, min_minutes, max_minutes, order)
+        for start in range(0, len(ids), chunk_size):
+            yield ids[start:start + chunk_size]
+
+    def get_recipes_by_ids(self, recipe_ids: Sequence[int]) -> List[Recipe]:
+        """Recetas indicadas (respetando el orden), pidiendo a cada fragmento solo las suyas"""
+        by_shard: Dict[int, List[int]] = {}
+        for recipe_id in recipe_ids:
+            by_shard.setdefault(self._shard_of(recipe_id), []).append(recipe_id)
+        if not by_shard:
+            return []
+        shards = sorted(by_shard)
+        parts = self._fan_out("recipes", shards=shards, per_shard_args={index: (by_shard[index],) for index in shards})
+        by_id = {recipe.id: recipe for part in parts for recipe in part}
+        return [by_id[recipe_id] for recipe_id in recipe_ids if recipe_id in by_id]
+
+    def get_recipe(self, recipe_id: int) -> Optional[Recipe]:
+        recipes = self.get_recipes_by_ids([recipe_id])
+        return recipes[0] if recipes else None
+
+    def get_recipes_page(self, diet: str, offset: int, limit: int, ingredients: Iterable[str] = (),
+                         min_minutes: Optional[int] = None, max_minutes: Optional[int] = None,
+                         order: str = "id") -> List[Recipe]:
+        recipe_ids = self.get_recipe_ids(diet, ingredients, min_minutes, max_minutes, order)
+        return self.get_recipes_by_ids(recipe_ids[max(0, offset):max(0, offset) + limit])
+
+    def get_all_recipes(self) -> List[Recipe]:
+        return list(self.iter_recipes())
+
+    def search_closest(self, ingredients: Iterable[str], diet: str, k: int = 20,
+                       min_minutes: Optional[int] = None, max_minutes: Optional[int] = None) -> List[RankedRecipe]:
+        """Top-k de cada fragmento y top-k global. El puntaje (Jaccard) solo depende de
+        la receta y la consulta, así que el resultado es el mismo que sin fragmentar"""
+        if k <= 0:
+            return []
+        parts = self._fan_out("closest", list(ingredients), diet, k, min_minutes, max_minutes)
+        # Mismo desempate que RecipeManager: menos faltantes, luego ID mayor
+        return heapq.nlargest(
+            k, (item for part in parts for item in part),
+            key=lambda item: (item.score, -len(item.missing), item.recipe.id)
+        )
+
+    def search_text(self, text: str, diet: Optional[str] = None, limit: int = 50,
+                    min_minutes: Optional[int] = None, max_minutes: Optional[int] = None) -> List[Recipe]:
+        return [recipe for _, recipe in self.search_text_ranked(text, diet, limit, min_minutes, max_minutes)]
+
+    def search_text_ranked(self, text: str, diet: Optional[str] = None, limit: int = 50,
+                           min_minutes: Optional[int] = None,
+                           max_minutes: Optional[int] = None) -> List[Tuple[float, Recipe]]:
+        """Los mejores de cada fragmento por bm25. Cada fragmento calcula bm25 con sus
+        propias estadísticas; como las altas se reparten en ronda, son comparables"""
+        parts = self._fan_out("text", text, diet, limit, min_minutes, max_minutes)
+        return heapq.nsmallest(limit, (item for part in parts for item in part), key=lambda item: (item[0], item[1].id))
+
+    def iter_recipes(self, diet: Optional[str] = None, ingredients: Iterable[str] = (),
+                     text: Optional[str] = None, chunk_size: int = EXPORT_CHUNK_SIZE,
+                     min_minutes: Optional[int] = None, max_minutes: Optional[int] = None) -> Iterator[Recipe]:
+        """Recorrido en orden de ID global, por bloques de cada fragmento"""
+        ingredients = list(ingredients)
+
+        def shard_stream(index: int) -> Iterator[Recipe]:
+            after_id = 0
+            while True:
+                chunk = self._call(index, "recipes_after", diet, ingredients, text, chunk_size,
+                                   min_minutes, max_minutes, after_id)
+                yield from chunk
+                if len(chunk) < chunk_size:
+                    return
+                after_id = chunk[-1].id
+
+        return heapq.merge(*(shard_stream(index) for index in range(self.shards)), key=lambda recipe: recipe.id)
+
+    # ---- Escrituras ----
+
+    def add_recipe(self, recipe_data: Dict) -> Optional[int]:
+        """Agrega la receta al siguiente fragmento de la ronda; devuelve su ID global"""
+        with self._lock:
+            index = self._next_shard
+            self._next_shard = (index + 1) % self.shards
+        return self._call(index, "add_recipe", recipe_data)
+
+    def update_recipe(self, recipe_id: int, recipe_data: Dict) -> bool:
+        return self._call(self._shard_of(recipe_id), "update_recipe", recipe_id, recipe_data)
+
+    def delete_recipe(self, recipe_id: int) -> bool:
+        return self._call(self._shard_of(recipe_id), "delete_recipe", recipe_id)
+
+    # Escrituras por lotes: una transacción por fragmento, todos en paralelo. Si un
+    # fragmento falla, los demás igual confirman su parte.
+
+    def _fan_out_by_shard(self, operation: str, recipe_ids: Iterable[int], *args) -> List:
+        """Envía a cada fragmento la operación con solo sus IDs"""
+        by_shard: Dict[int, List[int]] = {}
+        for recipe_id in recipe_ids:
+            by_shard.setdefault(self._shard_of(recipe_id), []).append(recipe_id)
+        if not by_shard:
+            return []
+        shards = sorted(by_shard)
+        return self._fan_out(operation, shards=shards,
+                             per_shard_args={index: (by_shard[index],) + args for index in shards})
+
+    def add_recipes(self, recipes: Iterable[Dict]) -> List[int]:
+        """Reparte las recetas en ronda; devuelve sus IDs globales en el orden recibido
+        (vacío si algún fragmento falló)"""
+        assigned: List[int] = []
+        by_shard: Dict[int, List[Dict]] = {}
+        with self._lock:
+            for recipe_data in recipes:
+                assigned.append(self._next_shard)
+                by_shard.setdefault(self._next_shard, []).append(recipe_data)
+                self._next_shard = (self._next_shard + 1) % self.shards
+        if not by_shard:
+            return []
+        shards = sorted(by_shard)
+        parts = self._fan_out("add_recipes", shards=shards, per_shard_args={index: (by_shard[index],) for index in shards})
+        if any(len(part) != len(by_shard[index]) for index, part in zip(shards, parts)):
+            return []
+        streams = {index: iter(part) for index, part in zip(shards, parts)}
+        return [next(streams[index]) for index in assigned]
+
+    def update_recipes(self, changes: Dict[int, Dict]) -> int:
+        by_shard: Dict[int, Dict[int, Dict]] = {}
+        for recipe_id, recipe_data in changes.items():
+            by_shard.setdefault(self._shard_of(recipe_id), {})[recipe_id] = recipe_data
+        if not by_shard:
+            return 0
+        shards = sorted(by_shard)
+        return sum(self._fan_out("update_recipes", shards=shards,
+                                 per_shard_args={index: (by_shard[index],) for index in shards}))
+
+    def set_recipes_diets(self, recipe_ids: Iterable[int], diets: str) -> int:
+        return sum(self._fan_out_by_shard("set_recipes_diets", dict.fromkeys(recipe_ids), diets))
+
+    def delete_recipes(self, recipe_ids: Iterable[int]) -> int:
+        return sum(self._fan_out_by_shard("delete_recipes", dict.fromkeys(recipe_ids)))
+
+    def bulk_import(self, records: Iterable[Dict], batch_size: int = IMPORT_BATCH_SIZE,
+                    progress: Optional[Callable[[ImportReport], None]] = None) -> ImportReport:
+        """Reparte los registros en ronda y cada fragmento los importa en paralelo.
+        Los lotes se envían a medida que se leen, así que la entrada sigue siendo un stream;
+        progress recibe el total combinado cada vez que un fragmento inserta un lote."""
+        per_shard = max(1, batch_size // self.shards)
+        reports = [ImportReport() for _ in range(self.shards)]
+
+        def on_progress(index: int, shard_report: ImportReport) -> None:
+            reports[index] = shard_report
+            if progress:
+                progress(self._merge_reports(reports))
+
+        with self._lock:
+            for connection in self._connections:
+                connection.send(("bulk_import", (per_shard,)))
+            batches: List[List[Dict]] = [[] for _ in range(self.shards)]
+            index = 0
+            try:
+                for record in records:
+                    batches[index].append(record)
+                    if len(batches[index]) >= per_shard:
+                        # Primero se leen los avances pendientes: así ninguna tubería se llena
+                        self._drain_progress(index, on_progress)
+                        self._connections[index].send(batches[index])
+                        batches[index] = []
+                    index = (index + 1) % self.shards
+            finally:
+                # Siempre se cierra el stream de cada fragmento, aunque la entrada falle
+                for shard, batch in enumerate(batches):
+                    if batch:
+                        self._connections[shard].send(batch)
+                    self._connections[shard].send(None)
+                final_reports = self._receive_all(range(self.shards), on_progress)
+        report = self._merge_reports(final_reports)
+        if progress:
+            progress(report)
+        return report
+
+    @staticmethod
+    def _merge_reports(reports: Sequence[ImportReport]) -> ImportReport:
+        """Reporte combinado de los fragmentos (los errores indican su fragmento)"""
+        report = ImportReport()
+        for shard, shard_report in enumerate(reports):
+            report.read += shard_report.read
+            report.inserted += shard_report.inserted
+            report.rejected += shard_report.rejected
+            report.elapsed = max(report.elapsed, shard_report.elapsed)
+            # Los números de registro de cada error son relativos a su fragmento
+            report.errors += [f"fragmento {shard + 1}, {error}" for error in shard_report.errors]
+        del report.errors[MAX_REPORTED_ERRORS:]
+        return report
+
+def split_catalog(source_db: str, db_name: str, shards: int,
+                  progress: Optional[Callable[[ImportReport], None]] = None) -> ImportReport:
+    """Reparte las recetas de una base de un solo archivo en N fragmentos nuevos
+    (los IDs globales de los fragmentos no coinciden con los de la base original)"""
+    existing = [path for path in shard_paths(db_name, shards) if os.path.exists(path)]
+    if existing:
+        raise FileExistsError(f"ya existen fragmentos: {', '.join(existing)}")
+    with RecipeManager(source_db) as source, ShardedRecipeManager(db_name, shards, sample_data=False) as manager:
+        records = (
+            {"nombre": recipe.name, "ingredientes": recipe.ingredients, "cantidades": recipe.quantities,
+             "preparacion": recipe.preparation, "tiempo_coccion": recipe.cooking_time, "dieta": recipe.diets}
+            for recipe in source.iter_recipes()
+        )
+        return manager.bulk_import(records, progress=progress)
@@ -0,0 +1,213 @@
+"""Utilidades de arranque rápido compartidas por las aplicaciones de Yumlist.
+
+- StartupTimer: mide el tiempo hasta el primer cuadro interactivo (activar con
+  YUMLIST_STARTUP_TIMER=1 para verlo en stderr; siempre queda en el log).
+- cached_button_image: botones ovalados renderizados una vez con pygame y guardados
+  como PNG en disco; en los arranques siguientes Tk los carga sin pygame ni PIL.
+- cached_image: imágenes (fondo, logo) ya redimensionadas y guardadas en un formato
+  que Tk lee directamente, sin decodificar el JPEG original ni redimensionarlo.
+- BackgroundRecipeManager: abre la base, aplica las migraciones pendientes y precarga las recetas
+  en un hilo mientras Tk construye la ventana.
+
+Este módulo no importa tkinter, pygame ni PIL al cargarse.
+"""
+import hashlib
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+# Lo antes posible: cada aplicación importa este módulo en su primera línea
+_PROCESS_START = time.perf_counter()
+
+logger = logging.getLogger(__name__)
+
+STARTUP_BUDGET_MS = 300
+STARTUP_TIMER_ENV = "YUMLIST_STARTUP_TIMER"
+READY_POLL_MS = 15
+
+# Cambiar si cambia el dibujo de los botones, para descartar los PNG anteriores
+BUTTON_RENDER_VERSION = 1
+BUTTON_FONT = ("Arial", 21)
+
+# Cambiar si cambia la forma de redimensionar, para descartar las imágenes anteriores
+IMAGE_CACHE_VERSION = 1
+
+Color = Tuple[int, int, int]
+
+def cache_dir(*parts: str) -> str:
+    """Directorio de caché del usuario para Yumlist (se crea si no existe)"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    path = os.path.join(base, "yumlist", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+class StartupTimer:
+    """Marca etapas del arranque y el primer cuadro dibujado de la ventana"""
+
+    def __init__(self):
+        self.marks = [("inicio", _PROCESS_START)]
+        self._origin = _PROCESS_START
+        self.verbose = bool(os.environ.get(STARTUP_TIMER_ENV))
+        self._first_frame_reported = False
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._origin) * 1000
+
+    def restart(self, label: str) -> None:
+        """Vuelve a contar desde ahora (por ejemplo, tras esperar una acción del usuario)"""
+        self.mark(label)
+        self._origin = time.perf_counter()
+
+    def mark(self, label: str) -> None:
+        """Registra una etapa del arranque"""
+        self.marks.append((label, time.perf_counter()))
+        self._report(f"{label}: {self.elapsed_ms():.0f} ms")
+
+    def watch_first_frame(self, root) -> None:
+        """Registra el primer cuadro: el siguiente ciclo ocioso después de mapear la ventana"""
+        def on_map(event):
+            if event.widget is root and not self._first_frame_reported:
+                self._first_frame_reported = True
+                root.after_idle(self._first_frame)
+        root.bind("<Map>", on_map, add="+")
+
+    def _first_frame(self) -> None:
+        total = self.elapsed_ms()
+        self.mark("primer cuadro interactivo")
+        if total > STARTUP_BUDGET_MS:
+            logger.warning(f"Arranque lento: {total:.0f} ms (presupuesto {STARTUP_BUDGET_MS} ms)")
+
+    def _report(self, message: str) -> None:
+        logger.info(f"Arranque - {message}")
+        if self.verbose:
+            print(f"[arranque] {message}", file=sys.stderr)
+
+STARTUP = StartupTimer()
+
+def _render_button_png(path: str, text: str, color: Color, border: Color, text_color: Color,
+                       width: int, height: int) -> None:
+    """Dibuja el botón ovalado con pygame y lo guarda como PNG"""
+    import pygame  # solo si el botón no está en la caché
+    pygame.font.init()
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    pygame.draw.ellipse(surface, color, (0, 0, width, height))
+    pygame.draw.ellipse(surface, border, (0, 0, width, height), 3)
+    font = pygame.font.SysFont(BUTTON_FONT[0], BUTTON_FONT[1], bold=True)
+    rendered_text = font.render(text, True, text_color)
+    surface.blit(rendered_text, rendered_text.get_rect(center=(width // 2, height // 2)))
+    # Escritura atómica: otro proceso podría estar leyendo la caché
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pygame.image.save(surface, tmp_path)
+    os.replace(tmp_path, path)
+
+def cached_button_image(text: str, color: Color, border: Color, text_color: Color,
+                        width: int = 140, height: int = 44):
+    """Imagen de botón ovalado lista para Tk, desde la caché en disco si existe.
+
+    La clave es un hash del texto, los colores, el tamaño y la versión del dibujo.
+    """
+    import tkinter as tk
+    key = repr((BUTTON_RENDER_VERSION, BUTTON_FONT, text, color, border, text_color, width, height))
+    path = os.path.join(cache_dir("botones"), hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+    if not os.path.exists(path):
+        _render_button_png(path, text, color, border, text_color, width, height)
+    return tk.PhotoImage(file=path)
+
+def _image_cache_path(source: str, size: Tuple[int, int]) -> Tuple[str, str]:
+    """Prefijo (fuente y tamaño) y nombre completo (además versión de la fuente) en la caché"""
+    stat = os.stat(source)
+    source_key = repr((IMAGE_CACHE_VERSION, os.path.abspath(source), size))
+    prefix = hashlib.sha1(source_key.encode("utf-8")).hexdigest()[:16]
+    version = hashlib.sha1(repr((stat.st_mtime_ns, stat.st_size)).encode("utf-8")).hexdigest()[:12]
+    return prefix, f"{prefix}-{version}"
+
+def _store_resized_image(source: str, size: Tuple[int, int], directory: str, prefix: str, name: str) -> str:
+    """Decodifica y redimensiona la imagen original una sola vez y la guarda en la caché"""
+    from PIL import Image  # solo si la imagen no está en la caché
+    img = Image.open(source)
+    # PPM (sin compresión) se carga más rápido; PNG solo si hace falta transparencia
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    img = img.convert("RGBA" if has_alpha else "RGB").resize(size)
+    path = os.path.join(directory, name + (".png" if has_alpha else ".ppm"))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    img.save(tmp_path, format="PNG" if has_alpha else "PPM")
+    os.replace(tmp_path, path)
+    # Las versiones anteriores de la misma imagen y tamaño ya no sirven
+    for entry in os.listdir(directory):
+        if entry.startswith(prefix + "-") and not entry.startswith(name) and not entry.endswith(".tmp"):
+            try:
+                os.remove(os.path.join(directory, entry))
+            except OSError:
+                pass
+    return path
+
+def cached_image(source: str, size: Tuple[int, int]):
+    """Imagen redimensionada lista para Tk, desde la caché en disco si existe.
+
+    La clave es la ruta de la imagen original, su fecha de modificación y tamaño en
+    bytes, y el tamaño pedido: si el archivo original cambia, se regenera sola.
+    """
+    import tkinter as tk
+    directory = cache_dir("imagenes")
+    prefix, name = _image_cache_path(source, size)
+    for extension in (".ppm", ".png"):
+        path = os.path.join(directory, name + extension)
+        if os.path.exists(path):
+            break
+    else:
+        path = _store_resized_image(source, size, directory, prefix, name)
+    return tk.PhotoImage(file=path)
+
+class BackgroundRecipeManager:
+    """RecipeManager que se abre y precalienta en un hilo aparte.
+
+    Se usa igual que un RecipeManager: el primer acceso a un atributo espera a que
+    termine la preparación (normalmente ya terminó cuando el usuario interactúa).
+    """
+
+    def __init__(self, db_name: Optional[str] = None, diet: str = "Omnívoro"):
+        self._db_name = db_name
+        self._diet = diet
+        self._manager = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="yumlist-db-warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            # Import diferido: recipe_manager no es necesario para dibujar la ventana
+            from recipe_manager import DB_NAME, RecipeManager
+            # Al abrirse aplica las migraciones pendientes del esquema
+            manager = RecipeManager(self._db_name or DB_NAME)
+            # Carga inicial: deja en caché los IDs de la primera vista
+            manager.count_recipes(self._diet)
+            self._manager = manager
+            STARTUP.mark("base de datos lista")
+        except BaseException as e:
+            logger.error(f"Error al preparar la base de datos: {e}")
+            self._error = e
+
+    @property
+    def ready(self) -> bool:
+        return not self._thread.is_alive()
+
+    @property
+    def manager(self):
+        """El RecipeManager ya preparado (espera al hilo si todavía no terminó)"""
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._manager
+
+    def when_ready(self, widget, callback: Callable[[], None]) -> None:
+        """Llama a callback en el hilo de Tk cuando la base esté lista"""
+        if self.ready:
+            callback()
+        else:
+            widget.after(READY_POLL_MS, lambda: self.when_ready(widget, callback))
+
+    def __getattr__(self, name: str):
+        return getattr(self.manager, name)
@@ -0,0 +1,226 @@
+"""Prueba de carga concurrente: varios procesos lectores y escritores sobre una misma base.
+
+Reproduce el uso real de varias instancias de la aplicación (yumlist.py, index.py,
+prueba.py) abiertas sobre el mismo recetas.db. Cada proceso abre su propio
+RecipeManager y repite operaciones hasta que se cumple la duración:
+
+- lectores: búsquedas por ingredientes, search_closest y lectura de recetas por ID
+- escritores: altas (de a --batch recetas por transacción), ediciones y bajas de
+  las recetas que el mismo proceso agregó
+
+Al final informa operaciones por segundo, latencias, reintentos y errores de
+bloqueo ("database is locked") por rol, y verifica que la cantidad de recetas
+coincida con las altas y bajas confirmadas y que la base esté íntegra.
+
+Uso:
+    python stress.py --readers 8 --writers 4 --duration 20
+    python stress.py --busy-timeout 0 --retries 0      # sin espera ni reintentos
+    python stress.py --db copia.db --output stress.json
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmark import DIETS, build_vocabulary, generate_recipes, percentile
+from recipe_manager import BUSY_TIMEOUT, WRITE_RETRIES, RecipeManager
+
+class LockErrorCounter(logging.Handler):
+    """Cuenta los errores de bloqueo que RecipeManager registra (y no propaga)"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        message = record.getMessage().lower()
+        if "locked" in message or "busy" in message:
+            self.count += 1
+
+def build_database(args: argparse.Namespace) -> str:
+    """Base de la prueba: la indicada con --db o un catálogo sintético nuevo"""
+    if args.db:
+        return args.db
+    path = os.path.join(tempfile.gettempdir(), f"yumlist_stress_{os.getpid()}.db")
+    with RecipeManager(path, sample_data=False) as manager:
+        manager.bulk_import(generate_recipes(args.recipes, args.vocabulary, seed=args.seed))
+    return path
+
+def recipe_data(rng: random.Random, vocabulary: List[str], number: str) -> Dict:
+    ingredients = rng.sample(vocabulary, rng.randint(3, 8))
+    return {
+        "name": f"Receta de carga {number}",
+        "ingredients": ",".join(ingredients),
+        "quantities": ",".join(f"{rng.randint(1, 500)} g" for _ in ingredients),
+        "preparation": "Mezclar y cocinar.",
+        "cooking_time": f"{rng.randint(5, 120)} minutos",
+        "diets": rng.choice(DIETS)
+    }
+
+def run_worker(role: str, index: int, db_name: str, args: argparse.Namespace, barrier, results) -> None:
+    """Proceso de la prueba: informa su resultado o, si falla, el error (para no
+    dejar al proceso principal esperando)"""
+    try:
+        results.put(run_operations(role, index, db_name, args, barrier))
+    except Exception as e:
+        results.put({"role": role, "crashed": f"{type(e).__name__}: {e}"})
+
+def run_operations(role: str, index: int, db_name: str, args: argparse.Namespace, barrier) -> Dict:
+    """Repite operaciones del rol hasta la duración indicada"""
+    counter = LockErrorCounter()
+    logging.getLogger("recipe_manager").addHandler(counter)
+    rng = random.Random(args.seed * 1000 + index)
+    vocabulary = build_vocabulary(args.vocabulary)
+    try:
+        manager = RecipeManager(db_name, sample_data=False, busy_timeout=args.busy_timeout, write_retries=args.retries)
+    finally:
+        # Aunque no pueda abrir la base, no deja a los demás esperando en la barrera
+        barrier.wait()
+    max_id = max(1, args.recipes)
+    own_ids: List[int] = []
+    latencies: List[float] = []
+    failed = added = deleted = 0
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        ok = True
+        if role == "lector":
+            choice = rng.random()
+            if choice < 0.5:
+                manager.get_recipe_ids(rng.choice(DIETS), rng.sample(vocabulary[:50], rng.randint(1, 2)))
+            elif choice < 0.7:
+                manager.search_closest(rng.sample(vocabulary[:50], 3), rng.choice(DIETS), k=10)
+            else:
+                manager.get_recipe(rng.randint(1, max_id))
+        else:
+            choice = rng.random()
+            if choice < 0.5 or not own_ids:
+                batch = [recipe_data(rng, vocabulary, f"{index}-{len(latencies)}-{n}") for n in range(args.batch)]
+                new_ids = manager.add_recipes(batch) if args.batch > 1 else [manager.add_recipe(batch[0])]
+                ok = bool(new_ids) and None not in new_ids
+                if ok:
+                    own_ids += new_ids
+                    added += len(new_ids)
+            elif choice < 0.8:
+                ok = manager.update_recipe(rng.choice(own_ids), recipe_data(rng, vocabulary, f"{index}-editada"))
+            else:
+                recipe_id = own_ids.pop(rng.randrange(len(own_ids)))
+                ok = manager.delete_recipe(recipe_id)
+                if ok:
+                    deleted += 1
+                else:
+                    own_ids.append(recipe_id)
+        latencies.append(time.perf_counter() - started)
+        failed += not ok
+    stats = manager.lock_stats()
+    manager.close()
+    return {
+        "role": role, "latencies": latencies, "failed": failed, "lock_errors": counter.count,
+        "retries": stats["retries"], "added": added, "deleted": deleted
+    }
+
+def summarize(parts: List[Dict], duration: float) -> Dict[str, Dict]:
+    summary: Dict[str, Dict] = {}
+    for role in ("lector", "escritor"):
+        selected = [part for part in parts if part["role"] == role]
+        if not selected:
+            continue
+        latencies = sorted(latency for part in selected for latency in part["latencies"])
+        ops = len(latencies)
+        lock_errors = sum(part["lock_errors"] for part in selected)
+        failed = sum(part["failed"] for part in selected)
+        summary[role] = {
+            "processes": len(selected),
+            "ops": ops,
+            # Rendimiento de operaciones confirmadas: una escritura rechazada es instantánea
+            "ops_per_s": round((ops - failed) / duration, 1),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "failed": failed,
+            "lock_errors": lock_errors,
+            "lock_error_rate": round(lock_errors / ops, 4) if ops else 0.0,
+            "retries": sum(part["retries"] for part in selected)
+        }
+    return summary
+
+def check_database(db_name: str, expected: int) -> Dict:
+    """Cantidad de recetas (contra la esperada) e integrity_check de SQLite"""
+    conn = sqlite3.connect(db_name)
+    try:
+        count = conn.execute("SELECT COUNT(*) FROM recetas").fetchone()[0]
+        integrity = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        conn.close()
+    return {"recipes": count, "expected": expected, "integrity": integrity}
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Prueba de carga con varios procesos sobre una misma base")
+    parser.add_argument("--db", help="base a usar (por defecto: un catálogo sintético temporal)")
+    parser.add_argument("--recipes", type=int, default=5000, help="recetas del catálogo sintético (por defecto: %(default)s)")
+    parser.add_argument("--vocabulary", type=int, default=300, help="ingredientes distintos (por defecto: %(default)s)")
+    parser.add_argument("--readers", type=int, default=4, help="procesos lectores (por defecto: %(default)s)")
+    parser.add_argument("--writers", type=int, default=4, help="procesos escritores (por defecto: %(default)s)")
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos de carga (por defecto: %(default)s)")
+    parser.add_argument("--batch", type=int, default=1, help="recetas por alta (por defecto: %(default)s)")
+    parser.add_argument("--busy-timeout", type=float, default=BUSY_TIMEOUT,
+                        help="segundos de espera de un bloqueo (por defecto: %(default)s)")
+    parser.add_argument("--retries", type=int, default=WRITE_RETRIES,
+                        help="reintentos de una escritura bloqueada (por defecto: %(default)s)")
+    parser.add_argument("--seed", type=int, default=42, help="semilla (por defecto: %(default)s)")
+    parser.add_argument("--output", help="archivo JSON de resultados")
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    db_name = build_database(args)
+    with RecipeManager(db_name, sample_data=False) as manager:
+        initial = manager.catalog_stats().get("recetas", 0)
+    # Los lectores piden IDs al azar dentro del catálogo inicial
+    args.recipes = initial
+
+    roles = ["lector"] * args.readers + ["escritor"] * args.writers
+    barrier = multiprocessing.Barrier(len(roles))
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(role, index, db_name, args, barrier, results))
+        for index, role in enumerate(roles)
+    ]
+    print(f"{args.readers} lectores y {args.writers} escritores durante {args.duration:g} s sobre {db_name}...",
+          file=sys.stderr)
+    for process in processes:
+        process.start()
+    parts = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    crashed = [part for part in parts if "crashed" in part]
+    for part in crashed:
+        print(f"Un proceso {part['role']} falló: {part['crashed']}", file=sys.stderr)
+    parts = [part for part in parts if "crashed" not in part]
+
+    summary = summarize(parts, args.duration)
+    check = check_database(db_name, initial + sum(part["added"] - part["deleted"] for part in parts))
+    for role, stats in summary.items():
+        print(f"{role + 'es':<10} {stats['ops']:>8} ops  {stats['ops_per_s']:>9.1f} ops/s  "
+              f"p50 {stats['p50_ms']:>7.2f} ms  p99 {stats['p99_ms']:>8.2f} ms  "
+              f"reintentos {stats['retries']:>5}  bloqueos {stats['lock_errors']:>5} "
+              f"({stats['lock_error_rate']:.2%})  fallidas {stats['failed']}")
+    print(f"recetas: {check['recipes']} (esperadas {check['expected']}), integridad: {check['integrity']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": summary, "check": check}, f, indent=2, ensure_ascii=False)
+    if not args.db:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_name + suffix):
+                os.remove(db_name + suffix)
+    return 0 if not crashed and check["recipes"] == check["expected"] and check["integrity"] == "ok" else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
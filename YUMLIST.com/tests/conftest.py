@@ -0,0 +1,53 @@
+"""Fixtures comunes: los módulos de la aplicación se importan desde la carpeta
+superior y cada prueba trabaja sobre su propia copia de la base."""
+import os
+import random
+import shutil
+import sys
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from recipe_manager import RecipeManager  # noqa: E402
+
+# Variantes escritas a propósito con plurales, tildes, mayúsculas y sinónimos
+VOCABULARY = [
+    "papa", "Papas", "patata", "tomate", "tomates", "jitomate", "cebolla", "ajo",
+    "sal", "salsa", "aceite", "huevo", "Huevos", "queso", "pollo", "carne", "leche",
+    "arroz", "limón", "limones", "ají", "ajíes", "frijol", "porotos", "maíz",
+    "choclo", "piña", "ñame", "zanahoria", "lechuga", "harina de maíz", "nueces"
+]
+DIET_CHOICES = ["Omnívoro", "Vegetariano", "Vegano", "Vegetariano,Omnívoro", "Vegano,Vegetariano,Omnívoro"]
+TIMES = ["10 minutos", "25 min", "45 minutos", "1 hora", "1 1/2 horas", "2 horas", "a gusto"]
+
+def synthetic_recipes(count: int, seed: int = 7):
+    """Recetas al azar (reproducibles) con los campos de importación"""
+    rng = random.Random(seed)
+    for number in range(count):
+        ingredients = rng.sample(VOCABULARY, rng.randint(2, 7))
+        yield {
+            "nombre": f"Receta {number}",
+            "ingredientes": ", ".join(ingredients),
+            "cantidades": ", ".join(f"{rng.randint(1, 500)} g" for _ in ingredients),
+            "preparacion": "Mezclar y cocinar.",
+            "tiempo_coccion": rng.choice(TIMES),
+            "dieta": rng.choice(DIET_CHOICES)
+        }
+
+@pytest.fixture
+def shipped_db(tmp_path):
+    """Copia de la base que se distribuye con la aplicación (sin migrar)"""
+    path = tmp_path / "recetas.db"
+    shutil.copy(os.path.join(APP_DIR, "recetas.db"), path)
+    return str(path)
+
+@pytest.fixture
+def catalog_db(tmp_path):
+    """Base nueva con 400 recetas sintéticas"""
+    path = str(tmp_path / "catalogo.db")
+    with RecipeManager(path, sample_data=False) as manager:
+        report = manager.bulk_import(synthetic_recipes(400))
+    assert report.inserted == 400
+    return path
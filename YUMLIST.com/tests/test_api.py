@@ -0,0 +1,145 @@
+"""Respuestas de la API: ETag, 304, gzip y caché de respuestas por versión"""
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from api import GZIP_MIN_BYTES, RecipeApi, _accepts_gzip
+from recipe_manager import RecipeManager
+
+NEW_RECIPE = {
+    "nombre": "Guiso de prueba", "ingredientes": "papa, cebolla", "cantidades": "2, 1",
+    "preparacion": "Hervir.", "tiempo_coccion": "40 minutos", "dieta": "Vegano,Vegetariano,Omnívoro"
+}
+
+@pytest.fixture
+def api(catalog_db):
+    with RecipeManager(catalog_db) as manager:
+        api = RecipeApi(manager, workers=2)
+        yield api
+        api.close()
+
+def request(api: RecipeApi, method: str, target: str, headers=None, body: bytes = b""):
+    return asyncio.run(api.handle(method, target, headers or {}, body))
+
+def payload(response):
+    body = response.body
+    if response.headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+def test_gzip_only_when_accepted(api):
+    plain = request(api, "GET", "/recetas?dieta=Omnívoro&limit=200")
+    compressed = request(api, "GET", "/recetas?dieta=Omnívoro&limit=200", {"accept-encoding": "gzip, deflate"})
+    assert plain.status == compressed.status == 200
+    assert "Content-Encoding" not in plain.headers
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.headers["Vary"] == "Accept-Encoding"
+    assert len(compressed.body) < len(plain.body)
+    assert gzip.decompress(compressed.body) == plain.body
+    assert len(payload(plain)["recetas"]) == 200
+
+@pytest.mark.parametrize("header, accepted", [
+    ("gzip", True),
+    ("gzip;q=0.5, br", True),
+    ("GZIP ; Q=1", True),
+    ("br, *", True),
+    ("", False),
+    ("gzip;q=0", False),
+    ("deflate, gzip;q=0.0", False),
+    ("*;q=0", False),
+    ("gzip;q=0, *", False),
+    ("br, deflate", False)
+])
+def test_accept_encoding_quality(header, accepted):
+    assert _accepts_gzip(header) is accepted
+
+def test_gzip_refused_with_zero_quality(api):
+    response = request(api, "GET", "/recetas?dieta=Omnívoro&limit=200", {"accept-encoding": "gzip;q=0, identity"})
+    assert "Content-Encoding" not in response.headers
+    assert len(payload(response)["recetas"]) == 200
+
+def test_small_responses_are_not_compressed(api):
+    response = request(api, "GET", "/recetas/1", {"accept-encoding": "gzip"})
+    assert response.status == 200
+    assert len(response.body) < GZIP_MIN_BYTES
+    assert "Content-Encoding" not in response.headers
+    assert payload(response)["id"] == 1
+
+def test_etag_and_not_modified(api):
+    first = request(api, "GET", "/recetas?dieta=Vegano")
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    for header in (etag, etag.removeprefix("W/"), f'"otro", {etag}', "*"):
+        response = request(api, "GET", "/recetas?dieta=Vegano", {"if-none-match": header})
+        assert response.status == 304
+        assert response.body == b""
+        assert response.headers["ETag"] == etag
+    assert request(api, "GET", "/recetas?dieta=Vegano", {"if-none-match": '"otro"'}).status == 200
+    # El ETag es del catálogo, no de la URL
+    assert request(api, "GET", "/dietas", {"if-none-match": etag}).status == 304
+
+def test_cached_response_until_write(api):
+    first = request(api, "GET", "/recetas?dieta=Vegano&ingredientes=papa")
+    second = request(api, "GET", "/recetas?ingredientes=papa&dieta=Vegano")
+    # Mismos parámetros en otro orden: la misma entrada de la caché
+    assert second.body is first.body
+    assert len(api._responses) == 1
+
+    created = request(api, "POST", "/recetas", body=json.dumps(NEW_RECIPE).encode("utf-8"))
+    assert created.status == 201
+    assert created.headers["Location"] == f"/recetas/{payload(created)['id']}"
+
+    stale = request(api, "GET", "/recetas?dieta=Vegano&ingredientes=papa", {"if-none-match": first.headers["ETag"]})
+    assert stale.status == 200
+    assert stale.headers["ETag"] != first.headers["ETag"]
+    assert payload(stale)["total"] == payload(first)["total"] + 1
+
+def test_errors_are_not_cached(api):
+    response = request(api, "GET", "/recetas?dieta=Carnívoro")
+    assert response.status == 400
+    assert "ETag" not in response.headers
+    assert "dieta desconocida" in payload(response)["error"]
+    assert request(api, "GET", "/recetas/999999").status == 404
+    assert request(api, "DELETE", "/recetas").status == 405
+    assert not api._responses
+
+@pytest.mark.parametrize("method", ["GET", "PUT", "DELETE"])
+def test_out_of_range_id_is_not_found(api, method):
+    body = json.dumps(NEW_RECIPE).encode("utf-8") if method == "PUT" else b""
+    response = request(api, method, f"/recetas/{2 ** 64}", body=body)
+    assert response.status == 404
+    assert request(api, "GET", f"/recetas/{2 ** 63 - 1}").status == 404
+
+def test_http_round_trip(api):
+    """Pedido real por socket: gzip en el cable y 304 en la misma conexión"""
+    async def exchange():
+        server = await asyncio.start_server(api.handle_connection, "127.0.0.1", 0)
+        async with server:
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            responses = []
+            for extra in ("Accept-Encoding: gzip\r\n", None):
+                if extra is None:
+                    extra = f"If-None-Match: {responses[0][1]['etag']}\r\nConnection: close\r\n"
+                writer.write(f"GET /recetas?limit=100 HTTP/1.1\r\nHost: prueba\r\n{extra}\r\n".encode("latin-1"))
+                await writer.drain()
+                status = int((await reader.readline()).split()[1])
+                headers = {}
+                while (line := await reader.readline()) != b"\r\n":
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers["content-length"]))
+                responses.append((status, headers, body))
+            writer.close()
+            await writer.wait_closed()
+            return responses
+
+    (status, headers, body), (not_modified, headers_304, body_304) = asyncio.run(exchange())
+    assert status == 200 and headers["content-encoding"] == "gzip"
+    assert len(json.loads(gzip.decompress(body))["recetas"]) == 100
+    assert not_modified == 304 and body_304 == b""
+    assert headers_304["connection"] == "close"
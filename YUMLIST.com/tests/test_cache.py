@@ -0,0 +1,120 @@
+"""Caché de consultas: LRU, invalidación selectiva por escrituras propias,
+invalidación completa por escrituras de otra conexión y refinamiento de resultados
+previos (_narrow_cached_ids). Cada resultado se compara con un gestor sin caché."""
+import pytest
+
+import recipe_manager
+from recipe_manager import INVALIDATION_LIMIT, QueryCache, RecipeManager
+
+def recipe(ingredients: str, diets: str = "Vegano,Vegetariano,Omnívoro", cooking_time: str = "20 minutos"):
+    return {
+        "name": f"Prueba {ingredients}", "ingredients": ingredients,
+        "quantities": ",".join("1" for _ in ingredients.split(",")),
+        "preparation": "Cocinar.", "cooking_time": cooking_time, "diets": diets
+    }
+
+@pytest.fixture
+def managers(catalog_db):
+    """(gestor con caché, gestor sin caché que sirve de referencia)"""
+    with RecipeManager(catalog_db) as cached, RecipeManager(catalog_db, cache_size=0) as reference:
+        yield cached, reference
+
+def ids_key(diet, terms, time_key=(None, None, "id")):
+    return ("ids", diet, tuple(terms), time_key)
+
+def test_lru_eviction_and_stats():
+    cache = QueryCache(2)
+    cache.put(("a",), 1)
+    cache.put(("b",), 2)
+    assert cache.get(("a",)) == 1
+    cache.put(("c",), 3)
+    # "b" era el menos usado
+    assert ("b",) not in cache and ("a",) in cache and ("c",) in cache
+    assert cache.get(("b",)) is None
+    assert cache.invalidate(lambda key: key == ("a",)) == 1
+    assert cache.stats() == {
+        "entries": 1, "max_entries": 2, "hits": 1, "misses": 1, "evictions": 1, "invalidations": 1
+    }
+
+def test_repeated_query_is_a_hit(managers):
+    cached, _ = managers
+    first = cached.get_recipe_ids("Vegano", ["tomate"])
+    hits = cached.cache_stats()["hits"]
+    assert cached.get_recipe_ids("Vegano", ["tomates"]) == first
+    assert cached.cache_stats()["hits"] == hits + 1
+
+def test_write_invalidates_only_affected_queries(managers):
+    cached, reference = managers
+    cached.get_recipe_ids("Vegano", ["tomate"])
+    cached.get_recipe_ids("Omnívoro", ["pollo"])
+    cached._ingredient_posting("ñame")
+
+    new_id = cached.add_recipe(recipe("tomate, lechuga", "Vegano,Vegetariano,Omnívoro"))
+    # La receta nueva no tiene pollo ni ñame: esas entradas siguen en caché
+    assert ids_key("Omnívoro", ["pollo"]) in cached._query_cache
+    assert ("posting", "ñame") in cached._query_cache
+    assert ids_key("Vegano", ["tomate"]) not in cached._query_cache
+    assert new_id in cached.get_recipe_ids("Vegano", ["tomate"])
+    for diet, terms in (("Vegano", ["tomate"]), ("Omnívoro", ["pollo"])):
+        assert cached.get_recipe_ids(diet, terms) == reference.get_recipe_ids(diet, terms)
+
+def test_update_and_delete_refresh_results(managers):
+    cached, reference = managers
+    new_id = cached.add_recipe(recipe("piña, arroz"))
+    assert new_id in cached.get_recipe_ids("Vegano", ["piña"])
+    assert new_id in cached.get_recipe_ids("Omnívoro", ["arroz"])
+
+    # Con pollo deja de ser vegana; ya no tiene piña
+    assert cached.update_recipe(new_id, recipe("pollo, arroz"))
+    assert new_id not in cached.get_recipe_ids("Vegano", ["piña"])
+    assert new_id in cached.get_recipe_ids("Omnívoro", ["arroz"])
+    assert new_id in cached.get_recipe_ids("Omnívoro", ["pollo"])
+
+    assert cached.delete_recipe(new_id)
+    for diet, terms in (("Vegano", ["piña"]), ("Omnívoro", ["arroz"]), ("Omnívoro", ["pollo"])):
+        assert new_id not in cached.get_recipe_ids(diet, terms)
+        assert cached.get_recipe_ids(diet, terms) == reference.get_recipe_ids(diet, terms)
+
+def test_large_write_clears_query_cache(managers):
+    cached, _ = managers
+    cached.get_recipe_ids("Omnívoro", ["pollo"])
+    cached.add_recipes([recipe("lechuga") for _ in range(INVALIDATION_LIMIT + 1)])
+    assert len(cached._query_cache) == 0
+
+def test_write_from_other_connection_clears_cache(managers):
+    cached, reference = managers
+    before = cached.get_recipe_ids("Vegetariano", ["queso"])
+    new_id = reference.add_recipe(recipe("queso, papa", "Vegetariano"))
+    after = cached.get_recipe_ids("Vegetariano", ["queso"])
+    assert after == before + [new_id]
+
+def test_narrow_from_smaller_query(managers):
+    cached, reference = managers
+    assert cached._narrow_cached_ids("Omnívoro", ["papa", "sal"], (None, None, "id")) is None
+    cached.get_recipe_ids("Omnívoro", ["papa"])
+    cached.get_recipe_ids("Omnívoro", ["sal"])
+    # Parte del resultado más chico de los dos y lo refina con el otro ingrediente
+    narrowed = cached._narrow_cached_ids("Omnívoro", ["papa", "sal", "tomate"], (None, None, "id"))
+    assert narrowed == reference.get_recipe_ids("Omnívoro", ["papa", "sal", "tomate"])
+    assert cached.get_recipe_ids("Omnívoro", ["papa", "sal"]) == reference.get_recipe_ids("Omnívoro", ["papa", "sal"])
+
+def test_narrow_needs_same_diet_and_time_range(managers):
+    cached, _ = managers
+    cached.get_recipe_ids("Omnívoro", ["papa"])
+    cached.get_recipe_ids("Vegano", ["papa"], max_minutes=30)
+    assert cached._narrow_cached_ids("Vegano", ["papa", "sal"], (None, None, "id")) is None
+    assert cached._narrow_cached_ids("Omnívoro", ["papa", "sal"], (None, 30, "id")) is None
+    assert cached._narrow_cached_ids("Vegano", ["papa", "sal"], (None, 30, "id")) is not None
+
+@pytest.mark.parametrize("lookup_limit", [0, 1_000_000])
+def test_narrow_with_postings_or_index_lookup(managers, monkeypatch, lookup_limit):
+    """Con límite 0 se refina con listas de ocurrencias en memoria; con uno alto,
+    verificando los candidatos contra el índice"""
+    monkeypatch.setattr(recipe_manager, "NARROW_LOOKUP_LIMIT", lookup_limit)
+    cached, reference = managers
+    for order in ("id", "minutos"):
+        cached.get_recipe_ids("Vegetariano", ["sal"], None, 90, order)
+        for terms in (["sal", "cebolla"], ["sal", "cebolla", "ajo"], ["sal", "maíz", "ñame"]):
+            expected = reference.get_recipe_ids("Vegetariano", terms, None, 90, order)
+            assert cached._narrow_cached_ids("Vegetariano", reference._query_terms(terms), (None, 90, order)) == expected
+            assert cached.get_recipe_ids("Vegetariano", terms, None, 90, order) == expected
@@ -0,0 +1,28 @@
+"""Comandos de la línea de comandos sobre una copia de la base"""
+import json
+
+import cli
+
+def run(capsys, *argv):
+    status = cli.main(list(argv))
+    captured = capsys.readouterr()
+    return status, captured.out
+
+def test_text(catalog_db, capsys):
+    status, out = run(capsys, "--db", catalog_db, "text", "Receta", "--json")
+    assert status == 0
+    assert len(json.loads(out)) == cli.DEFAULT_LIMIT
+
+def test_text_with_minutes(catalog_db, capsys):
+    status, out = run(capsys, "--db", catalog_db, "text", "Receta", "--max-minutes", "30", "-k", "500", "--json")
+    assert status == 0
+    records = json.loads(out)
+    assert records
+    assert all(record["tiempo_coccion"] in ("10 minutos", "25 min") for record in records)
+
+def test_search_with_minutes(catalog_db, capsys):
+    status, out = run(capsys, "--db", catalog_db, "search", "papa", "--min-minutes", "60", "-k", "500", "--json")
+    assert status == 0
+    records = json.loads(out)
+    assert records
+    assert all(record["tiempo_coccion"] not in ("10 minutos", "25 min", "45 minutos", "a gusto") for record in records)
@@ -0,0 +1,62 @@
+"""Normalización de nombres de ingredientes"""
+import pytest
+
+from ingredients import fold_accents, normalize_ingredient
+from recipe_manager import split_ingredients
+
+@pytest.mark.parametrize("name, expected", [
+    ("papas", "papa"),
+    ("Huevos ", "huevo"),
+    ("tomates", "tomate"),
+    ("limones", "limon"),
+    ("frijoles", "frijol"),
+    ("nueces", "nuez"),
+    ("ajíes", "aji"),
+    ("carnes", "carne"),
+    ("ananás", "ananas"),
+    ("dientes de ajo", "diente de ajo")
+])
+def test_plurals(name, expected):
+    assert normalize_ingredient(name) == expected
+
+@pytest.mark.parametrize("name, expected", [
+    ("Limón", "limon"),
+    ("MAÍZ", "maiz"),
+    ("  azúcar  ", "azucar"),
+    ("pingüino", "pinguino")
+])
+def test_accents(name, expected):
+    assert normalize_ingredient(name) == expected
+
+def test_keeps_enie():
+    assert fold_accents("piña año") == "piña año"
+    assert fold_accents("PIÑA") == "PIÑA"
+    assert normalize_ingredient("Piñas") == "piña"
+    assert normalize_ingredient("ñames") == "ñame"
+    # La ñ distingue palabras: "pina" no es "piña"
+    assert normalize_ingredient("pina") != normalize_ingredient("piña")
+
+@pytest.mark.parametrize("name, expected", [
+    ("patatas", "papa"),
+    ("Jitomate", "tomate"),
+    ("porotos", "frijol"),
+    ("choclo", "maiz"),
+    ("palta", "aguacate"),
+    ("Spaghetti", "espagueti"),
+    ("carne de res", "carne"),
+    ("huevos de gallina", "huevo")
+])
+def test_synonyms(name, expected):
+    assert normalize_ingredient(name) == expected
+
+def test_salt_is_not_sauce():
+    assert normalize_ingredient("sal") == "sal"
+    assert normalize_ingredient("salsa") == "salsa"
+    assert normalize_ingredient("salsas") == "salsa"
+    assert "sal" not in split_ingredients("salsa de tomate, aceite")
+    assert split_ingredients("Sal, salsa") == {"sal", "salsa"}
+
+def test_empty_names():
+    assert normalize_ingredient("") == ""
+    assert normalize_ingredient(" , ") == ""
+    assert split_ingredients("papa,, ,Papas") == {"papa"}
@@ -0,0 +1,79 @@
+"""Migraciones del esquema sobre la base que se distribuye (versión 0)"""
+import sqlite3
+
+from recipe_manager import DIET_BITS, MIGRATIONS, SCHEMA_VERSION, RecipeManager
+
+def user_version(path: str) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+def test_shipped_db_is_unmigrated(shipped_db):
+    assert user_version(shipped_db) == 0
+    assert SCHEMA_VERSION == MIGRATIONS[-1][0]
+
+def test_migrates_to_current_schema(shipped_db):
+    with RecipeManager(shipped_db) as manager:
+        assert manager.schema_version() == SCHEMA_VERSION
+        stats = manager.catalog_stats()
+        assert stats["recetas"] == 6
+        # Un vínculo por ingrediente de cada receta; los repetidos se guardan una vez
+        assert stats["receta_ingredientes"] == 27
+        assert stats["ingredientes"] == 15
+        assert stats["receta_dietas"] == 6
+        omelet = manager.get_recipe(2)
+        assert omelet.name == "Omelet de queso"
+        assert omelet.minutes == 5
+        assert manager.get_recipe(6).minutes == 30
+        assert [recipe.id for recipe in manager.search_text("spaghetti")] == [5]
+    assert user_version(shipped_db) == SCHEMA_VERSION
+
+def test_migration_stores_canonical_names(shipped_db):
+    with RecipeManager(shipped_db) as manager:
+        # "huevos" y "spaghetti" quedan con su nombre canónico
+        assert manager.get_recipe_ids("Omnívoro", ["huevo"]) == [1, 2]
+        assert manager.get_recipe_ids("Omnívoro", ["Huevos"]) == [1, 2]
+        assert manager.get_recipe_ids("Omnívoro", ["espagueti"]) == [5]
+
+def test_diet_masks_after_migration(shipped_db):
+    with RecipeManager(shipped_db) as manager:
+        conn = manager._get_connection()
+        masks = dict(conn.execute("SELECT id, dieta_mask FROM recetas"))
+    # Todas se declaran omnívoras: solo ese bit, sin importar los ingredientes
+    assert set(masks.values()) == {DIET_BITS["Omnívoro"]}
+
+def test_migration_runs_once(shipped_db):
+    with RecipeManager(shipped_db) as manager:
+        pass
+    with RecipeManager(shipped_db) as manager:
+        assert manager.migrate() == (SCHEMA_VERSION, SCHEMA_VERSION)
+        assert manager.catalog_stats()["recetas"] == 6
+
+def test_recompute_minutes_from_version_5(shipped_db):
+    with RecipeManager(shipped_db) as manager:
+        conn = manager._get_connection()
+        with conn:
+            conn.execute("UPDATE recetas SET tiempo_coccion='1 1/2 horas', minutos=122 WHERE id=1")
+            conn.execute("PRAGMA user_version = 5")
+    with RecipeManager(shipped_db) as manager:
+        assert manager.schema_version() == SCHEMA_VERSION
+        assert manager.get_recipe(1).minutes == 90
+
+def test_recompute_minutes_from_version_6(shipped_db):
+    with RecipeManager(shipped_db) as manager:
+        conn = manager._get_connection()
+        with conn:
+            conn.execute("UPDATE recetas SET tiempo_coccion='3 huevos, 10 min', minutos=190 WHERE id=1")
+            conn.execute("PRAGMA user_version = 6")
+    with RecipeManager(shipped_db) as manager:
+        assert manager.schema_version() == SCHEMA_VERSION
+        assert manager.get_recipe(1).minutes == 10
+
+def test_newer_schema_is_left_alone(shipped_db):
+    with RecipeManager(shipped_db) as manager:
+        conn = manager._get_connection()
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    with RecipeManager(shipped_db) as manager:
+        assert manager.schema_version() == SCHEMA_VERSION + 1
@@ -0,0 +1,58 @@
+"""Interpretación del tiempo de cocción en minutos"""
+import pytest
+
+from recipe_manager import parse_cooking_minutes
+
+@pytest.mark.parametrize("text, minutes", [
+    ("25 minutos", 25),
+    ("30m", 30),
+    ("5 min", 5),
+    ("1 hora", 60),
+    ("1 h 30 min", 90),
+    ("1:30", 90),
+    ("2 días", 2880),
+    ("45 segundos", 1),
+    ("90", 90)
+])
+def test_units(text, minutes):
+    assert parse_cooking_minutes(text) == minutes
+
+@pytest.mark.parametrize("text, minutes", [
+    ("1 1/2 horas", 90),
+    ("1/2 hora", 30),
+    ("½ hora", 30),
+    ("hora y media", 90),
+    ("1 hora y media", 90),
+    ("2 y media horas", 150)
+])
+def test_fractions(text, minutes):
+    assert parse_cooking_minutes(text) == minutes
+
+@pytest.mark.parametrize("text, minutes", [
+    # Rangos: se toma el extremo mayor
+    ("30-40 minutos", 40),
+    ("1 a 2 horas", 120),
+    # Partes que se suman
+    ("20 minutos + 1 hora de reposo", 80),
+    # Un número sin unidad junto a otros con unidad no es un tiempo ("180°")...
+    ("40 min a 180°", 40),
+    # ...salvo los minutos que siguen a las horas
+    ("1 hora 30", 90)
+])
+def test_ranges_and_combinations(text, minutes):
+    assert parse_cooking_minutes(text) == minutes
+
+@pytest.mark.parametrize("text, minutes", [
+    # Palabras que empiezan como una unidad no son horas ni días
+    ("3 huevos, 10 min", 10),
+    ("2 hamburguesas, 15 minutos", 15),
+    ("2 diamantes de masa, 20 min", 20),
+    ("2 hs", 120),
+    ("1 hr 15", 75)
+])
+def test_only_exact_units(text, minutes):
+    assert parse_cooking_minutes(text) == minutes
+
+@pytest.mark.parametrize("text", ["", "a gusto", "hasta dorar"])
+def test_unrecognized(text):
+    assert parse_cooking_minutes(text) is None
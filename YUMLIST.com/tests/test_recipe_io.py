@@ -0,0 +1,32 @@
+"""Importación y exportación masiva con recipe_io"""
+import json
+
+import recipe_io
+from recipe_manager import RecipeManager
+
+def write_jsonl(path, records) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def test_import_into_new_database_has_no_samples(tmp_path):
+    source = tmp_path / "recetas.jsonl"
+    write_jsonl(source, [
+        {"nombre": f"Receta {n}", "ingredientes": "papa, sal", "cantidades": "2, 1 pizca",
+         "preparacion": "Hervir.", "tiempo_coccion": "20 minutos", "dieta": "Vegano"}
+        for n in range(6)
+    ])
+    db_name = str(tmp_path / "nueva.db")
+    assert recipe_io.main(["--db", db_name, "import", str(source)]) == 0
+    with RecipeManager(db_name) as manager:
+        assert manager.catalog_stats()["recetas"] == 6
+        assert [recipe.name for recipe in manager.iter_recipes()] == [f"Receta {n}" for n in range(6)]
+
+def test_export_import_round_trip(catalog_db, tmp_path):
+    exported = str(tmp_path / "catalogo.csv.gz")
+    assert recipe_io.main(["--db", catalog_db, "export", exported]) == 0
+    copy = str(tmp_path / "copia.db")
+    assert recipe_io.main(["--db", copy, "import", exported]) == 0
+    with RecipeManager(catalog_db) as original, RecipeManager(copy) as imported:
+        assert [recipe_io.recipe_record(r) for r in imported.iter_recipes()] == \
+            [recipe_io.recipe_record(r) for r in original.iter_recipes()]
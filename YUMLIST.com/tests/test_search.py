@@ -0,0 +1,137 @@
+"""Búsquedas por ingredientes contra un recorrido completo de la tabla, con y sin
+la matriz de bits (NumPy) y con y sin la caché de consultas"""
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+import bitmatrix
+from recipe_manager import (
+    DIET_BITS, QUERY_CACHE_SIZE, RecipeManager, parse_cooking_minutes, split_ingredients
+)
+
+QUERY_TERMS = ["papas", "tomate", "Huevos", "sal", "salsa", "maíz", "porotos", "limón", "piña", "queso", "pollo"]
+
+ENGINES = [
+    pytest.param(False, QUERY_CACHE_SIZE, id="sql-cache"),
+    pytest.param(False, 0, id="sql-sin-cache"),
+    pytest.param(True, QUERY_CACHE_SIZE, id="bitmatrix-cache",
+                 marks=pytest.mark.skipif(not bitmatrix.available(), reason="NumPy no está instalado")),
+    pytest.param(True, 0, id="bitmatrix-sin-cache",
+                 marks=pytest.mark.skipif(not bitmatrix.available(), reason="NumPy no está instalado"))
+]
+
+def load_rows(path: str):
+    """(id, ingredientes canónicos, máscara de dietas, minutos) leídos directamente"""
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute("SELECT id, ingredientes, dieta, tiempo_coccion FROM recetas ORDER BY id").fetchall()
+    finally:
+        conn.close()
+    return [
+        (recipe_id, split_ingredients(ingredients), RecipeManager.compute_diet_mask(diets, ingredients),
+         parse_cooking_minutes(cooking_time))
+        for recipe_id, ingredients, diets, cooking_time in rows
+    ]
+
+def in_range(minutes, low, high) -> bool:
+    if low is None and high is None:
+        return True
+    return minutes is not None and (low is None or minutes >= low) and (high is None or minutes <= high)
+
+def brute_force_ids(rows, diet, ingredients, low=None, high=None, order="id"):
+    terms = split_ingredients(",".join(ingredients))
+    bit = DIET_BITS.get(diet, 0)
+    found = [row for row in rows if row[2] & bit and terms <= row[1] and in_range(row[3], low, high)]
+    if order == "minutos":
+        found.sort(key=lambda row: (row[3] is None, row[3] or 0, row[0]))
+    elif order == "-minutos":
+        found.sort(key=lambda row: (row[3] is None, -(row[3] or 0), row[0]))
+    return [row[0] for row in found]
+
+def brute_force_closest(rows, diet, ingredients, k, low=None, high=None):
+    terms = split_ingredients(",".join(ingredients))
+    bit = DIET_BITS.get(diet, 0)
+    items = []
+    for recipe_id, names, mask, minutes in rows:
+        matched = len(names & terms)
+        if not matched or not mask & bit or not in_range(minutes, low, high):
+            continue
+        items.append((matched / (len(names) + len(terms) - matched), matched - len(names), recipe_id))
+    return sorted(items, reverse=True)[:k]
+
+def random_queries(count: int, seed: int = 3):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield rng.choice(list(DIET_BITS)), rng.sample(QUERY_TERMS, rng.randint(1, 3))
+
+@pytest.mark.parametrize("use_matrix, cache_size", ENGINES)
+def test_recipe_ids_match_brute_force(catalog_db, use_matrix, cache_size):
+    rows = load_rows(catalog_db)
+    with RecipeManager(catalog_db, bit_matrix=use_matrix, cache_size=cache_size) as manager:
+        # Dos pasadas: la segunda sale de la caché (o de consultas refinadas)
+        for _ in range(2):
+            for diet, ingredients in random_queries(60):
+                assert manager.get_recipe_ids(diet, ingredients) == brute_force_ids(rows, diet, ingredients)
+
+def test_search_recipes_returns_rows_in_id_order(catalog_db):
+    rows = load_rows(catalog_db)
+    with RecipeManager(catalog_db) as manager:
+        for diet, ingredients in random_queries(10, seed=9):
+            found = manager.search_recipes(ingredients, diet)
+            assert [recipe.id for recipe in found] == brute_force_ids(rows, diet, ingredients)
+
+@pytest.mark.parametrize("use_matrix, cache_size", ENGINES)
+@pytest.mark.parametrize("low, high, order", [
+    (None, 30, "id"), (40, None, "minutos"), (20, 90, "-minutos"), (None, None, "minutos")
+])
+def test_recipe_ids_with_minutes(catalog_db, use_matrix, cache_size, low, high, order):
+    rows = load_rows(catalog_db)
+    with RecipeManager(catalog_db, bit_matrix=use_matrix, cache_size=cache_size) as manager:
+        for diet, ingredients in random_queries(30):
+            expected = brute_force_ids(rows, diet, ingredients, low, high, order)
+            assert manager.get_recipe_ids(diet, ingredients, low, high, order) == expected
+            chunks = list(manager.iter_recipe_ids(diet, ingredients, 7, low, high, order))
+            assert [recipe_id for chunk in chunks for recipe_id in chunk] == expected
+
+@pytest.mark.parametrize("use_matrix, cache_size", ENGINES)
+@pytest.mark.parametrize("low, high", [(None, None), (None, 45), (60, 120)])
+def test_search_closest_matches_brute_force(catalog_db, use_matrix, cache_size, low, high):
+    rows = load_rows(catalog_db)
+    with RecipeManager(catalog_db, bit_matrix=use_matrix, cache_size=cache_size) as manager:
+        for diet, ingredients in random_queries(40, seed=5):
+            for k in (1, 5, 20):
+                expected = brute_force_closest(rows, diet, ingredients, k, low, high)
+                ranked = manager.search_closest(ingredients, diet, k, low, high)
+                assert [item.recipe.id for item in ranked] == [item[2] for item in expected]
+                assert [item.score for item in ranked] == pytest.approx([item[0] for item in expected])
+
+def test_search_closest_reports_matches(catalog_db):
+    with RecipeManager(catalog_db) as manager:
+        for item in manager.search_closest(["papas", "sal"], "Omnívoro", k=10):
+            names = split_ingredients(item.recipe.ingredients)
+            assert item.matched == len(names & {"papa", "sal"})
+            assert len(item.missing) == len(names) - item.matched
+
+def test_unknown_diet_and_empty_query(catalog_db):
+    with RecipeManager(catalog_db) as manager:
+        assert manager.get_recipe_ids("Carnívoro", ["papa"]) == []
+        assert manager.search_closest(["papa"], "Carnívoro") == []
+        assert manager.search_closest([" ", ""], "Omnívoro") == []
+        rows = load_rows(catalog_db)
+        assert manager.get_recipe_ids("Vegano") == brute_force_ids(rows, "Vegano", [])
+
+def test_numpy_only_loaded_with_bit_matrix(catalog_db):
+    """Con el motor desactivado (por defecto) importar y abrir el gestor no carga NumPy"""
+    script = (
+        "import sys\n"
+        "from recipe_manager import RecipeManager\n"
+        f"RecipeManager({catalog_db!r}).close()\n"
+        "print('numpy' in sys.modules)\n"
+    )
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", script], cwd=app_dir, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
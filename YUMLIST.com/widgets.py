@@ -0,0 +1,183 @@
+from tkinter import ttk
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Función de paginación: (offset, limit) -> [(iid, valores de la fila), ...]
+PageFetcher = Callable[[int, int], List[Tuple[object, tuple]]]
+
+# Bit de la tecla Shift en event.state
+SHIFT_MASK = 0x0001
+
+class VirtualTreeview(ttk.Treeview):
+    """Treeview virtualizado: solo materializa las filas visibles y pide cada
+    ventana de resultados a una función de paginación mientras el usuario se desplaza.
+    La memoria y el tiempo de redibujado no dependen del total de resultados.
+    La selección (selectmode="extended") se guarda por iid, así que se conserva
+    aunque las filas seleccionadas salgan de la ventana visible."""
+
+    HEADING_HEIGHT = 25
+
+    def __init__(self, master=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self._fetch_page: Optional[PageFetcher] = None
+        self._total = 0
+        self._offset = 0
+        self._scrollbar: Optional[ttk.Scrollbar] = None
+        # iids seleccionados, visibles o no (dict: conjunto que conserva el orden)
+        self._selected: Dict[str, None] = {}
+
+        self.bind("<MouseWheel>", self._on_mousewheel)
+        self.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.bind("<Button-5>", lambda event: self.scroll_rows(3))
+        self.bind("<Up>", self._on_key_up)
+        self.bind("<Down>", self._on_key_down)
+        self.bind("<Prior>", lambda event: self._scroll_and_break(-self._visible_rows()))
+        self.bind("<Next>", lambda event: self._scroll_and_break(self._visible_rows()))
+        self.bind("<Configure>", lambda event: self._render())
+        # Un clic sin Shift ni Control reemplaza la selección, también la no visible
+        self.bind("<ButtonPress-1>", lambda event: self._forget_hidden_selection())
+        self.bind("<Shift-ButtonPress-1>", lambda event: None)
+        self.bind("<Control-ButtonPress-1>", lambda event: None)
+
+    @property
+    def total(self) -> int:
+        """Cantidad total de resultados (no solo los materializados)"""
+        return self._total
+
+    def set_scrollbar(self, scrollbar: ttk.Scrollbar) -> None:
+        """Conecta la barra de desplazamiento al modelo virtual en lugar de a yview"""
+        self._scrollbar = scrollbar
+        scrollbar.configure(command=self._on_scrollbar)
+        self._update_scrollbar()
+
+    def set_source(self, total: int, fetch_page: Optional[PageFetcher]) -> None:
+        """Define la fuente de resultados y vuelve al inicio de la lista"""
+        self._total = total if fetch_page else 0
+        self._fetch_page = fetch_page
+        self._offset = 0
+        had_selection = bool(self._selected)
+        self._selected = {}
+        self._render()
+        if had_selection:
+            self.event_generate("<<TreeviewSelect>>")
+
+    def set_total(self, total: int) -> None:
+        """Actualiza el total sin volver al inicio (resultados que llegan de a partes).
+        Solo se redibuja si la ventana visible todavía no estaba completa."""
+        previous, self._total = self._total, total if self._fetch_page else 0
+        if previous < self._offset + self._visible_rows() or self._total < previous:
+            self._render()
+        else:
+            self._update_scrollbar()
+
+    def clear(self) -> None:
+        """Vacía la vista"""
+        self.set_source(0, None)
+
+    def refresh(self) -> None:
+        """Vuelve a pedir la ventana actual (por ejemplo, tras editar una receta)"""
+        self._render()
+
+    def selected_ids(self) -> List[str]:
+        """iids seleccionados, incluidos los que no están en la ventana visible"""
+        self._sync_selection()
+        return list(self._selected)
+
+    def select_ids(self, iids: Iterable) -> None:
+        """Reemplaza la selección (por ejemplo, todos los resultados)"""
+        self._selected = dict.fromkeys(str(iid) for iid in iids)
+        self.selection_set([iid for iid in self.get_children() if iid in self._selected])
+        self.event_generate("<<TreeviewSelect>>")
+
+    def _sync_selection(self) -> None:
+        """Incorpora los cambios de selección hechos sobre las filas visibles"""
+        children = self.get_children()
+        for iid in children:
+            self._selected.pop(iid, None)
+        self._selected.update(dict.fromkeys(self.selection()))
+
+    def _forget_hidden_selection(self) -> None:
+        self._selected = dict.fromkeys(self.selection())
+
+    def scroll_rows(self, rows: int) -> None:
+        """Desplaza la ventana visible la cantidad de filas indicada"""
+        self._scroll_to(self._offset + rows)
+
+    def _visible_rows(self) -> int:
+        """Filas que caben en el alto actual del widget"""
+        rowheight = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        height = self.winfo_height()
+        if height <= 1:
+            return max(1, int(self.cget("height")))
+        return max(1, (height - self.HEADING_HEIGHT) // rowheight)
+
+    def _scroll_to(self, offset: int) -> None:
+        visible = self._visible_rows()
+        offset = max(0, min(offset, self._total - visible))
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+
+    def _render(self) -> None:
+        """Reemplaza las filas materializadas por la ventana visible actual"""
+        visible = self._visible_rows()
+        self._offset = max(0, min(self._offset, self._total - visible))
+        self._sync_selection()
+        self.delete(*self.get_children())
+        if self._fetch_page and self._total:
+            for iid, values in self._fetch_page(self._offset, visible):
+                self.insert("", "end", iid=iid, values=values)
+            # Volver a marcar las filas seleccionadas que entran en la ventana
+            still_visible = [iid for iid in self.get_children() if iid in self._selected]
+            if still_visible:
+                self.selection_set(still_visible)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self) -> None:
+        if self._scrollbar is None:
+            return
+        if not self._total:
+            self._scrollbar.set(0.0, 1.0)
+            return
+        first = self._offset / self._total
+        last = min(1.0, (self._offset + self._visible_rows()) / self._total)
+        self._scrollbar.set(first, last)
+
+    def _on_scrollbar(self, action: str, value: str, unit: Optional[str] = None) -> None:
+        if action == "moveto":
+            self._scroll_to(int(float(value) * self._total))
+        elif action == "scroll":
+            step = self._visible_rows() if unit == "pages" else 1
+            self.scroll_rows(int(value) * step)
+
+    def _on_mousewheel(self, event) -> str:
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _scroll_and_break(self, rows: int) -> str:
+        self.scroll_rows(rows)
+        return "break"
+
+    def _on_key_up(self, event) -> Optional[str]:
+        if not event.state & SHIFT_MASK:
+            self._forget_hidden_selection()
+        children = self.get_children()
+        if children and self.focus() == children[0] and self._offset > 0:
+            self.scroll_rows(-1)
+            self._move_focus(self.get_children()[0])
+            return "break"
+        return None
+
+    def _on_key_down(self, event) -> Optional[str]:
+        if not event.state & SHIFT_MASK:
+            self._forget_hidden_selection()
+        children = self.get_children()
+        if children and self.focus() == children[-1] and self._offset + len(children) < self._total:
+            self.scroll_rows(1)
+            self._move_focus(self.get_children()[-1])
+            return "break"
+        return None
+
+    def _move_focus(self, iid) -> None:
+        self.focus(iid)
+        self.selection_set(iid)
+        self._selected = {iid: None}
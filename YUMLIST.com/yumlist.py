@@ -1,13 +1,19 @@
-import pygame
+from startup import STARTUP, BackgroundRecipeManager, cached_image
 import sys
+
+# Con argumentos se usa el modo sin interfaz (python -m yumlist search --diet Vegano arroz,tomate)
+if __name__ == "__main__" and len(sys.argv) > 1:
+    from cli import main
+    sys.exit(main())
+
 import tkinter as tk
 from tkinter import ttk, messagebox
-import sqlite3
-from PIL import Image, ImageTk
 import os
+from widgets import VirtualTreeview
 
 # --- CONFIGURACIÓN PYGAME SELECTOR ---
 def selector_dieta_pygame():
+    import pygame  # solo se necesita para el selector inicial
     pygame.init()
     WHITE = (255, 255, 255)
     GRAY = (200, 200, 200)
@@ -66,49 +72,10 @@ def selector_dieta_pygame():
     pygame.quit()
     return opciones[selected]
 
-# -------- BASE DE DATOS --------
-def crear_base_datos():
-    conn = sqlite3.connect("recetas.db")
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS recetas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nombre TEXT NOT NULL,
-            ingredientes TEXT NOT NULL,
-            cantidades TEXT NOT NULL,
-            preparacion TEXT NOT NULL,
-            tiempo_coccion TEXT NOT NULL
-        )
-    ''')
-    cursor.execute("SELECT COUNT(*) FROM recetas")
-    if cursor.fetchone()[0] == 0:
-        recetas_ejemplo = [
-            ("Tortilla de papa", "papa, huevo, cebolla, sal, aceite", "3 papas, 3 huevos, 1 cebolla, sal, aceite", "Freír papas y cebolla. Mezclar con huevo batido. Cocinar en sartén.", "25 minutos"),
-            ("Omelet de queso", "huevos, queso, sal, aceite", "2 huevos, 50g queso, 1 pizca sal, 1 cda aceite", "Batir huevos, calentar en sartén con aceite, añadir queso, doblar y cocinar.", "5 minutos"),
-            ("Arroz con pollo", "arroz, pollo, cebolla, ajo, aceite, sal", "200g arroz, 150g pollo, 1 cebolla, 1 diente de ajo, 1 cda aceite, 1 cdita sal", "Dorar el pollo. Agregar ajo y cebolla. Añadir arroz y agua. Cocinar 20 minutos.", "30 minutos"),
-            ("Ensalada fresca", "lechuga, tomate, zanahoria, sal, aceite", "4 hojas lechuga, 1 tomate, 1 zanahoria, 1 cdita sal, 1 cda aceite", "Lavar y cortar los vegetales. Mezclar con aceite y sal.", "10 minutos"),
-            ("Spaghetti bolognesa", "spaghetti, carne, tomate, cebolla, ajo, sal", "200g spaghetti, 150g carne, 2 tomates, 1 cebolla, 1 ajo, sal", "Hervir pasta. Cocinar carne con vegetales. Mezclar y servir.", "30 minutos")
-        ]
-        cursor.executemany("INSERT INTO recetas (nombre, ingredientes, cantidades, preparacion, tiempo_coccion) VALUES (?, ?, ?, ?, ?)", recetas_ejemplo)
-    conn.commit()
-    conn.close()
-
-# Ingredientes prohibidos según tipo de dieta
-INGR_PROHIBIDOS = {
-    "Vegano": {"huevo", "huevos", "queso", "pollo", "carne", "leche", "miel", "mantequilla", "yogur"},
-    "Vegetariano": {"pollo", "carne"},
-    "Omnívoro": set()
-}
-
 # -------- FUNCIONES --------
-def filtrar_por_dieta(ingredientes_text, dieta):
-    ingredientes_set = set(i.strip().lower() for i in ingredientes_text.split(","))
-    prohibidos = INGR_PROHIBIDOS.get(dieta, set())
-    return len(prohibidos.intersection(ingredientes_set)) == 0
-
 def buscar_recetas():
     entrada = entrada_ingredientes.get().lower()
-    resultados.delete(*resultados.get_children())
+    resultados.clear()
     limpiar_detalle()
     error_label.config(text="", fg="red")
 
@@ -123,53 +90,37 @@ def buscar_recetas():
 
     dieta = dieta_seleccionada.get()
 
-    conn = sqlite3.connect("recetas.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM recetas")
-    recetas = cursor.fetchall()
-    conn.close()
-
-    encontrados = 0
-    for receta in recetas:
-        ingredientes_receta = receta[2].lower()
-        if not filtrar_por_dieta(ingredientes_receta, dieta):
-            continue
-        if all(i in ingredientes_receta for i in ingredientes_usuario):
-            resultados.insert("", "end", iid=receta[0], values=(receta[1], receta[5], receta[3]))
-            encontrados += 1
-
-    if encontrados == 0:
+    # Intersección de listas de ocurrencias en el índice de ingredientes
+    total = gestor.count_recipes(dieta, ingredientes_usuario)
+    mostrar_resultados(total, dieta, ingredientes_usuario)
+
+    if not total:
         error_label.config(text="No se encontraron recetas con esos ingredientes para la dieta seleccionada.")
 
 def mostrar_todas():
-    resultados.delete(*resultados.get_children())
+    resultados.clear()
     limpiar_detalle()
     error_label.config(text="", fg="red")
 
     dieta = dieta_seleccionada.get()
 
-    conn = sqlite3.connect("recetas.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM recetas")
-    recetas = cursor.fetchall()
-    conn.close()
+    # Una sola consulta indexada sobre la máscara de dietas precalculada
+    mostrar_resultados(gestor.count_recipes(dieta), dieta)
 
-    for receta in recetas:
-        ingredientes_receta = receta[2].lower()
-        if filtrar_por_dieta(ingredientes_receta, dieta):
-            resultados.insert("", "end", iid=receta[0], values=(receta[1], receta[5], receta[3]))
+def mostrar_resultados(total, dieta, ingredientes=()):
+    # Solo se piden a la base las filas visibles en la tabla virtualizada
+    def pagina(offset, limite):
+        return [(r.id, (r.name, r.cooking_time, r.quantities))
+                for r in gestor.get_recipes_page(dieta, offset, limite, ingredientes)]
+    resultados.set_source(total, pagina)
 
 def mostrar_detalle(event):
     item = resultados.focus()
     if not item:
         return
-    conn = sqlite3.connect("recetas.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT ingredientes, cantidades FROM recetas WHERE id=?", (item,))
-    data = cursor.fetchone()
-    conn.close()
-    if data:
-        ingredientes, cantidades = data
+    receta = gestor.get_recipe(int(item))
+    if receta:
+        ingredientes, cantidades = receta.ingredients, receta.quantities
         texto = f"Ingredientes:\n{ingredientes}\n\nCantidades:\n{cantidades}"
         detalle_text.config(state="normal")
         detalle_text.delete("1.0", tk.END)
@@ -184,11 +135,40 @@ def limpiar_detalle():
 def limpiar_busqueda():
     entrada_ingredientes.delete(0, tk.END)
     limpiar_detalle()
-    resultados.delete(*resultados.get_children())
+    resultados.clear()
     error_label.config(text="")
 
+# Búsqueda en vivo: se ejecuta al dejar de escribir; al agregar un ingrediente
+# el gestor refina en memoria el resultado anterior
+RETARDO_BUSQUEDA_MS = 150
+busqueda_pendiente = None
+ultima_busqueda = None
+
+def programar_busqueda(event=None):
+    global busqueda_pendiente
+    if busqueda_pendiente is not None:
+        app.after_cancel(busqueda_pendiente)
+    busqueda_pendiente = app.after(RETARDO_BUSQUEDA_MS, buscar_en_vivo)
+
+def buscar_en_vivo():
+    global busqueda_pendiente, ultima_busqueda
+    busqueda_pendiente = None
+    entrada = entrada_ingredientes.get().lower()
+    if entrada == ultima_busqueda:
+        return
+    ultima_busqueda = entrada
+    if entrada.strip():
+        buscar_recetas()
+    else:
+        mostrar_todas()
+
+# Migraciones del esquema y carga inicial en segundo plano mientras el usuario elige la dieta
+gestor = BackgroundRecipeManager()
+
 # -------- INICIO: SELECCIÓN DE DIETA (PYGAME) --------
 dieta_inicial = selector_dieta_pygame()
+# El selector espera al usuario: el tiempo de arranque se mide desde que se cierra
+STARTUP.restart("dieta elegida")
 
 # -------- INTERFAZ TKINTER --------
 app = tk.Tk()
@@ -208,8 +188,7 @@ frame_logo.pack(pady=10)
 
 try:
     if os.path.exists("logo.jpg"):
-        img = Image.open("logo.jpg").resize((100, 100))
-        logo_img = ImageTk.PhotoImage(img)
+        logo_img = cached_image("logo.jpg", (100, 100))
         label_logo = tk.Label(frame_logo, image=logo_img, bg="#f3f9f1")
         label_logo.image = logo_img
     else:
@@ -266,6 +245,7 @@ label.grid(row=0, column=0, columnspan=4, pady=5, sticky="w")
 
 entrada_ingredientes = tk.Entry(frame_busqueda, width=60, font=("Arial", 12))
 entrada_ingredientes.grid(row=1, column=0, columnspan=2, padx=5, pady=5, sticky="w")
+entrada_ingredientes.bind("<KeyRelease>", programar_busqueda)
 
 # Botón buscar
 boton_buscar = tk.Button(frame_busqueda, text="🔍 Buscar Recetas", command=buscar_recetas, bg="#388e3c", fg="white", font=("Arial", 13, "bold"), relief="raised", borderwidth=2, cursor="hand2", activebackground="#66bb6a")
@@ -287,12 +267,15 @@ frame_resultados = tk.Frame(app, bg="#f3f9f1")
 frame_resultados.pack(fill="both", expand=True, padx=10, pady=(10,0))
 
 columnas = ("Nombre", "Tiempo", "Preparación")
-resultados = ttk.Treeview(frame_resultados, columns=columnas, show="headings", height=12, selectmode="browse")
+resultados = VirtualTreeview(frame_resultados, columns=columnas, show="headings", height=12, selectmode="browse")
 for col in columnas:
     resultados.heading(col, text=col)
     resultados.column(col, width=250 if col != "Preparación" else 400)
 resultados.pack(fill="both", expand=True)
 resultados.bind("<<TreeviewSelect>>", mostrar_detalle)
+barra_resultados = ttk.Scrollbar(resultados, orient="vertical")
+barra_resultados.pack(side="right", fill="y")
+resultados.set_scrollbar(barra_resultados)
 
 # Detalle de ingredientes y cantidades
 frame_detalle = tk.Frame(app, bg="#e2f0d9")
@@ -325,8 +308,10 @@ create_tooltip(boton_buscar, "Busca recetas según los ingredientes y dieta eleg
 create_tooltip(boton_limpiar, "Limpia la búsqueda y resultados.")
 create_tooltip(boton_todas, "Muestra todas las recetas disponibles para tu dieta.")
 
-# Inicializar base y mostrar recetas según la dieta elegida en Pygame
-crear_base_datos()
-mostrar_todas()
+# Mostrar recetas según la dieta elegida en Pygame cuando la base esté lista
+STARTUP.mark("interfaz construida")
+STARTUP.watch_first_frame(app)
+gestor.when_ready(app, mostrar_todas)
 
-app.mainloop()
\ No newline at end of file
+app.mainloop()
+gestor.close()
\ No newline at end of file